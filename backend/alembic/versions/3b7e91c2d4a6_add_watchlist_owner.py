@@ -0,0 +1,41 @@
+"""add watchlist owner
+
+Revision ID: 3b7e91c2d4a6
+Revises: f6f32bad92fd
+Create Date: 2026-10-18 11:04:37.552190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e91c2d4a6'
+down_revision: Union[str, Sequence[str], None] = 'f6f32bad92fd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing items become the default owner's list
+    op.add_column('watchlist', sa.Column('owner', sa.String(length=64), server_default='default', nullable=False))
+    # Keep the oldest of any duplicates so the unique index can be built
+    op.execute(
+        'DELETE FROM watchlist WHERE id NOT IN '
+        '(SELECT MIN(id) FROM watchlist GROUP BY owner, asset_type, symbol)'
+    )
+    op.drop_index(op.f('ix_watchlist_symbol'), table_name='watchlist')
+    op.create_index('ix_watchlist_owner_asset_symbol', 'watchlist', ['owner', 'asset_type', 'symbol'], unique=True)
+    op.create_index('ix_watchlist_owner_id', 'watchlist', ['owner', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_watchlist_owner_id', table_name='watchlist')
+    op.drop_index('ix_watchlist_owner_asset_symbol', table_name='watchlist')
+    op.create_index(op.f('ix_watchlist_symbol'), 'watchlist', ['symbol'], unique=False)
+    with op.batch_alter_table('watchlist') as batch_op:
+        batch_op.drop_column('owner')
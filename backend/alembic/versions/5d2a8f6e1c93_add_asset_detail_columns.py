@@ -0,0 +1,33 @@
+"""add asset detail columns
+
+Revision ID: 5d2a8f6e1c93
+Revises: 3b7e91c2d4a6
+Create Date: 2026-10-18 16:20:11.408213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8f6e1c93'
+down_revision: Union[str, Sequence[str], None] = '3b7e91c2d4a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('assets', sa.Column('high_24h', sa.Float(), nullable=True))
+    op.add_column('assets', sa.Column('low_24h', sa.Float(), nullable=True))
+    op.add_column('assets', sa.Column('description', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('assets') as batch_op:
+        batch_op.drop_column('description')
+        batch_op.drop_column('low_24h')
+        batch_op.drop_column('high_24h')
@@ -0,0 +1,36 @@
+"""key assets by type and symbol
+
+Revision ID: 9e3b7c1d4f28
+Revises: 5d2a8f6e1c93
+Create Date: 2026-10-18 19:42:05.318744
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3b7c1d4f28'
+down_revision: Union[str, Sequence[str], None] = '5d2a8f6e1c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A stock and a coin sharing a ticker each keep their own snapshot
+    op.drop_index(op.f('ix_assets_symbol'), table_name='assets')
+    op.create_index('ix_assets_asset_type_symbol', 'assets', ['asset_type', 'symbol'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Keep the newest snapshot of each symbol so the unique index can be built
+    op.execute(
+        'DELETE FROM assets WHERE id NOT IN '
+        '(SELECT MAX(id) FROM assets GROUP BY symbol)'
+    )
+    op.drop_index('ix_assets_asset_type_symbol', table_name='assets')
+    op.create_index(op.f('ix_assets_symbol'), 'assets', ['symbol'], unique=True)
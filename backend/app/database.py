@@ -1,5 +1,10 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import asyncio
+from contextlib import asynccontextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 import os
 from dotenv import load_dotenv
 
@@ -7,13 +12,91 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./investment_dashboard.db")
 
-# SQLite requires check_same_thread=False, PostgreSQL doesn't need it
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+# Async drivers for the sync URL's dialect
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+# Connection pool settings, applied to the sync and async engines alike
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Seconds before a pooled connection is replaced; -1 keeps them forever
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# How long SQLite waits on a locked database before failing a statement
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def async_database_url(url: str) -> str:
+    """The async driver URL for a sync database URL, e.g. sqlite+aiosqlite."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url.render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+
+
+def engine_options(url: str) -> dict:
+    """Pool and connect arguments for an engine on a database URL."""
+    url = make_url(url)
+    if url.get_backend_name() != "sqlite":
+        return {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pool_pre_ping": True,
+        }
+    # SQLite requires check_same_thread=False, PostgreSQL doesn't need it
+    options = {"connect_args": {"check_same_thread": False}}
+    # In-memory databases live in a single connection; only files are pooled
+    if url.database and url.database != ":memory:":
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Tune each new SQLite connection for concurrent readers and writers.
+
+    WAL lets reads proceed during a write, synchronous=NORMAL is durable
+    across application crashes in WAL mode while skipping an fsync per
+    commit, and the busy timeout makes writers queue for the lock instead
+    of failing with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+
+def configure_sqlite(engine: Engine) -> None:
+    """Apply the SQLite pragmas to an engine's connections, if it is SQLite."""
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+configure_sqlite(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async engine for the routers, on the same database
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+configure_sqlite(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+_sqlite_write_lock = asyncio.Lock()
+
 
 def get_db():
     db = SessionLocal()
@@ -21,3 +104,37 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@asynccontextmanager
+async def serialized_writes():
+    """
+    Take SQLite's single writer slot for the block on the async engine.
+
+    SQLite lets one connection write at a time and the others poll the busy
+    timeout for the lock, which starves some of them when many requests
+    write at once. Queueing writers on a lock in the event loop hands the
+    slot over in order instead; other databases don't need it.
+    """
+    if async_engine.dialect.name != "sqlite":
+        yield
+        return
+    async with _sqlite_write_lock:
+        yield
+
+
+def dialect_insert(session: Session | AsyncSession):
+    """Return the dialect's insert() supporting ON CONFLICT, or None if unsupported."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    return insert
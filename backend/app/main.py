@@ -1,15 +1,60 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import Base, engine
-from app.routers import assets_router, watchlist_router
+from app.database import Base, async_engine
+from app.routers import (
+    DeadlineMiddleware,
+    MetricsMiddleware,
+    assets_router,
+    metrics_router,
+    stream_router,
+    watchlist_router,
+)
+from app.routers.assets import STALE_HEADER, warm_quote_cache
+from app.routers.stream import price_hub
+from app.routers.watchlist import NEXT_CURSOR_HEADER, prefetcher
+from app.services import (
+    async_crypto_service,
+    coin_index,
+    crypto_service,
+    quote_store,
+    stock_index,
+)
+
+# Create missing tables at startup; turn off where alembic owns the schema
+CREATE_SCHEMA = os.getenv("CREATE_SCHEMA", "true").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if CREATE_SCHEMA:
+        async with async_engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+    await async_crypto_service.start()
+    quote_store.start()
+    await run_in_threadpool(coin_index.start, crypto_service.get_coin_list)
+    await run_in_threadpool(stock_index.start)
+    await run_in_threadpool(warm_quote_cache)
+    prefetcher.start()
+    yield
+    await run_in_threadpool(prefetcher.stop)
+    await run_in_threadpool(coin_index.stop)
+    await run_in_threadpool(stock_index.stop)
+    await price_hub.shutdown()
+    await run_in_threadpool(quote_store.stop)
+    await async_crypto_service.close()
+    await async_engine.dispose()
 
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Investment Dashboard API",
     description="API for stock and crypto tracking",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -18,10 +63,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[STALE_HEADER, NEXT_CURSOR_HEADER],
 )
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(assets_router)
 app.include_router(watchlist_router)
+app.include_router(stream_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -1,2 +1,10 @@
 from app.database import Base
-from app.models.asset import Asset, Watchlist, AssetType
+from app.models.asset import (
+    Asset,
+    AssetType,
+    CryptoCoin,
+    DEFAULT_OWNER,
+    PriceBar,
+    PriceBarSeries,
+    Watchlist,
+)
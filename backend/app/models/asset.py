@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, Index, Text
 from sqlalchemy.sql import func
 import enum
 
@@ -12,23 +12,80 @@ class AssetType(str, enum.Enum):
 
 class Asset(Base):
     __tablename__ = "assets"
+    __table_args__ = (
+        # One snapshot per asset; a stock and a coin may share a ticker
+        Index("ix_assets_asset_type_symbol", "asset_type", "symbol", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     asset_type = Column(Enum(AssetType), nullable=False)
-    symbol = Column(String(20), unique=True, nullable=False, index=True)
+    symbol = Column(String(20), nullable=False)
     name = Column(String(100), nullable=False)
     current_price = Column(Float)
     price_change_24h = Column(Float)
     price_change_percent_24h = Column(Float)
     market_cap = Column(Float)
     volume_24h = Column(Float)
+    high_24h = Column(Float)
+    low_24h = Column(Float)
+    description = Column(Text)
     last_updated = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
 
+# Owner of watchlist items added without an owner id
+DEFAULT_OWNER = "default"
+
+
 class Watchlist(Base):
     __tablename__ = "watchlist"
+    __table_args__ = (
+        # One entry per asset in each owner's list
+        Index("ix_watchlist_owner_asset_symbol", "owner", "asset_type", "symbol", unique=True),
+        # Keyset pagination walks an owner's items in id order
+        Index("ix_watchlist_owner_id", "owner", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    owner = Column(String(64), nullable=False, server_default=DEFAULT_OWNER)
     asset_type = Column(Enum(AssetType), nullable=False)
-    symbol = Column(String(20), nullable=False, index=True)
+    symbol = Column(String(20), nullable=False)
     added_at = Column(DateTime, server_default=func.now())
+
+    # Fetch added_at with the INSERT instead of a second query
+    __mapper_args__ = {"eager_defaults": True}
+
+
+class PriceBar(Base):
+    __tablename__ = "price_bars"
+
+    asset_type = Column(Enum(AssetType), primary_key=True)
+    symbol = Column(String(20), primary_key=True)
+    interval = Column(String(5), primary_key=True)
+    timestamp = Column(DateTime, primary_key=True)  # UTC
+    price = Column(Float, nullable=False)
+    volume = Column(Float)
+
+
+class PriceBarSeries(Base):
+    """Sync state of one stored bar series."""
+
+    __tablename__ = "price_bar_series"
+
+    asset_type = Column(Enum(AssetType), primary_key=True)
+    symbol = Column(String(20), primary_key=True)
+    interval = Column(String(5), primary_key=True)
+    covered_from = Column(DateTime, nullable=False)  # UTC
+    last_timestamp = Column(DateTime, nullable=False)  # UTC
+    fetched_at = Column(DateTime, nullable=False)  # UTC
+
+
+class CryptoCoin(Base):
+    """CoinGecko coin list entry backing the local crypto symbol index."""
+
+    __tablename__ = "crypto_coins"
+
+    id = Column(String(200), primary_key=True)  # CoinGecko id
+    symbol = Column(String(100), nullable=False)
+    name = Column(String(300), nullable=False)
+    market_cap_rank = Column(Integer)
+    updated_at = Column(DateTime, nullable=False)  # UTC
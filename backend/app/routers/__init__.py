@@ -1,2 +1,5 @@
 from app.routers.assets import router as assets_router
 from app.routers.watchlist import router as watchlist_router
+from app.routers.stream import router as stream_router
+from app.routers.metrics import MetricsMiddleware, router as metrics_router
+from app.routers.deadline import DeadlineMiddleware
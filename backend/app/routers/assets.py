@@ -1,108 +1,792 @@
-from datetime import timedelta
-from typing import Literal
+import asyncio
+import math
+import os
+from datetime import datetime, timedelta
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Literal
 
-from fastapi import APIRouter, HTTPException, Query
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 
-from app.schemas import AssetDetail, AssetHistory, AssetType, SearchResult
-from app.services import StockService, CryptoService, cache
+from app.schemas import (
+    AssetDetail,
+    AssetHistory,
+    AssetHistoryColumns,
+    AssetIndicators,
+    AssetType,
+    BatchQuote,
+    SearchResult,
+)
+from app.services import (
+    AsyncCryptoService,
+    CacheLookup,
+    CryptoService,
+    EncodedBody,
+    HistoryStore,
+    IndicatorKind,
+    IndicatorSeries,
+    PriceSeries,
+    Priority,
+    StockService,
+    cache,
+    choose_encoding,
+    coingecko_limiter,
+    compute_indicator,
+    downsample,
+    provider_calls,
+    quote_store,
+    response_cache,
+)
+from app.routers.dependencies import (
+    get_async_crypto_service,
+    get_crypto_service,
+    get_history_store,
+    get_stock_service,
+)
 
 router = APIRouter(prefix="/api/assets", tags=["assets"])
 
-stock_service = StockService()
-crypto_service = CryptoService()
-
 CACHE_TTL = timedelta(minutes=5)
 HISTORY_CACHE_TTL = timedelta(minutes=15)
 
+# How long past its TTL an entry may still be served (flagged stale) while it
+# is refreshed in the background; after that it is a hard miss.
+CACHE_STALE_TTL = timedelta(seconds=int(os.getenv("CACHE_STALE_SECONDS", "60")))
+HISTORY_STALE_TTL = timedelta(
+    seconds=int(os.getenv("HISTORY_STALE_SECONDS", "300"))
+)
+
+# Indicator results outlive the history they were computed from, so a
+# refreshed history extends them with its new bars instead of starting over
+INDICATOR_CACHE_TTL = timedelta(hours=24)
+
+STALE_HEADER = "X-Cache-Stale"
+
+MAX_BATCH_SYMBOLS = 100
+
+HistoryFormat = Literal["rows", "columnar"]
+
+MaxPoints = Query(
+    default=None,
+    ge=3,
+    le=10_000,
+    description="Downsample to at most this many points (LTTB)",
+)
+
+IndicatorWindow = Query(
+    default=None,
+    ge=2,
+    le=500,
+    description="Lookback in bars for sma, ema, rsi and bollinger (default 20, rsi 14)",
+)
+IndicatorStd = Query(
+    default=2.0, gt=0, description="Bollinger band width in standard deviations"
+)
+MacdFast = Query(default=12, ge=2, le=500)
+MacdSlow = Query(default=26, ge=2, le=500)
+MacdSignal = Query(default=9, ge=2, le=500)
+
+StockPeriod = Literal["1d", "5d", "1mo", "3mo", "6mo", "1y", "5y"]
+
+
+def mark_stale(response: Response, lookup: CacheLookup) -> None:
+    """Flag a response as served from stale cache data."""
+    if lookup.stale:
+        response.headers[STALE_HEADER] = "true"
+
+
+def encode_quote(quote: AssetDetail) -> bytes:
+    """Encode a quote as AssetDetail JSON."""
+    return orjson.dumps(quote.model_dump())
+
+
+def encode_history(
+    symbol: str, asset_type: AssetType, series: PriceSeries, format: HistoryFormat
+) -> bytes:
+    """
+    Encode a price series as row-oriented or columnar history JSON.
+
+    Produces the AssetHistory / AssetHistoryColumns shapes straight from
+    the NumPy columns; NaN prices or volumes are written as null.
+    """
+    if format == "columnar":
+        return orjson.dumps(
+            {
+                "symbol": symbol.upper(),
+                "asset_type": asset_type,
+                "timestamps": series.epoch_ms(),
+                "prices": series.prices,
+                "volumes": series.volumes,
+            },
+            option=orjson.OPT_SERIALIZE_NUMPY,
+        )
+    return orjson.dumps(
+        {
+            "symbol": symbol.upper(),
+            "asset_type": asset_type,
+            "data": [
+                {"timestamp": timestamp, "price": price, "volume": volume}
+                for timestamp, price, volume in zip(
+                    series.timestamps.astype(object),
+                    series.prices.tolist(),
+                    series.volumes.tolist(),
+                )
+            ],
+        },
+        # Bar times are naive UTC; render them as "...Z" like pydantic does
+        option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z,
+    )
+
+
+def encode_indicator(
+    symbol: str,
+    asset_type: AssetType,
+    kind: IndicatorKind,
+    params: dict[str, float],
+    result: IndicatorSeries,
+) -> bytes:
+    """Encode indicator lines as AssetIndicators JSON, NaN as null."""
+    return orjson.dumps(
+        {
+            "symbol": symbol.upper(),
+            "asset_type": asset_type,
+            "kind": kind,
+            "params": params,
+            "timestamps": result.source.epoch_ms(),
+            "values": result.lines(kind),
+        },
+        option=orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+def not_modified(request: Request, encoded: EncodedBody) -> bool:
+    """
+    Whether the client's copy is current per its conditional headers.
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    without it, and only for bodies that track their modification time.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return encoded.matches(if_none_match)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and encoded.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(encoded.last_modified) <= since
+    return False
+
+
+def conditional_json(
+    request: Request, encoded: EncodedBody, cache_control: str, stale: bool = False
+) -> Response:
+    """
+    Send an encoded JSON body, or 304 Not Modified if the client has it.
+
+    The body is compressed per Accept-Encoding when large enough, and
+    sent as-is, skipping response_model validation and serialization.
+
+    Args:
+        request: Incoming request, for conditional and encoding headers
+        encoded: Body to send
+        cache_control: Cache-Control header value
+        stale: Flag the response as served from stale cache data
+    """
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    body = encoded.encoded(encoding)
+    if body is encoded.body:
+        encoding = None
+
+    headers = {
+        "ETag": encoded.etag(encoding),
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if encoded.last_modified is not None:
+        headers["Last-Modified"] = formatdate(encoded.last_modified, usegmt=True)
+    if stale:
+        headers[STALE_HEADER] = "true"
+
+    if not_modified(request, encoded):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def cached_json(
+    request: Request, key: str, lookup: CacheLookup, encode: Callable[[Any], bytes]
+) -> Response:
+    """
+    Respond with a cached value, encoding it once per value.
+
+    Clients and shared caches may keep the response for the rest of the
+    value's TTL; stale values must be revalidated.
+    """
+    encoded = response_cache.get(key, lookup.value, encode)
+    max_age = 0 if lookup.stale else int(lookup.expires_in)
+    return conditional_json(
+        request, encoded, f"public, max-age={max_age}", lookup.stale
+    )
+
+
+def downsampled(
+    cache_key: str, lookup: CacheLookup, max_points: int | None
+) -> CacheLookup:
+    """
+    Downsample a cached history lookup, caching the result under its own key.
+
+    Returns:
+        Lookup of the downsampled series, stale if either entry is stale
+    """
+    if max_points is None:
+        return lookup
+    series = lookup.value
+    reduced = cache.get_or_load(
+        f"{cache_key}:lttb{max_points}",
+        lambda: downsample(series, max_points),
+        HISTORY_CACHE_TTL,
+        HISTORY_STALE_TTL,
+    )
+    return CacheLookup(
+        reduced.value,
+        lookup.stale or reduced.stale,
+        min(lookup.expires_in, reduced.expires_in),
+    )
+
+
+def indicator_params(
+    kind: IndicatorKind,
+    window: int | None,
+    std: float,
+    fast: int,
+    slow: int,
+    signal: int,
+) -> dict[str, float]:
+    """
+    The parameters an indicator kind takes, from the endpoint's query.
+
+    Raises:
+        HTTPException: 400 if the MACD fast period isn't below the slow one
+    """
+    if kind == "macd":
+        if fast >= slow:
+            raise HTTPException(
+                status_code=400, detail="fast must be shorter than slow"
+            )
+        return {"fast": fast, "slow": slow, "signal": signal}
+    if window is None:
+        window = 14 if kind == "rsi" else 20
+    if kind == "bollinger":
+        return {"window": window, "std": std}
+    return {"window": window}
+
+
+def indicator(
+    history_key: str,
+    history: CacheLookup,
+    kind: IndicatorKind,
+    params: dict[str, float],
+) -> tuple[str, CacheLookup]:
+    """
+    Compute an indicator over a cached history, extending the cached result.
+
+    The result is cached per history key, kind and params. When the history
+    was refreshed since, only its changed and new bars are computed.
+
+    Returns:
+        (cache key, lookup of the result, stale and expiring with the history)
+    """
+    key = f"indicator:{history_key}:{kind}:" + ",".join(
+        f"{name}={value}" for name, value in params.items()
+    )
+    previous = cache.get(key)
+    result = compute_indicator(history.value, kind, params, previous)
+    if result is not previous:
+        cache.set(key, result, INDICATOR_CACHE_TTL)
+    return key, CacheLookup(result, history.stale, history.expires_in)
+
+
+def quote_cache_key(asset_type: AssetType, symbol: str) -> str:
+    """Cache key for a single-asset quote, e.g. "stock:AAPL"."""
+    prefix = "stock" if asset_type == AssetType.STOCK else "crypto"
+    return f"{prefix}:{symbol.upper()}"
+
+
+def batch_quote_cache_key(asset_type: AssetType, symbol: str) -> str:
+    """
+    Cache key for a quote from bulk market data, e.g. "stock_quote:AAPL".
+
+    Bulk quotes lack fields of the single-asset ones, such as the
+    description, so they are kept apart rather than replacing them.
+    """
+    prefix = "stock" if asset_type == AssetType.STOCK else "crypto"
+    return f"{prefix}_quote:{symbol.upper()}"
+
+
+def quote_ttl(quote: AssetDetail) -> timedelta:
+    """Remaining TTL of a quote, so persisted snapshots don't outlive CACHE_TTL."""
+    if quote.last_updated is None:
+        return CACHE_TTL
+    return max(CACHE_TTL - (datetime.now() - quote.last_updated), timedelta(0))
+
+
+def history_ttl(series: PriceSeries) -> timedelta:
+    """
+    TTL of a history; partial ones are kept for the stale window only.
+
+    A partial history is stored bars served because a full refresh failed,
+    so it may stop short of the requested range.
+    """
+    return timedelta(0) if series.partial else HISTORY_CACHE_TTL
+
+
+def stale_if_expired(
+    lookup: CacheLookup, ttl: Callable[[Any], timedelta] = quote_ttl
+) -> CacheLookup:
+    """
+    Flag a lookup stale when its value has no TTL left.
+
+    A last-known quote served while the provider's circuit is open, or a
+    partial history, comes back from its load with no TTL left but not
+    flagged stale, since it wasn't served from the cache's stale window.
+    """
+    if lookup.value is None or lookup.stale or ttl(lookup.value):
+        return lookup
+    return CacheLookup(lookup.value, stale=True)
+
+
+def provider_of(asset_type: AssetType) -> str:
+    """Upstream provider serving an asset type."""
+    return "yfinance" if asset_type == AssetType.STOCK else "coingecko"
+
+
+def raise_if_unavailable(asset_type: AssetType) -> None:
+    """Answer 503 with Retry-After while the provider's circuit is open."""
+    retry_after = provider_calls.retry_after(provider_of(asset_type))
+    if retry_after:
+        raise HTTPException(
+            status_code=503,
+            detail=f"{asset_type.value.capitalize()} data provider unavailable, try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def last_known_quote(asset_type: AssetType, symbol: str) -> AssetDetail | None:
+    """
+    The last persisted quote however old, while the provider's circuit is open.
+
+    Its TTL has run out, so it is cached for the stale window only and
+    served flagged stale while refreshes are retried.
+    """
+    if not provider_calls.retry_after(provider_of(asset_type)):
+        return None
+    return quote_store.load(asset_type, symbol, None)
+
+
+def fetch_quote(
+    asset_type: AssetType, symbol: str, stocks: StockService, crypto: CryptoService
+) -> AssetDetail | None:
+    """
+    Load a quote from the persisted snapshot if recent, else from upstream.
+
+    Quotes fetched upstream are queued for persistence.
+
+    Args:
+        asset_type: Asset type of the quote
+        symbol: Asset symbol
+        stocks: Service fetching stock quotes
+        crypto: Service fetching crypto quotes
+    """
+    quote = quote_store.load(asset_type, symbol, CACHE_TTL)
+    if quote is not None:
+        return quote
+
+    if asset_type == AssetType.STOCK:
+        quote = stocks.get_stock_data(symbol)
+    else:
+        quote = crypto.get_crypto_data(symbol)
+    if quote is None:
+        return last_known_quote(asset_type, symbol)
+    quote_store.save(quote)
+    return quote
+
+
+def refresh_quote(
+    asset_type: AssetType, symbol: str, stocks: StockService, crypto: CryptoService
+) -> AssetDetail | None:
+    """Fetch a quote upstream into the cache and quote store, skipping both."""
+    if asset_type == AssetType.STOCK:
+        quote = stocks.get_stock_data(symbol)
+    else:
+        quote = crypto.get_crypto_data(symbol, Priority.BACKGROUND)
+    if quote is not None:
+        cache.set(quote_cache_key(asset_type, symbol), quote, CACHE_TTL, CACHE_STALE_TTL)
+        quote_store.save(quote)
+    return quote
+
+
+async def fetch_crypto_quote_async(
+    symbol: str, crypto: AsyncCryptoService
+) -> AssetDetail | None:
+    """Async counterpart of fetch_quote for crypto, using the pooled client."""
+    quote = await run_in_threadpool(
+        quote_store.load, AssetType.CRYPTO, symbol, CACHE_TTL
+    )
+    if quote is not None:
+        return quote
+
+    quote = await crypto.get_crypto_data(symbol)
+    if quote is None:
+        return await run_in_threadpool(last_known_quote, AssetType.CRYPTO, symbol)
+    quote_store.save(quote)
+    return quote
+
+
+def warm_quote_cache() -> int:
+    """
+    Load recently persisted quotes into the in-memory cache.
+
+    Returns:
+        Number of quotes loaded
+    """
+    quotes = quote_store.load_recent(CACHE_TTL)
+    for quote in quotes:
+        cache.set(
+            quote_cache_key(quote.asset_type, quote.symbol),
+            quote,
+            quote_ttl(quote),
+            CACHE_STALE_TTL,
+        )
+    return len(quotes)
+
+
+def stock_history(
+    symbol: str, period: StockPeriod, store: HistoryStore
+) -> tuple[str, CacheLookup]:
+    """
+    Look up a stock's history in the cache, loading it on a miss.
+
+    Raises:
+        HTTPException: 503 while the provider is unavailable, else 404 if
+            there is no history
+    """
+    cache_key = f"stock_history:{symbol.upper()}:{period}"
+
+    def load():
+        return store.get_stock_history(symbol, period) or None
+
+    lookup = stale_if_expired(
+        cache.get_or_load(cache_key, load, history_ttl, HISTORY_STALE_TTL),
+        history_ttl,
+    )
+    if lookup.value is None:
+        raise_if_unavailable(AssetType.STOCK)
+        raise HTTPException(
+            status_code=404, detail=f"No historical data found for {symbol}"
+        )
+    return cache_key, lookup
+
+
+async def crypto_history(
+    symbol: str, days: int, store: HistoryStore
+) -> tuple[str, CacheLookup]:
+    """Async counterpart of stock_history for a cryptocurrency."""
+    cache_key = f"crypto_history:{symbol.upper()}:{days}"
+
+    async def load():
+        return await store.get_crypto_history_async(symbol, days) or None
+
+    lookup = stale_if_expired(
+        await cache.get_or_load_async(cache_key, load, history_ttl, HISTORY_STALE_TTL),
+        history_ttl,
+    )
+    if lookup.value is None:
+        raise_if_unavailable(AssetType.CRYPTO)
+        raise HTTPException(
+            status_code=404, detail=f"No historical data found for {symbol}"
+        )
+    return cache_key, lookup
+
 
 @router.get("/stocks/{symbol}", response_model=AssetDetail)
-def get_stock(symbol: str):
+def get_stock(
+    symbol: str,
+    request: Request,
+    stocks: StockService = Depends(get_stock_service),
+    crypto: CryptoService = Depends(get_crypto_service),
+):
     """Get current stock data for a symbol."""
-    cache_key = f"stock:{symbol.upper()}"
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
-
-    data = stock_service.get_stock_data(symbol)
-    if not data:
+    cache_key = quote_cache_key(AssetType.STOCK, symbol)
+    lookup = stale_if_expired(
+        cache.get_or_load(
+            cache_key,
+            lambda: fetch_quote(AssetType.STOCK, symbol, stocks, crypto),
+            quote_ttl,
+            CACHE_STALE_TTL,
+        )
+    )
+    if not lookup.value:
+        raise_if_unavailable(AssetType.STOCK)
         raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
 
-    cache.set(cache_key, data, CACHE_TTL)
-    return data
+    return cached_json(request, cache_key, lookup, encode_quote)
 
 
-@router.get("/stocks/{symbol}/history", response_model=AssetHistory)
+@router.get(
+    "/stocks/{symbol}/history", response_model=AssetHistory | AssetHistoryColumns
+)
 def get_stock_history(
     symbol: str,
-    period: Literal["1d", "5d", "1mo", "3mo", "6mo", "1y", "5y"] = Query(default="1mo"),
+    request: Request,
+    period: StockPeriod = Query(default="1mo"),
+    format: HistoryFormat = Query(default="rows"),
+    max_points: int | None = MaxPoints,
+    store: HistoryStore = Depends(get_history_store),
 ):
     """Get historical stock data for a symbol."""
-    cache_key = f"stock_history:{symbol.upper()}:{period}"
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
+    cache_key, lookup = stock_history(symbol, period, store)
+    lookup = downsampled(cache_key, lookup, max_points)
+    return cached_json(
+        request,
+        f"{cache_key}:{max_points}:{format}",
+        lookup,
+        lambda series: encode_history(symbol, AssetType.STOCK, series, format),
+    )
 
-    data = stock_service.get_historical_data(symbol, period)
-    if not data:
-        raise HTTPException(
-            status_code=404, detail=f"No historical data found for {symbol}"
-        )
 
-    result = AssetHistory(symbol=symbol.upper(), asset_type=AssetType.STOCK, data=data)
-    cache.set(cache_key, result, HISTORY_CACHE_TTL)
-    return result
+@router.get("/stocks/{symbol}/indicators", response_model=AssetIndicators)
+def get_stock_indicators(
+    symbol: str,
+    request: Request,
+    kind: IndicatorKind,
+    period: StockPeriod = Query(default="1mo"),
+    window: int | None = IndicatorWindow,
+    std: float = IndicatorStd,
+    fast: int = MacdFast,
+    slow: int = MacdSlow,
+    signal: int = MacdSignal,
+    store: HistoryStore = Depends(get_history_store),
+):
+    """Get a technical indicator over a stock's price history."""
+    params = indicator_params(kind, window, std, fast, slow, signal)
+    history_key, history = stock_history(symbol, period, store)
+    cache_key, lookup = indicator(history_key, history, kind, params)
+    return cached_json(
+        request,
+        cache_key,
+        lookup,
+        lambda result: encode_indicator(symbol, AssetType.STOCK, kind, params, result),
+    )
 
 
 @router.get("/crypto/{symbol}", response_model=AssetDetail)
-def get_crypto(symbol: str):
+async def get_crypto(
+    symbol: str,
+    request: Request,
+    crypto: AsyncCryptoService = Depends(get_async_crypto_service),
+):
     """Get current cryptocurrency data for a symbol."""
-    cache_key = f"crypto:{symbol.upper()}"
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
-
-    data = crypto_service.get_crypto_data(symbol)
-    if not data:
+    cache_key = quote_cache_key(AssetType.CRYPTO, symbol)
+    lookup = stale_if_expired(
+        await cache.get_or_load_async(
+            cache_key,
+            lambda: fetch_crypto_quote_async(symbol, crypto),
+            quote_ttl,
+            CACHE_STALE_TTL,
+        )
+    )
+    if not lookup.value:
+        retry_after = coingecko_limiter.retry_after()
+        if retry_after:
+            raise HTTPException(
+                status_code=503,
+                detail="CoinGecko rate limit reached, try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        raise_if_unavailable(AssetType.CRYPTO)
         raise HTTPException(status_code=404, detail=f"Crypto {symbol} not found")
 
-    cache.set(cache_key, data, CACHE_TTL)
-    return data
+    return cached_json(request, cache_key, lookup, encode_quote)
 
 
-@router.get("/crypto/{symbol}/history", response_model=AssetHistory)
-def get_crypto_history(
+@router.get(
+    "/crypto/{symbol}/history", response_model=AssetHistory | AssetHistoryColumns
+)
+async def get_crypto_history(
     symbol: str,
+    request: Request,
     days: int = Query(default=30, ge=1, le=365),
+    format: HistoryFormat = Query(default="rows"),
+    max_points: int | None = MaxPoints,
+    store: HistoryStore = Depends(get_history_store),
 ):
     """Get historical cryptocurrency data for a symbol."""
-    cache_key = f"crypto_history:{symbol.upper()}:{days}"
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
+    cache_key, lookup = await crypto_history(symbol, days, store)
+    # Off the event loop: the cache may be remote and LTTB is CPU-bound
+    lookup = await run_in_threadpool(downsampled, cache_key, lookup, max_points)
+    return cached_json(
+        request,
+        f"{cache_key}:{max_points}:{format}",
+        lookup,
+        lambda series: encode_history(symbol, AssetType.CRYPTO, series, format),
+    )
+
+
+@router.get("/crypto/{symbol}/indicators", response_model=AssetIndicators)
+async def get_crypto_indicators(
+    symbol: str,
+    request: Request,
+    kind: IndicatorKind,
+    days: int = Query(default=30, ge=1, le=365),
+    window: int | None = IndicatorWindow,
+    std: float = IndicatorStd,
+    fast: int = MacdFast,
+    slow: int = MacdSlow,
+    signal: int = MacdSignal,
+    store: HistoryStore = Depends(get_history_store),
+):
+    """Get a technical indicator over a cryptocurrency's price history."""
+    params = indicator_params(kind, window, std, fast, slow, signal)
+    history_key, history = await crypto_history(symbol, days, store)
+    cache_key, lookup = await run_in_threadpool(
+        indicator, history_key, history, kind, params
+    )
+    return cached_json(
+        request,
+        cache_key,
+        lookup,
+        lambda result: encode_indicator(symbol, AssetType.CRYPTO, kind, params, result),
+    )
+
+
+def parse_quote_symbols(symbols: str) -> dict[str, tuple[AssetType, str]]:
+    """
+    Parse a comma-separated symbol list for the batch quote endpoint.
+
+    Each entry may be qualified as "stock:AAPL" or "crypto:BTC". Bare
+    symbols are treated as crypto when they are one of the pinned well-known
+    coins, else as stocks; the full coin list shares too many tickers with
+    stocks to decide by.
+
+    Returns:
+        Dict mapping each requested entry (upper-cased) to (type, symbol)
+    """
+    parsed = {}
+    for entry in symbols.split(","):
+        entry = entry.strip().upper()
+        if not entry:
+            continue
+        prefix, _, symbol = entry.rpartition(":")
+        if prefix == "STOCK":
+            parsed[entry] = (AssetType.STOCK, symbol)
+        elif prefix == "CRYPTO":
+            parsed[entry] = (AssetType.CRYPTO, symbol)
+        elif not prefix and symbol in CryptoService.SYMBOL_TO_ID:
+            parsed[entry] = (AssetType.CRYPTO, symbol)
+        else:
+            parsed[entry] = (AssetType.STOCK, entry)
+    return parsed
+
+
+async def get_cached_quote(
+    asset_type: AssetType, symbol: str
+) -> AssetDetail | None:
+    """Return a fresh cached quote, preferring the full single-asset entry."""
+    cached = await cache.get_async(quote_cache_key(asset_type, symbol))
+    if cached is None:
+        cached = await cache.get_async(batch_quote_cache_key(asset_type, symbol))
+    return cached
 
-    data = crypto_service.get_historical_data(symbol, days)
-    if not data:
+
+@router.get("/quotes", response_model=dict[str, BatchQuote])
+async def get_quotes(
+    request: Request,
+    symbols: str = Query(
+        min_length=1,
+        description='Comma-separated symbols, optionally typed ("stock:AAPL,crypto:BTC")',
+    ),
+    stocks: StockService = Depends(get_stock_service),
+    crypto: AsyncCryptoService = Depends(get_async_crypto_service),
+):
+    """Get current quotes for many stocks and cryptocurrencies at once."""
+    requested = parse_quote_symbols(symbols)
+    if len(requested) > MAX_BATCH_SYMBOLS:
         raise HTTPException(
-            status_code=404, detail=f"No historical data found for {symbol}"
+            status_code=400,
+            detail=f"At most {MAX_BATCH_SYMBOLS} symbols per request",
+        )
+
+    cached = await asyncio.gather(
+        *(get_cached_quote(*asset) for asset in requested.values())
+    )
+    quotes = dict(zip(requested, cached))
+    missing: dict[AssetType, list[str]] = {AssetType.STOCK: [], AssetType.CRYPTO: []}
+    for entry, (asset_type, symbol) in requested.items():
+        if quotes[entry] is None and symbol not in missing[asset_type]:
+            missing[asset_type].append(symbol)
+
+    async def fetch_stocks():
+        if not missing[AssetType.STOCK]:
+            return {}
+        return await run_in_threadpool(
+            stocks.get_stocks_quotes, missing[AssetType.STOCK]
         )
 
-    result = AssetHistory(symbol=symbol.upper(), asset_type=AssetType.CRYPTO, data=data)
-    cache.set(cache_key, result, HISTORY_CACHE_TTL)
-    return result
+    async def fetch_crypto():
+        if not missing[AssetType.CRYPTO]:
+            return {}
+        return await crypto.get_markets_data(missing[AssetType.CRYPTO])
+
+    # One upstream call per provider for everything not already cached
+    stock_quotes, crypto_quotes = await asyncio.gather(fetch_stocks(), fetch_crypto())
+    fetched = {AssetType.STOCK: stock_quotes, AssetType.CRYPTO: crypto_quotes}
+    for asset_type, by_symbol in fetched.items():
+        for symbol, quote in by_symbol.items():
+            await cache.set_async(
+                batch_quote_cache_key(asset_type, symbol),
+                quote,
+                CACHE_TTL,
+                CACHE_STALE_TTL,
+            )
+
+    result = {}
+    for entry, (asset_type, symbol) in requested.items():
+        quote = quotes[entry] or fetched[asset_type].get(symbol)
+        if quote is None:
+            result[entry] = BatchQuote(
+                error=f"{asset_type.value.capitalize()} {symbol} not found"
+            )
+        else:
+            result[entry] = BatchQuote(asset=quote)
+    # Quotes in a batch expire at different times; clients revalidate
+    encoded = EncodedBody(
+        orjson.dumps({entry: quote.model_dump() for entry, quote in result.items()})
+    )
+    return conditional_json(request, encoded, "public, no-cache")
 
 
 @router.get("/search", response_model=list[SearchResult])
 def search_assets(
+    request: Request,
     query: str = Query(min_length=1),
     asset_type: Literal["all", "stock", "crypto"] = Query(default="all"),
+    stocks: StockService = Depends(get_stock_service),
+    crypto: CryptoService = Depends(get_crypto_service),
 ):
     """Search for stocks and/or cryptocurrencies."""
     results: list[SearchResult] = []
 
     if asset_type in ("all", "stock"):
-        results.extend(stock_service.search_stocks(query))
+        results.extend(stocks.search_stocks(query))
 
     if asset_type in ("all", "crypto"):
-        results.extend(crypto_service.search_crypto(query))
+        results.extend(crypto.search_crypto(query))
 
-    return results
+    encoded = EncodedBody(orjson.dumps([result.model_dump() for result in results]))
+    return conditional_json(
+        request, encoded, f"public, max-age={int(CACHE_TTL.total_seconds())}"
+    )
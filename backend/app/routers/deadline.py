@@ -0,0 +1,25 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services import deadline
+from app.services.resilience import REQUEST_DEADLINE_SECONDS
+
+
+class DeadlineMiddleware:
+    """
+    Give each API request a deadline for the upstream calls it makes.
+
+    The deadline follows the request into its route, threadpool and the
+    provider call layer, so a degraded provider costs a request at most
+    its budget. Routes may narrow it further with deadline().
+    """
+
+    def __init__(self, app: ASGIApp, seconds: float = REQUEST_DEADLINE_SECONDS):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with deadline(self.seconds):
+            await self.app(scope, receive, send)
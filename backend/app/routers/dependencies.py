@@ -0,0 +1,59 @@
+"""
+Route dependencies handing out the app's shared provider services.
+
+Every router gets the same instances, created once in app.services, so
+they share connection pools, rate limiters and circuit breakers. Tests
+and benchmarks can swap them through app.dependency_overrides. The stream
+hub and the prefetcher outlive any request, so they are bound to the
+shared instances when created instead.
+"""
+from fastapi import Depends
+
+from app.services import (
+    AsyncCryptoService,
+    CryptoService,
+    HistoryStore,
+    StockService,
+    async_crypto_service,
+    crypto_service,
+    history_store,
+    stock_service,
+)
+
+
+def get_stock_service() -> StockService:
+    return stock_service
+
+
+def get_crypto_service() -> CryptoService:
+    return crypto_service
+
+
+def get_async_crypto_service() -> AsyncCryptoService:
+    return async_crypto_service
+
+
+def get_history_store(
+    stocks: StockService = Depends(get_stock_service),
+    crypto: CryptoService = Depends(get_crypto_service),
+    crypto_async: AsyncCryptoService = Depends(get_async_crypto_service),
+) -> HistoryStore:
+    """
+    The shared history store, or one fetching through overridden services.
+
+    The store itself holds no state besides its database, so a request
+    whose provider services were swapped gets a store bound to them.
+    """
+    if (
+        stocks is history_store.stock_service
+        and crypto is history_store.crypto_service
+        and crypto_async is history_store.async_crypto_service
+    ):
+        return history_store
+    return HistoryStore(
+        stocks,
+        crypto,
+        crypto_async,
+        history_store.session_factory,
+        history_store.refresh_interval,
+    )
@@ -0,0 +1,167 @@
+import time
+
+from fastapi import APIRouter, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services import cache, coingecko_limiter, provider_calls, response_cache
+from app.services.resilience import CircuitBreaker
+from app.services.metrics import (
+    Samples,
+    http_request_duration,
+    http_requests_in_flight,
+    registry,
+)
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsMiddleware:
+    """
+    Record in-flight requests and latency per route template and status.
+
+    Routes are labelled by their path template ("/api/assets/stocks/{symbol}")
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            http_request_duration.labels(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status),
+            ).observe(time.perf_counter() - start)
+
+
+def collect_cache() -> list[tuple[str, str, str, Samples]]:
+    """Cache counters per key namespace, read from the cache's own stats."""
+    samples: dict[str, Samples] = {
+        "hits": [],
+        "misses": [],
+        "stale_hits": [],
+        "expired": [],
+        "evictions": [],
+    }
+    for namespace, stats in cache.namespace_stats().items():
+        for name, value in stats.items():
+            samples[name].append(({"namespace": namespace}, value))
+    bodies = response_cache.stats()
+    return [
+        (
+            f"cache_{name}_total",
+            "counter",
+            f"Cache {name.replace('_', ' ')} by key namespace",
+            values,
+        )
+        for name, values in samples.items()
+    ] + [
+        (
+            "response_cache_requests_total",
+            "counter",
+            "Encoded response body lookups by result",
+            [({"result": "hit"}, bodies["hits"]), ({"result": "miss"}, bodies["misses"])],
+        ),
+        ("response_cache_bytes", "gauge", "Encoded response bytes held", [({}, bodies["bytes"])]),
+    ]
+
+
+def collect_rate_limiter() -> list[tuple[str, str, str, Samples]]:
+    """CoinGecko rate limiter queue depth and outcomes."""
+    stats = coingecko_limiter.stats()
+    return [
+        (
+            "coingecko_rate_limit_queue_depth",
+            "gauge",
+            "Calls waiting for a CoinGecko rate limit token by priority",
+            [({"priority": p}, depth) for p, depth in stats["queue_depth"].items()],
+        ),
+        (
+            "coingecko_rate_limit_rejected_total",
+            "counter",
+            "Calls that gave up waiting for a rate limit token",
+            [({}, stats["rejected"])],
+        ),
+        (
+            "coingecko_rate_limit_blocked_seconds",
+            "gauge",
+            "Seconds until the rate limiter's 429 backoff ends",
+            [({}, stats["blocked_for_seconds"])],
+        ),
+    ]
+
+
+# Gauge values of circuit breaker states
+BREAKER_STATES = {
+    CircuitBreaker.CLOSED: 0,
+    CircuitBreaker.HALF_OPEN: 1,
+    CircuitBreaker.OPEN: 2,
+}
+
+
+def collect_circuit_breakers() -> list[tuple[str, str, str, Samples]]:
+    """Breaker state, openings, rejections and hedges per provider operation."""
+    samples: dict[str, Samples] = {"state": [], "opened": [], "rejected": [], "hedged": []}
+    for (provider, operation), stats in provider_calls.stats().items():
+        labels = {"provider": provider, "operation": operation}
+        samples["state"].append((labels, BREAKER_STATES[stats["state"]]))
+        for name in ("opened", "rejected", "hedged"):
+            samples[name].append((labels, stats[name]))
+    return [
+        (
+            "circuit_breaker_state",
+            "gauge",
+            "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+            samples["state"],
+        ),
+        (
+            "circuit_breaker_opened_total",
+            "counter",
+            "Times a circuit breaker opened",
+            samples["opened"],
+        ),
+        (
+            "circuit_breaker_rejected_total",
+            "counter",
+            "Calls rejected by an open circuit breaker",
+            samples["rejected"],
+        ),
+        (
+            "upstream_hedged_requests_total",
+            "counter",
+            "Second attempts sent for slow upstream calls",
+            samples["hedged"],
+        ),
+    ]
+
+
+registry.add_collector(collect_cache)
+registry.add_collector(collect_rate_limiter)
+registry.add_collector(collect_circuit_breakers)
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """Metrics in the Prometheus text exposition format."""
+    return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import logging
+from functools import partial
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+
+from app.routers.assets import (
+    CACHE_STALE_TTL,
+    CACHE_TTL,
+    MAX_BATCH_SYMBOLS,
+    batch_quote_cache_key,
+    parse_quote_symbols,
+)
+from app.routers.dependencies import get_async_crypto_service, get_stock_service
+from app.schemas import AssetDetail, AssetType
+from app.services import (
+    AsyncCryptoService,
+    PriceStreamHub,
+    Priority,
+    StockService,
+    Subscriber,
+    cache,
+    quote_store,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/stream", tags=["stream"])
+
+
+async def fetch_latest_quotes(
+    asset_type: AssetType,
+    symbols: list[str],
+    stocks: StockService,
+    crypto: AsyncCryptoService,
+) -> dict[str, AssetDetail]:
+    """
+    Fetch quotes upstream for the stream pollers.
+
+    Pollers bypass the cache so they see new prices, but store what they
+    fetch in it so HTTP requests benefit too. The cache entries are the
+    batch quote ones: market data quotes lack the description, so they
+    must not replace single-asset entries, nor the quote store snapshots
+    those are loaded from. Crypto
+    quotes come from a single /coins/markets call; stocks are fetched one by
+    one, since the bulk download lacks names and market caps.
+    """
+    if asset_type == AssetType.STOCK:
+        fetched = await asyncio.gather(
+            *(run_in_threadpool(stocks.get_stock_data, s) for s in symbols)
+        )
+        quotes = {s: q for s, q in zip(symbols, fetched) if q is not None}
+    else:
+        quotes = await crypto.get_markets_data(symbols, Priority.BACKGROUND)
+    for symbol, quote in quotes.items():
+        await cache.set_async(
+            batch_quote_cache_key(asset_type, symbol),
+            quote,
+            CACHE_TTL,
+            CACHE_STALE_TTL,
+        )
+        if asset_type == AssetType.STOCK:
+            quote_store.save(quote)
+    return quotes
+
+
+# Shared by every connection, so it polls through the shared services
+price_hub = PriceStreamHub(
+    partial(
+        fetch_latest_quotes,
+        stocks=get_stock_service(),
+        crypto=get_async_crypto_service(),
+    )
+)
+
+
+def get_price_hub() -> PriceStreamHub:
+    return price_hub
+
+
+async def send_updates(websocket: WebSocket, subscriber: Subscriber) -> None:
+    """Forward queued updates to the client until the connection closes."""
+    while True:
+        message = await subscriber.queue.get()
+        await websocket.send_json(message)
+
+
+def log_send_failure(sender: asyncio.Task) -> None:
+    """Log why a connection's sender stopped, unless it was closed or cancelled."""
+    if sender.cancelled():
+        return
+    error = sender.exception()
+    if error is not None and not isinstance(error, WebSocketDisconnect):
+        logger.error(f"Error sending stream updates: {error!r}")
+
+
+@router.websocket("/ws")
+async def stream_prices(
+    websocket: WebSocket, hub: PriceStreamHub = Depends(get_price_hub)
+):
+    """
+    Stream price changes for subscribed assets.
+
+    Clients send {"action": "subscribe" | "unsubscribe", "symbols":
+    "stock:AAPL,crypto:BTC"}, using the same symbol syntax as the batch
+    quote endpoint. The server sends {"type": "quote", "data": {...}}
+    whenever a subscribed asset's price changes, starting with the latest
+    known quote.
+    """
+    await websocket.accept()
+    subscriber = Subscriber()
+    sender = asyncio.create_task(send_updates(websocket, subscriber))
+    sender.add_done_callback(log_send_failure)
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                action = message["action"]
+                requested = parse_quote_symbols(message["symbols"])
+            except (ValueError, KeyError, TypeError, AttributeError):
+                await websocket.send_json(
+                    {"type": "error", "detail": "Expected {\"action\": ..., \"symbols\": ...}"}
+                )
+                continue
+
+            if action == "subscribe":
+                if len(subscriber.assets | set(requested.values())) > MAX_BATCH_SYMBOLS:
+                    await websocket.send_json(
+                        {
+                            "type": "error",
+                            "detail": f"At most {MAX_BATCH_SYMBOLS} symbols per connection",
+                        }
+                    )
+                    continue
+                for asset_type, symbol in requested.values():
+                    hub.subscribe(subscriber, asset_type, symbol)
+            elif action == "unsubscribe":
+                for asset_type, symbol in requested.values():
+                    hub.unsubscribe(subscriber, asset_type, symbol)
+            else:
+                await websocket.send_json(
+                    {"type": "error", "detail": f"Unknown action {action!r}"}
+                )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.disconnect(subscriber)
+        sender.cancel()
+        if subscriber.dropped:
+            logger.info(f"Stream client dropped {subscriber.dropped} stale updates")
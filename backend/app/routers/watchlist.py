@@ -1,77 +1,300 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import copy_context
+from functools import partial
 
-from app.database import get_db
-from app.models import Watchlist, AssetType
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import SessionLocal, dialect_insert, get_async_db, serialized_writes
+from app.models import DEFAULT_OWNER, Watchlist, AssetType
+from app.routers.assets import (
+    CACHE_STALE_TTL,
+    conditional_json,
+    fetch_quote,
+    parse_quote_symbols,
+    quote_cache_key,
+    quote_ttl,
+    refresh_quote,
+    stale_if_expired,
+)
+from app.routers.dependencies import get_crypto_service, get_stock_service
+from app.schemas import AssetType as QuoteAssetType
 from app.schemas import WatchlistItemCreate, WatchlistItemResponse
-from app.services import StockService, CryptoService
+from app.services import (
+    CacheLookup,
+    CryptoService,
+    EncodedBody,
+    PrefetchScheduler,
+    StockService,
+    cache,
+    deadline,
+)
+from app.services.prefetch import (
+    PREFETCH_INTERVAL_SECONDS,
+    PREFETCH_MIN_GAP_SECONDS,
+    PREFETCH_SPREAD,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/watchlist", tags=["watchlist"])
 
-stock_service = StockService()
-crypto_service = CryptoService()
+# Upstream fetches for a watchlist run on a bounded pool so one large
+# watchlist can't open an unbounded number of provider connections.
+WATCHLIST_MAX_WORKERS = int(os.getenv("WATCHLIST_MAX_WORKERS", "8"))
+# Overall deadline (seconds) for resolving a watchlist's asset data.
+WATCHLIST_FETCH_TIMEOUT = float(os.getenv("WATCHLIST_FETCH_TIMEOUT", "5"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=WATCHLIST_MAX_WORKERS, thread_name_prefix="watchlist"
+)
+
+# Items per page of GET /api/watchlist/, and the most a client may ask for
+WATCHLIST_PAGE_SIZE = int(os.getenv("WATCHLIST_PAGE_SIZE", "100"))
+WATCHLIST_MAX_PAGE_SIZE = int(os.getenv("WATCHLIST_MAX_PAGE_SIZE", "500"))
+
+# Clients pick their watchlist with this header; without it they share the
+# default list. The header is an unauthenticated label, not access control:
+# anyone sending a given value reads and edits that list. Pages after the
+# first are requested with ?after=<cursor>.
+OWNER_HEADER = "X-Owner-Id"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Kept warm besides the watchlist: the dashboard's market indicators
+PREFETCH_SYMBOLS = os.getenv("PREFETCH_SYMBOLS", "stock:SPY,crypto:BTC")
+PREFETCH_WATCHLIST = os.getenv("PREFETCH_WATCHLIST", "true").lower() == "true"
+# Most watchlist symbols kept warm, those on the most watchlists first;
+# defaults to as many as one pass fits at the minimum refresh gap
+PREFETCH_MAX_SYMBOLS = int(
+    os.getenv(
+        "PREFETCH_MAX_SYMBOLS",
+        str(int(PREFETCH_INTERVAL_SECONDS * PREFETCH_SPREAD / PREFETCH_MIN_GAP_SECONDS)),
+    )
+)
+
+
+def prefetch_targets() -> set[tuple[QuoteAssetType, str]]:
+    """
+    Quotes the prefetch scheduler keeps warm.
+
+    PREFETCH_SYMBOLS always, then up to PREFETCH_MAX_SYMBOLS watchlist
+    symbols by the number of owners watching them.
+    """
+    targets = set(parse_quote_symbols(PREFETCH_SYMBOLS).values())
+    if PREFETCH_WATCHLIST and PREFETCH_MAX_SYMBOLS > 0:
+        symbol = func.upper(Watchlist.symbol)
+        watchers = func.count(func.distinct(Watchlist.owner))
+        query = (
+            select(Watchlist.asset_type, symbol)
+            .group_by(Watchlist.asset_type, symbol)
+            .order_by(watchers.desc(), symbol)
+            .limit(PREFETCH_MAX_SYMBOLS)
+        )
+        with SessionLocal() as db:
+            targets.update(
+                (QuoteAssetType(asset_type.value), symbol)
+                for asset_type, symbol in db.execute(query)
+            )
+    return targets
+
+
+# Started and stopped by the app lifespan
+prefetcher = PrefetchScheduler(
+    prefetch_targets,
+    partial(refresh_quote, stocks=get_stock_service(), crypto=get_crypto_service()),
+    lambda asset_type, symbol: cache.ttl_remaining(quote_cache_key(asset_type, symbol)),
+)
+
+
+def get_owner(
+    owner: str | None = Header(default=None, alias=OWNER_HEADER, max_length=64),
+) -> str:
+    """
+    The watchlist owner of a request, as the client names it.
+
+    The app has no authentication, so this only separates lists; it is not
+    an access-control boundary. Deployments exposing the API to untrusted
+    clients should set the header from an authenticating proxy.
+    """
+    return owner or DEFAULT_OWNER
+
+
+def get_asset_info(
+    asset_type: AssetType, symbol: str, stocks: StockService, crypto: CryptoService
+) -> CacheLookup:
+    """Fetch current asset data based on type, using the shared cache."""
+    return stale_if_expired(
+        cache.get_or_load(
+            quote_cache_key(asset_type, symbol),
+            lambda: fetch_quote(asset_type, symbol, stocks, crypto),
+            quote_ttl,
+            CACHE_STALE_TTL,
+        )
+    )
 
 
-def get_asset_info(asset_type: AssetType, symbol: str):
-    """Fetch current asset data based on type."""
-    if asset_type == AssetType.STOCK:
-        return stock_service.get_stock_data(symbol)
-    return crypto_service.get_crypto_data(symbol)
+def get_assets_info(
+    items: list[Watchlist],
+    stocks: StockService,
+    crypto: CryptoService,
+    timeout: float = WATCHLIST_FETCH_TIMEOUT,
+):
+    """
+    Fetch asset data for many watchlist items concurrently.
+
+    Args:
+        items: Watchlist rows to resolve
+        stocks: Service fetching stock quotes
+        crypto: Service fetching crypto quotes
+        timeout: Overall deadline in seconds for all fetches
+
+    Returns:
+        Dict mapping (asset_type, symbol) to a CacheLookup; symbols that
+        failed or missed the deadline have a value of None
+    """
+    keys = {(item.asset_type, item.symbol.upper()) for item in items}
+    # Upstream calls share the deadline; each runs in a copy of this context
+    with deadline(timeout):
+        futures = {
+            key: _executor.submit(
+                copy_context().run, get_asset_info, *key, stocks, crypto
+            )
+            for key in keys
+        }
+    wait(futures.values(), timeout=timeout)
+
+    results = {}
+    for key, future in futures.items():
+        if not future.done():
+            future.cancel()
+            logger.warning(f"Timed out fetching asset data for {key[1]}")
+            results[key] = CacheLookup(None)
+        elif future.exception() is not None:
+            logger.error(f"Error fetching asset data for {key[1]}: {future.exception()}")
+            results[key] = CacheLookup(None)
+        else:
+            results[key] = future.result()
+    return results
 
 
 @router.get("/", response_model=list[WatchlistItemResponse])
-def get_watchlist(db: Session = Depends(get_db)):
-    """Get all watchlist items with current asset data."""
-    items = db.query(Watchlist).all()
+async def get_watchlist(
+    request: Request,
+    limit: int = Query(WATCHLIST_PAGE_SIZE, ge=1, le=WATCHLIST_MAX_PAGE_SIZE),
+    after: int | None = Query(None, description="Cursor from the previous page"),
+    owner: str = Depends(get_owner),
+    db: AsyncSession = Depends(get_async_db),
+    stocks: StockService = Depends(get_stock_service),
+    crypto: CryptoService = Depends(get_crypto_service),
+):
+    """
+    Get a page of the owner's watchlist items with current asset data.
+
+    Items come in the order they were added. When more follow, the
+    response carries the cursor for the next page in X-Next-Cursor.
+    """
+    query = select(Watchlist).where(Watchlist.owner == owner)
+    if after is not None:
+        query = query.where(Watchlist.id > after)
+    # One extra row tells whether another page follows
+    items = (await db.scalars(query.order_by(Watchlist.id).limit(limit + 1))).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    # Symbols shared with other owners resolve through the same cache
+    # entries, and concurrent misses for one symbol share a single fetch
+    assets_info = await run_in_threadpool(get_assets_info, items, stocks, crypto)
 
     result = []
+    stale = False
     for item in items:
-        asset_info = get_asset_info(item.asset_type, item.symbol)
+        lookup = assets_info[(item.asset_type, item.symbol.upper())]
+        stale = stale or lookup.stale
         result.append(
             WatchlistItemResponse(
                 id=item.id,
                 asset_type=item.asset_type,
                 symbol=item.symbol,
                 added_at=item.added_at,
-                asset_info=asset_info,
+                asset_info=lookup.value,
             )
         )
 
-    return result
+    # Edited through this API, so clients revalidate rather than reuse it
+    encoded = EncodedBody(orjson.dumps([item.model_dump() for item in result]))
+    response = conditional_json(request, encoded, "private, no-cache", stale)
+    if has_more:
+        response.headers[NEXT_CURSOR_HEADER] = str(items[-1].id)
+    return response
+
+
+async def insert_item(
+    db: AsyncSession, owner: str, asset_type: AssetType, symbol: str
+) -> Watchlist | None:
+    """
+    Insert a watchlist item unless the owner already has the asset.
+
+    Returns:
+        The new item, or None if it was already in the owner's watchlist
+    """
+    insert = dialect_insert(db)
+    async with serialized_writes():
+        if insert is None:
+            item = Watchlist(owner=owner, asset_type=asset_type, symbol=symbol)
+            db.add(item)
+            try:
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+                return None
+            return item
+
+        stmt = (
+            insert(Watchlist)
+            .values(owner=owner, asset_type=asset_type, symbol=symbol)
+            .on_conflict_do_nothing(
+                index_elements=[Watchlist.owner, Watchlist.asset_type, Watchlist.symbol]
+            )
+            .returning(Watchlist)
+        )
+        item = (await db.scalars(stmt)).first()
+        await db.commit()
+    return item
 
 
 @router.post("/", response_model=WatchlistItemResponse, status_code=201)
-def add_to_watchlist(item: WatchlistItemCreate, db: Session = Depends(get_db)):
-    """Add a new asset to the watchlist."""
+async def add_to_watchlist(
+    item: WatchlistItemCreate,
+    owner: str = Depends(get_owner),
+    db: AsyncSession = Depends(get_async_db),
+    stocks: StockService = Depends(get_stock_service),
+    crypto: CryptoService = Depends(get_crypto_service),
+):
+    """Add a new asset to the owner's watchlist."""
     # Check if asset exists
-    asset_info = get_asset_info(item.asset_type, item.symbol)
+    lookup = await run_in_threadpool(
+        get_asset_info, item.asset_type, item.symbol, stocks, crypto
+    )
+    asset_info = lookup.value
     if not asset_info:
         raise HTTPException(
             status_code=404,
             detail=f"{item.asset_type.value.capitalize()} {item.symbol} not found",
         )
 
-    # Check for duplicate
-    existing = (
-        db.query(Watchlist)
-        .filter(Watchlist.symbol == item.symbol.upper())
-        .first()
-    )
-    if existing:
+    # The unique (owner, asset_type, symbol) index rejects duplicates
+    watchlist_item = await insert_item(db, owner, item.asset_type, item.symbol.upper())
+    if watchlist_item is None:
         raise HTTPException(
             status_code=400,
             detail=f"{item.symbol} is already in your watchlist",
         )
 
-    # Create watchlist item
-    watchlist_item = Watchlist(
-        asset_type=item.asset_type,
-        symbol=item.symbol.upper(),
-    )
-    db.add(watchlist_item)
-    db.commit()
-    db.refresh(watchlist_item)
-
     return WatchlistItemResponse(
         id=watchlist_item.id,
         asset_type=watchlist_item.asset_type,
@@ -82,13 +305,18 @@ def add_to_watchlist(item: WatchlistItemCreate, db: Session = Depends(get_db)):
 
 
 @router.delete("/{item_id}")
-def remove_from_watchlist(item_id: int, db: Session = Depends(get_db)):
-    """Remove an item from the watchlist."""
-    item = db.query(Watchlist).filter(Watchlist.id == item_id).first()
-    if not item:
+async def remove_from_watchlist(
+    item_id: int,
+    owner: str = Depends(get_owner),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Remove an item from the owner's watchlist."""
+    item = await db.get(Watchlist, item_id)
+    if not item or item.owner != owner:
         raise HTTPException(status_code=404, detail="Watchlist item not found")
 
-    db.delete(item)
-    db.commit()
+    await db.delete(item)
+    async with serialized_writes():
+        await db.commit()
 
     return {"message": f"Removed {item.symbol} from watchlist"}
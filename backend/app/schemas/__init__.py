@@ -5,7 +5,10 @@ from app.schemas.asset import (
     AssetDetail,
     HistoricalDataPoint,
     AssetHistory,
+    AssetHistoryColumns,
+    AssetIndicators,
     WatchlistItemCreate,
     WatchlistItemResponse,
     SearchResult,
+    BatchQuote,
 )
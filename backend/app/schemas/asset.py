@@ -45,6 +45,27 @@ class AssetHistory(BaseModel):
     data: list[HistoricalDataPoint]
 
 
+class AssetHistoryColumns(BaseModel):
+    """Columnar history: parallel arrays, timestamps in Unix epoch ms (UTC)."""
+
+    symbol: str
+    asset_type: AssetType
+    timestamps: list[int]
+    prices: list[float]
+    volumes: list[float | None]
+
+
+class AssetIndicators(BaseModel):
+    """Indicator lines parallel to epoch-ms timestamps; null while warming up."""
+
+    symbol: str
+    asset_type: AssetType
+    kind: str
+    params: dict[str, float]
+    timestamps: list[int]
+    values: dict[str, list[float | None]]
+
+
 class WatchlistItemCreate(BaseModel):
     asset_type: AssetType
     symbol: str = Field(max_length=20)
@@ -65,3 +86,8 @@ class SearchResult(BaseModel):
     name: str
     asset_type: AssetType
     exchange: str | None = None
+
+
+class BatchQuote(BaseModel):
+    asset: AssetDetail | None = None
+    error: str | None = None
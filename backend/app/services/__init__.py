@@ -1,3 +1,40 @@
-from app.services.stock_service import StockService
-from app.services.crypto_service import CryptoService
-from app.services.cache import SimpleCache, cache
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    ProviderCalls,
+    ProviderUnavailable,
+    deadline,
+    provider_calls,
+)
+from app.services.stock_service import StockService, stock_service
+from app.services.stock_index import StockIndex, stock_index
+from app.services.rate_limiter import Priority, RateLimiter, coingecko_limiter
+from app.services.search_index import SearchIndex
+from app.services.coin_index import CoinIndex, coin_index
+from app.services.crypto_service import (
+    AsyncCryptoService,
+    CryptoService,
+    async_crypto_service,
+    crypto_service,
+)
+from app.services.cache import BaseCache, CacheLookup, RedisCache, TTLCache, cache
+from app.services.singleflight import SingleFlight, singleflight
+from app.services.response_cache import (
+    EncodedBody,
+    ResponseCache,
+    choose_encoding,
+    response_cache,
+)
+from app.services.quote_store import QuoteStore, quote_store
+from app.services.history_store import HistoryStore, history_store
+from app.services.series import PriceSeries
+from app.services.downsample import downsample, lttb_indices
+from app.services.indicators import (
+    INDICATOR_LINES,
+    IndicatorKind,
+    IndicatorSeries,
+    compute_indicator,
+)
+from app.services.price_stream import PriceStreamHub, Subscriber
+from app.services.prefetch import PrefetchScheduler
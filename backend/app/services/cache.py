@@ -1,14 +1,191 @@
-from datetime import datetime, timedelta
-from typing import Any
+import asyncio
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, NamedTuple
 
+from pydantic import BaseModel
 
-class SimpleCache:
-    """Simple in-memory cache with TTL support."""
+from app.services import cache_codec
+from app.services.singleflight import SingleFlight, singleflight
 
-    DEFAULT_TTL = timedelta(minutes=5)
+logger = logging.getLogger(__name__)
+
+# "memory" keeps a cache per process; "redis" shares one across workers
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "dashboard:")
+# Fail fast to upstream fetches if Redis stops answering
+CACHE_REDIS_TIMEOUT = float(os.getenv("CACHE_REDIS_TIMEOUT", "0.5"))
+# Per-worker L1 in front of Redis; 0 disables it
+CACHE_L1_SECONDS = float(os.getenv("CACHE_L1_SECONDS", "5"))
+CACHE_L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", "1000"))
+
+# Header of Redis entries: wall-clock time the TTL ends
+_EXPIRY = struct.Struct("<d")
+
+
+def _approx_size(value: Any) -> int:
+    """
+    Roughly estimate the memory footprint of a cached value in bytes.
+
+    Pydantic models are measured by their JSON size, which tracks the real
+    footprint closely enough for budgeting without walking object graphs.
+    """
+    if isinstance(value, BaseModel):
+        return len(value.model_dump_json())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_approx_size(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            _approx_size(k) + _approx_size(v) for k, v in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+def _namespace(key: str) -> str:
+    """Return the key namespace, e.g. "stock" for "stock:AAPL"."""
+    return key.split(":", 1)[0]
+
+
+class CacheLookup(NamedTuple):
+    """
+    Result of a cache lookup.
+
+    Attributes:
+        value: Cached or loaded value
+        stale: True when serving an expired value
+        expires_in: Seconds until the value's TTL runs out (0 if stale)
+    """
+
+    value: Any
+    stale: bool = False
+    expires_in: float = 0.0
+
+
+class CacheStats:
+    """Hit/miss/eviction counters for a single key namespace."""
+
+    __slots__ = ("hits", "misses", "expired", "evictions", "stale_hits")
 
     def __init__(self):
-        self._cache: dict[str, tuple[Any, datetime]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.stale_hits = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "stale_hits": self.stale_hits,
+        }
+
+
+class BaseCache:
+    """
+    Cache interface shared by the in-memory and Redis backends.
+
+    Backends implement storage (_lookup, _fresh, set, delete, ttl_remaining,
+    clear, stats); loading through get_or_load, miss coalescing and
+    stale-while-revalidate refreshes are implemented once here.
+
+    Entries may be written with a stale window past their TTL. Within it,
+    get_or_load serves the expired value immediately and refreshes it in
+    the background; past it the entry is gone.
+
+    Coroutines use the *_async methods. Backends whose storage calls do
+    network I/O set blocking, and those calls then run on a worker thread
+    instead of the event loop.
+    """
+
+    DEFAULT_TTL = timedelta(minutes=5)
+
+    # Storage calls block on network I/O
+    blocking = False
+
+    def __init__(self, flight: SingleFlight | None = None):
+        self._stats: dict[str, CacheStats] = {}
+        self._stats_lock = threading.Lock()
+        self._flight = flight or singleflight
+        self._refreshing: set[str] = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="cache-refresh"
+        )
+        self._refresh_tasks: set[asyncio.Task] = set()
+
+    def _stats_for(self, key: str) -> CacheStats:
+        namespace = _namespace(key)
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = CacheStats()
+        return stats
+
+    def _namespace_stats(self) -> dict[str, dict[str, int]]:
+        return {
+            namespace: stats.as_dict() for namespace, stats in list(self._stats.items())
+        }
+
+    def namespace_stats(self) -> dict[str, dict[str, int]]:
+        """Per-namespace counters of this process, without sizing the cache."""
+        with self._stats_lock:
+            return self._namespace_stats()
+
+    def _lookup(self, key: str) -> CacheLookup | None:
+        """Look up a key, returning fresh or stale values and updating stats."""
+        raise NotImplementedError
+
+    def _fresh(self, key: str) -> Any | None:
+        """Return the value only if it is within its TTL, without stats."""
+        raise NotImplementedError
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: timedelta | None = None,
+        stale_ttl: timedelta | None = None,
+    ) -> None:
+        """
+        Set value in cache with TTL.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live (defaults to 5 minutes)
+            stale_ttl: How long past the TTL the value may still be served
+                stale while it is refreshed (defaults to no stale window)
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry if present."""
+        raise NotImplementedError
+
+    def ttl_remaining(self, key: str) -> float:
+        """Seconds until a key's TTL runs out; 0 if missing or already expired."""
+        raise NotImplementedError
+
+    def purge_expired(self) -> None:
+        """Drop every expired entry now, if the backend doesn't on its own."""
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of cache size and per-namespace counters."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Clear all cache entries."""
+        raise NotImplementedError
 
     def get(self, key: str) -> Any | None:
         """
@@ -20,34 +197,558 @@ class SimpleCache:
         Returns:
             Cached value or None if not found/expired
         """
-        entry = self._cache.get(key)
-        if entry is None:
+        lookup = self._lookup(key)
+        if lookup is None or lookup.stale:
             return None
+        return lookup.value
 
-        value, expiry = entry
-        if datetime.now() > expiry:
-            del self._cache[key]
+    async def _offload(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a storage call, on a worker thread if it blocks."""
+        if not self.blocking:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    async def _lookup_async(self, key: str) -> CacheLookup | None:
+        return await self._offload(self._lookup, key)
+
+    async def _fresh_async(self, key: str) -> Any | None:
+        return await self._offload(self._fresh, key)
+
+    async def set_async(
+        self,
+        key: str,
+        value: Any,
+        ttl: timedelta | None = None,
+        stale_ttl: timedelta | None = None,
+    ) -> None:
+        """Async variant of set."""
+        await self._offload(self.set, key, value, ttl, stale_ttl)
+
+    async def ttl_remaining_async(self, key: str) -> float:
+        """Async variant of ttl_remaining."""
+        return await self._offload(self.ttl_remaining, key)
+
+    async def get_async(self, key: str) -> Any | None:
+        """Async variant of get."""
+        lookup = await self._lookup_async(key)
+        if lookup is None or lookup.stale:
             return None
+        return lookup.value
 
-        return value
+    def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: timedelta | Callable[[Any], timedelta] | None = None,
+        stale_ttl: timedelta | None = None,
+    ) -> CacheLookup:
+        """
+        Get value from cache, loading it on a miss.
+
+        Concurrent misses for the same key are coalesced so only one caller
+        runs the loader; the rest wait for its result or exception. An
+        expired value still inside its stale window is returned immediately
+        and refreshed on a background thread.
 
-    def set(self, key: str, value: Any, ttl: timedelta | None = None) -> None:
+        Args:
+            key: Cache key
+            loader: Zero-argument callable fetching the value
+            ttl: Time to live for the loaded value, or a callable computing it
+                from the value
+            stale_ttl: Stale window for the loaded value
+
+        Returns:
+            CacheLookup with the cached or loaded value (None results are not
+            cached) and whether it is stale
         """
-        Set value in cache with TTL.
+
+        def load():
+            # Another caller may have filled the key while we waited to lead
+            value = self._fresh(key)
+            if value is not None:
+                return value
+            value = loader()
+            if value is not None:
+                self.set(key, value, ttl(value) if callable(ttl) else ttl, stale_ttl)
+            return value
+
+        lookup = self._lookup(key)
+        if lookup is None:
+            return self._loaded(key, self._flight.do(key, load))
+        if lookup.stale:
+            self._refresh_in_background(key, load)
+        return lookup
+
+    def _loaded(self, key: str, value: Any) -> CacheLookup:
+        if value is None:
+            return CacheLookup(None)
+        return CacheLookup(value, expires_in=self.ttl_remaining(key))
+
+    def _claim_refresh(self, key: str) -> bool:
+        """Mark a key as refreshing; False if a refresh is already queued."""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release_refresh(self, key: str) -> None:
+        with self._refresh_lock:
+            self._refreshing.discard(key)
+
+    def _refresh_in_background(self, key: str, load: Callable[[], Any]) -> None:
+        if not self._claim_refresh(key):
+            return
+
+        def refresh():
+            try:
+                self._flight.do(key, load)
+            except Exception as e:
+                logger.error(f"Background refresh failed for {key}: {e}")
+            finally:
+                self._release_refresh(key)
+
+        self._refresh_executor.submit(refresh)
+
+    async def get_or_load_async(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: timedelta | Callable[[Any], timedelta] | None = None,
+        stale_ttl: timedelta | None = None,
+    ) -> CacheLookup:
+        """
+        Async variant of get_or_load for coroutine loaders.
+
+        Stale values are refreshed on a task on the running event loop.
 
         Args:
             key: Cache key
-            value: Value to cache
-            ttl: Time to live (defaults to 5 minutes)
+            loader: Zero-argument callable returning an awaitable value
+            ttl: Time to live for the loaded value, or a callable computing it
+                from the value
+            stale_ttl: Stale window for the loaded value
+
+        Returns:
+            CacheLookup with the cached or loaded value and whether it is stale
         """
+
+        async def load():
+            value = await self._fresh_async(key)
+            if value is not None:
+                return value
+            value = await loader()
+            if value is not None:
+                await self.set_async(
+                    key, value, ttl(value) if callable(ttl) else ttl, stale_ttl
+                )
+            return value
+
+        lookup = await self._lookup_async(key)
+        if lookup is None:
+            value = await self._flight.do_async(key, load)
+            if value is None:
+                return CacheLookup(None)
+            return CacheLookup(value, expires_in=await self.ttl_remaining_async(key))
+        if lookup.stale and self._claim_refresh(key):
+            task = asyncio.create_task(self._refresh_async(key, load))
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+        return lookup
+
+    async def _refresh_async(
+        self, key: str, load: Callable[[], Awaitable[Any]]
+    ) -> None:
+        try:
+            await self._flight.do_async(key, load)
+        except Exception as e:
+            logger.error(f"Background refresh failed for {key}: {e}")
+        finally:
+            self._release_refresh(key)
+
+
+class TTLCache(BaseCache):
+    """
+    Thread-safe in-memory LRU cache with TTL support.
+
+    The cache is bounded by an entry count and an approximate byte budget;
+    once either is exceeded the least recently used entries are evicted.
+    Expired entries are dropped on read and by a periodic sweep on write.
+    Each process keeps its own copy.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: int | None = None,
+        sweep_interval: float = 60.0,
+        flight: SingleFlight | None = None,
+    ):
+        super().__init__(flight)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        # key -> (value, expiry, hard expiry, size in bytes); times are
+        # time.monotonic() and hard expiry is the end of the stale window
+        self._cache: OrderedDict[str, tuple[Any, float, float, int]] = OrderedDict()
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self._last_sweep = time.monotonic()
+
+    def _remove(self, key: str) -> None:
+        size = self._cache.pop(key)[3]
+        self._bytes -= size
+
+    def _lookup(self, key: str) -> CacheLookup | None:
+        with self._lock:
+            stats = self._stats_for(key)
+            entry = self._cache.get(key)
+            if entry is None:
+                stats.misses += 1
+                return None
+
+            value, expiry, hard_expiry, _ = entry
+            now = time.monotonic()
+            if now > hard_expiry:
+                self._remove(key)
+                stats.expired += 1
+                stats.misses += 1
+                return None
+
+            self._cache.move_to_end(key)
+            if now > expiry:
+                stats.stale_hits += 1
+                return CacheLookup(value, stale=True)
+
+            stats.hits += 1
+            return CacheLookup(value, expires_in=expiry - now)
+
+    def _fresh(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() <= entry[1]:
+                return entry[0]
+            return None
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: timedelta | None = None,
+        stale_ttl: timedelta | None = None,
+    ) -> None:
         if ttl is None:
             ttl = self.DEFAULT_TTL
-        expiry = datetime.now() + ttl
-        self._cache[key] = (value, expiry)
+        size = _approx_size(value) if self.max_bytes is not None else 0
+        now = time.monotonic()
+        expiry = now + ttl.total_seconds()
+        hard_expiry = expiry + (stale_ttl.total_seconds() if stale_ttl else 0)
+
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+            self._cache[key] = (value, expiry, hard_expiry, size)
+            self._bytes += size
+
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+            self._evict()
+
+    def ttl_remaining(self, key: str) -> float:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return 0.0
+            return max(entry[1] - time.monotonic(), 0.0)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+
+    def _sweep(self, now: float) -> None:
+        """Drop every expired entry."""
+        expired = [k for k, entry in self._cache.items() if now > entry[2]]
+        for key in expired:
+            self._remove(key)
+            self._stats_for(key).expired += 1
+        self._last_sweep = now
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until within bounds."""
+        while self._cache and (
+            len(self._cache) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._cache))
+            self._remove(key)
+            self._stats_for(key).evictions += 1
+
+    def purge_expired(self) -> None:
+        with self._lock:
+            self._sweep(time.monotonic())
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Snapshot of cache size and per-namespace counters.
+
+        Returns:
+            Dict with entry count, approximate bytes and namespace stats
+        """
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "bytes": self._bytes,
+                "namespaces": self._namespace_stats(),
+            }
 
     def clear(self) -> None:
-        """Clear all cache entries."""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class RedisCache(BaseCache):
+    """
+    Cache stored in Redis (or any server speaking its protocol), shared by
+    every worker process.
+
+    Values are serialized with cache_codec behind an 8-byte header holding
+    the wall-clock time their TTL ends, so stale entries can be told apart
+    from fresh ones. Redis drops each key itself once its stale window has
+    passed. Server errors are logged and treated as misses, so an outage
+    degrades to upstream fetches rather than failed requests.
+
+    An optional per-process L1 keeps fresh values for a few seconds to save
+    round trips on hot keys; a value changed by another worker may be
+    served from L1 until that short TTL runs out. Async lookups answered by
+    the L1 stay on the event loop; the rest go to Redis from a worker thread.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        client: Any,
+        prefix: str = "",
+        l1_ttl: timedelta | None = None,
+        l1_max_entries: int = 1_000,
+        flight: SingleFlight | None = None,
+    ):
+        """
+        Args:
+            client: redis.Redis client (decode_responses must be off)
+            prefix: Prefix added to every key, so one server can hold
+                several apps' caches
+            l1_ttl: How long values are kept in the per-process L1; None
+                disables it
+            l1_max_entries: Entry bound of the L1
+            flight: SingleFlight used to coalesce loads
+        """
+        super().__init__(flight)
+        self.client = client
+        self.prefix = prefix
+        self.l1_ttl = l1_ttl
+        self._l1 = TTLCache(max_entries=l1_max_entries) if l1_ttl else None
+        self.errors = 0
+
+    def _error(self, action: str, key: str, e: Exception) -> None:
+        with self._stats_lock:
+            self.errors += 1
+        logger.warning(f"Cache {action} failed for {key}: {e}")
+
+    def _read(self, key: str) -> tuple[Any, float] | None:
+        """Fetch and decode a key as (value, TTL end), or None on a miss."""
+        try:
+            payload = self.client.get(self.prefix + key)
+        except Exception as e:
+            self._error("read", key, e)
+            return None
+        if payload is None:
+            return None
+        try:
+            (expires_at,) = _EXPIRY.unpack_from(payload)
+            return cache_codec.decode(payload[_EXPIRY.size :]), expires_at
+        except (ValueError, struct.error) as e:
+            self._error("decode", key, e)
+            return None
+
+    def _remember(self, key: str, value: Any, expires_at: float) -> None:
+        """Keep a fresh value and its TTL end in the L1 for at most l1_ttl."""
+        remaining = expires_at - time.time()
+        if self._l1 is not None and remaining > 0:
+            self._l1.set(
+                key, (value, expires_at), min(self.l1_ttl, timedelta(seconds=remaining))
+            )
+
+    def _l1_lookup(self, key: str) -> CacheLookup | None:
+        """Look up a key in the L1 only, counting a hit."""
+        entry = self._l1._fresh(key) if self._l1 is not None else None
+        if entry is None:
+            return None
+        with self._stats_lock:
+            self._stats_for(key).hits += 1
+        return CacheLookup(entry[0], expires_in=max(entry[1] - time.time(), 0.0))
+
+    def _lookup(self, key: str) -> CacheLookup | None:
+        lookup = self._l1_lookup(key)
+        if lookup is not None:
+            return lookup
+
+        entry = self._read(key)
+        with self._stats_lock:
+            stats = self._stats_for(key)
+            if entry is None:
+                stats.misses += 1
+                return None
+            value, expires_at = entry
+            now = time.time()
+            if now > expires_at:
+                stats.stale_hits += 1
+                return CacheLookup(value, stale=True)
+            stats.hits += 1
+        self._remember(key, value, expires_at)
+        return CacheLookup(value, expires_in=expires_at - now)
+
+    async def _lookup_async(self, key: str) -> CacheLookup | None:
+        lookup = self._l1_lookup(key)
+        if lookup is not None:
+            return lookup
+        return await asyncio.to_thread(self._lookup, key)
+
+    def _fresh(self, key: str) -> Any | None:
+        if self._l1 is not None:
+            entry = self._l1._fresh(key)
+            if entry is not None:
+                return entry[0]
+        entry = self._read(key)
+        if entry is None or time.time() > entry[1]:
+            return None
+        return entry[0]
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: timedelta | None = None,
+        stale_ttl: timedelta | None = None,
+    ) -> None:
+        if ttl is None:
+            ttl = self.DEFAULT_TTL
+        expires_at = time.time() + ttl.total_seconds()
+        keep = ttl + (stale_ttl or timedelta(0))
+        keep_ms = int(keep.total_seconds() * 1000)
+        if keep_ms <= 0:
+            self.delete(key)
+            return
+        try:
+            payload = _EXPIRY.pack(expires_at) + cache_codec.encode(value)
+        except TypeError as e:
+            self._error("encode", key, e)
+            return
+        try:
+            self.client.set(self.prefix + key, payload, px=keep_ms)
+        except Exception as e:
+            self._error("write", key, e)
+            return
+        self._remember(key, value, expires_at)
+
+    def ttl_remaining(self, key: str) -> float:
+        entry = self._l1._fresh(key) if self._l1 is not None else None
+        if entry is None:
+            entry = self._read(key)
+        if entry is None:
+            return 0.0
+        return max(entry[1] - time.time(), 0.0)
+
+    def delete(self, key: str) -> None:
+        if self._l1 is not None:
+            self._l1.delete(key)
+        try:
+            self.client.delete(self.prefix + key)
+        except Exception as e:
+            self._error("delete", key, e)
+
+    def _keys(self):
+        return self.client.scan_iter(match=self.prefix + "*", count=1_000)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Snapshot of shared entry count and this process's counters.
+
+        Returns:
+            Dict with entry count (None if the server is unreachable),
+            error count, L1 stats and namespace stats
+        """
+        try:
+            entries = sum(1 for _ in self._keys())
+        except Exception as e:
+            self._error("scan", self.prefix + "*", e)
+            entries = None
+        with self._stats_lock:
+            return {
+                "entries": entries,
+                "bytes": None,
+                "errors": self.errors,
+                "l1": self._l1.stats() if self._l1 is not None else None,
+                "namespaces": self._namespace_stats(),
+            }
+
+    def clear(self) -> None:
+        """Clear every entry under this cache's prefix."""
+        if self._l1 is not None:
+            self._l1.clear()
+        try:
+            keys = list(self._keys())
+            for i in range(0, len(keys), 1_000):
+                self.client.delete(*keys[i : i + 1_000])
+        except Exception as e:
+            self._error("clear", self.prefix + "*", e)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._keys())
+
+
+def _env_int(name: str) -> int | None:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def create_cache() -> BaseCache:
+    """
+    Build the cache backend selected by CACHE_BACKEND.
+
+    Raises:
+        RuntimeError: If the Redis backend is selected without the redis
+            package installed
+        ValueError: If CACHE_BACKEND names an unknown backend
+    """
+    if CACHE_BACKEND == "memory":
+        return TTLCache(
+            max_entries=_env_int("CACHE_MAX_ENTRIES") or 10_000,
+            max_bytes=_env_int("CACHE_MAX_BYTES"),
+        )
+    if CACHE_BACKEND == "redis":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_BACKEND=redis requires the redis extra (pip install '.[redis]')"
+            ) from e
+        return RedisCache(
+            redis.Redis.from_url(
+                CACHE_REDIS_URL,
+                socket_timeout=CACHE_REDIS_TIMEOUT,
+                socket_connect_timeout=CACHE_REDIS_TIMEOUT,
+            ),
+            prefix=CACHE_KEY_PREFIX,
+            l1_ttl=timedelta(seconds=CACHE_L1_SECONDS) if CACHE_L1_SECONDS else None,
+            l1_max_entries=CACHE_L1_MAX_ENTRIES,
+        )
+    raise ValueError(f"Unknown CACHE_BACKEND {CACHE_BACKEND!r}")
 
 
-cache = SimpleCache()
+cache = create_cache()
@@ -0,0 +1,118 @@
+import json
+import struct
+from typing import Any
+
+import numpy as np
+from pydantic import BaseModel
+
+from app import schemas
+from app.services.indicators import IndicatorSeries
+from app.services.series import PriceSeries
+
+# One-byte tags identifying how the rest of a payload is encoded
+_SERIES = b"S"
+_MODEL = b"M"
+_BYTES = b"B"
+_JSON = b"J"
+_INDICATOR = b"I"
+
+_SERIES_HEADER = struct.Struct("<I")
+
+
+def encode(value: Any) -> bytes:
+    """
+    Serialize a cache value for a shared backend.
+
+    Price series are stored as their raw little-endian column buffers,
+    indicator results as their column names followed by the encoded source
+    series and the float64 columns, pydantic models as compact JSON tagged
+    with their app.schemas class name, and anything else JSON-serializable
+    as plain JSON.
+
+    Args:
+        value: Value to serialize
+
+    Returns:
+        Tagged payload
+
+    Raises:
+        TypeError: If the value has no encoding
+    """
+    if isinstance(value, PriceSeries):
+        return b"".join(
+            (
+                _SERIES,
+                _SERIES_HEADER.pack(len(value)),
+                value.epoch_ms().astype("<i8", copy=False).tobytes(),
+                value.prices.astype("<f8", copy=False).tobytes(),
+                value.volumes.astype("<f8", copy=False).tobytes(),
+            )
+        )
+    if isinstance(value, IndicatorSeries):
+        names = json.dumps(list(value.columns)).encode()
+        return b"".join(
+            (
+                _INDICATOR,
+                _SERIES_HEADER.pack(len(names)),
+                names,
+                encode(value.source),
+                *(c.astype("<f8", copy=False).tobytes() for c in value.columns.values()),
+            )
+        )
+    if isinstance(value, BaseModel):
+        name = type(value).__name__
+        if getattr(schemas, name, None) is not type(value):
+            raise TypeError(f"Cannot encode {name}: not an app.schemas model")
+        return _MODEL + name.encode() + b"\n" + value.model_dump_json().encode()
+    if isinstance(value, bytes):
+        return _BYTES + value
+    return _JSON + json.dumps(value, separators=(",", ":")).encode()
+
+
+def decode(payload: bytes) -> Any:
+    """
+    Deserialize a payload produced by encode.
+
+    Raises:
+        ValueError: If the payload is malformed or names an unknown model
+    """
+    tag, body = payload[:1], memoryview(payload)[1:]
+    if tag == _SERIES:
+        (n,) = _SERIES_HEADER.unpack_from(body)
+        offset = _SERIES_HEADER.size
+        columns = []
+        for dtype in ("<i8", "<f8", "<f8"):
+            columns.append(np.frombuffer(body, dtype=dtype, count=n, offset=offset))
+            offset += 8 * n
+        timestamps, prices, volumes = columns
+        # Copies make the arrays writable and native-endian
+        return PriceSeries(
+            timestamps.astype("datetime64[ms]"),
+            prices.astype(np.float64),
+            volumes.astype(np.float64),
+        )
+    if tag == _INDICATOR:
+        (size,) = _SERIES_HEADER.unpack_from(body)
+        offset = _SERIES_HEADER.size
+        names = json.loads(bytes(body[offset : offset + size]))
+        offset += size
+        (n,) = _SERIES_HEADER.unpack_from(body, offset + 1)
+        end = offset + 1 + _SERIES_HEADER.size + 24 * n
+        source = decode(bytes(body[offset:end]))
+        columns = {}
+        for name in names:
+            column = np.frombuffer(body, dtype="<f8", count=n, offset=end)
+            columns[name] = column.astype(np.float64)
+            end += 8 * n
+        return IndicatorSeries(source, columns)
+    if tag == _MODEL:
+        name, _, data = bytes(body).partition(b"\n")
+        model = getattr(schemas, name.decode(), None)
+        if not (isinstance(model, type) and issubclass(model, BaseModel)):
+            raise ValueError(f"Unknown cached model {name!r}")
+        return model.model_validate_json(data)
+    if tag == _BYTES:
+        return bytes(body)
+    if tag == _JSON:
+        return json.loads(bytes(body))
+    raise ValueError(f"Unknown cache payload tag {tag!r}")
@@ -0,0 +1,196 @@
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import SessionLocal
+from app.models import CryptoCoin
+from app.schemas import AssetType, SearchResult
+from app.services.search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+CRYPTO_INDEX_REFRESH_INTERVAL = timedelta(
+    hours=float(os.getenv("CRYPTO_INDEX_REFRESH_HOURS", "24"))
+)
+
+# How often the refresh thread checks whether the list is due
+_CHECK_SECONDS = 300
+
+CoinFetcher = Callable[[], list[dict] | None]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class CoinIndex:
+    """
+    Local index of CoinGecko's full coin list.
+
+    The list (id, symbol, name, market cap rank) is persisted to the
+    crypto_coins table and refreshed from CoinGecko on a background thread
+    once per refresh interval. Symbol resolution and typeahead search are
+    served from memory; where several coins share a ticker, the one with
+    the best market cap rank wins.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        refresh_interval: timedelta = CRYPTO_INDEX_REFRESH_INTERVAL,
+    ):
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self.updated_at: datetime | None = None
+        # (coin ids, ranks, index) swapped as one tuple so readers never see
+        # a half-built index
+        self._snapshot: tuple[list[str], list[int | None], SearchIndex] = (
+            [],
+            [],
+            SearchIndex([], []),
+        )
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._snapshot[0])
+
+    def build(self, coins: Iterable[dict]) -> None:
+        """
+        Rebuild the in-memory index.
+
+        Args:
+            coins: Dicts with id, symbol, name and market_cap_rank (or None)
+        """
+        coins = sorted(
+            coins,
+            key=lambda c: (c["market_cap_rank"] is None, c["market_cap_rank"] or 0, c["id"]),
+        )
+        self._snapshot = (
+            [coin["id"] for coin in coins],
+            [coin["market_cap_rank"] for coin in coins],
+            SearchIndex(
+                (coin["symbol"] for coin in coins), (coin["name"] for coin in coins)
+            ),
+        )
+
+    def resolve(self, symbol: str) -> str | None:
+        """CoinGecko id of the best-ranked coin with this symbol, or None."""
+        ids, _, index = self._snapshot
+        row = index.lookup(symbol)
+        return ids[row] if row is not None else None
+
+    def search(self, query: str, limit: int = 5) -> list[SearchResult]:
+        """
+        Search coins by symbol or name.
+
+        Args:
+            query: Search query (symbol or name fragment)
+            limit: Maximum number of results
+
+        Returns:
+            List of SearchResult with symbol, name, and market cap rank
+        """
+        _, ranks, index = self._snapshot
+        return [
+            SearchResult(
+                symbol=index.symbols[row],
+                name=index.names[row],
+                asset_type=AssetType.CRYPTO,
+                exchange=f"Rank #{ranks[row]}" if ranks[row] else None,
+            )
+            for row in index.search(query, limit)
+        ]
+
+    def load(self) -> bool:
+        """
+        Build the index from the persisted coin list.
+
+        Returns:
+            True if a persisted list was found
+        """
+        try:
+            with self.session_factory() as session:
+                rows = session.execute(
+                    select(
+                        CryptoCoin.id,
+                        CryptoCoin.symbol,
+                        CryptoCoin.name,
+                        CryptoCoin.market_cap_rank,
+                        CryptoCoin.updated_at,
+                    )
+                ).all()
+        except Exception as e:
+            logger.error(f"Error loading crypto coin list: {e}")
+            return False
+        if not rows:
+            return False
+
+        self.build(row._asdict() for row in rows)
+        self.updated_at = min(row.updated_at for row in rows)
+        return True
+
+    def refresh(self, fetch: CoinFetcher) -> bool:
+        """
+        Download the coin list, persist it and rebuild the index.
+
+        Args:
+            fetch: Callable returning the coin list, or None on failure
+
+        Returns:
+            True if the index was refreshed
+        """
+        coins = fetch()
+        if not coins:
+            return False
+
+        updated_at = _utcnow()
+        rows = [{**coin, "updated_at": updated_at} for coin in coins]
+        try:
+            with self.session_factory() as session:
+                session.execute(delete(CryptoCoin))
+                session.execute(insert(CryptoCoin), rows)
+                session.commit()
+        except Exception as e:
+            logger.error(f"Error persisting crypto coin list: {e}")
+
+        self.build(coins)
+        self.updated_at = updated_at
+        logger.info(f"Crypto coin index refreshed with {len(coins)} coins")
+        return True
+
+    def start(self, fetch: CoinFetcher) -> None:
+        """Load the persisted list and start the background refresh thread."""
+        if self._thread is not None:
+            return
+        self.load()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(fetch,), name="coin-index-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, fetch: CoinFetcher) -> None:
+        while not self._stop.is_set():
+            if self.updated_at is None or self.updated_at <= _utcnow() - self.refresh_interval:
+                try:
+                    self.refresh(fetch)
+                except Exception as e:
+                    logger.error(f"Error refreshing crypto coin list: {e}")
+            # A failed download is retried on the next check
+            self._stop.wait(_CHECK_SECONDS)
+
+
+coin_index = CoinIndex()
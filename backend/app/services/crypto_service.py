@@ -1,23 +1,86 @@
 import logging
+import os
 from datetime import datetime
 
+import httpx
+import numpy as np
 import requests
 
 from app.schemas import AssetDetail, AssetType, HistoricalDataPoint, SearchResult
+from app.services.coin_index import CoinIndex, coin_index
+from app.services.metrics import upstream_errors
+from app.services.rate_limiter import (
+    DEFAULT_WAIT,
+    Priority,
+    RateLimiter,
+    coingecko_limiter,
+    parse_retry_after,
+)
+from app.services.resilience import ProviderUnavailable, provider_calls, time_left
+from app.services.series import PriceSeries
 
 logger = logging.getLogger(__name__)
 
 # CoinGecko API base URL (free tier)
-COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
+COINGECKO_BASE_URL = os.getenv(
+    "COINGECKO_BASE_URL", "https://api.coingecko.com/api/v3"
+)
 
-# Rate limit: 10-30 calls/minute on free tier
-# Consider adding caching or rate limiting in production
+# Connection pool settings for the shared async client
+COINGECKO_TIMEOUT = float(os.getenv("COINGECKO_TIMEOUT", "10"))
+COINGECKO_MAX_CONNECTIONS = int(os.getenv("COINGECKO_MAX_CONNECTIONS", "20"))
+COINGECKO_MAX_KEEPALIVE = int(os.getenv("COINGECKO_MAX_KEEPALIVE", "10"))
+COINGECKO_KEEPALIVE_EXPIRY = float(os.getenv("COINGECKO_KEEPALIVE_EXPIRY", "30"))
 
+# Times a call is retried after a 429, once the limiter's backoff allows
+COINGECKO_MAX_RETRIES = int(os.getenv("COINGECKO_MAX_RETRIES", "1"))
 
-class CryptoService:
-    """Service for fetching cryptocurrency data using CoinGecko API."""
+# Pages of 250 coins by market cap fetched to rank the coin list
+CRYPTO_INDEX_RANK_PAGES = int(os.getenv("CRYPTO_INDEX_RANK_PAGES", "4"))
+# The index refresh runs in the background and can queue longer for tokens
+CRYPTO_INDEX_WAIT = 15.0
+
+COIN_PARAMS = {
+    "localization": "false",
+    "tickers": "false",
+    "community_data": "false",
+    "developer_data": "false",
+}
+
+
+def coingecko_operation(path: str) -> str:
+    """
+    Metrics label for a CoinGecko path.
+
+    "/coins/bitcoin" is "coins", "/coins/bitcoin/market_chart" is
+    "market_chart", "/coins/markets" is "markets", "/coins/list" is
+    "coins_list" and "/search" is "search".
+    """
+    parts = path.strip("/").split("/")
+    if parts[0] != "coins" or len(parts) == 1:
+        return parts[0]
+    if len(parts) == 2:
+        return {"list": "coins_list", "markets": "markets"}.get(parts[1], "coins")
+    return parts[-1]
+
+
+def count_status_error(operation: str, status_code: int) -> None:
+    """Count a CoinGecko error response (429 included) for metrics."""
+    if status_code >= 400:
+        upstream_errors.labels("coingecko", operation, str(status_code)).inc()
+
+
+def is_server_error(response: requests.Response | httpx.Response) -> bool:
+    """5xx responses count against CoinGecko's circuit breakers; 429s don't."""
+    return response.status_code >= 500
+
+
+class BaseCryptoService:
+    """Symbol mapping and CoinGecko response parsing shared by crypto services."""
 
-    # Common symbol to CoinGecko ID mappings
+    # Pinned symbol to CoinGecko ID mappings, checked before the coin index.
+    # These are also the symbols the batch quote endpoint treats as crypto
+    # when unqualified.
     SYMBOL_TO_ID = {
         "BTC": "bitcoin",
         "ETH": "ethereum",
@@ -41,8 +104,7 @@ class CryptoService:
         "NEAR": "near",
     }
 
-    def __init__(self, timeout: int = 10):
-        self.timeout = timeout
+    coin_index: CoinIndex = coin_index
 
     def _symbol_to_id(self, symbol: str) -> str | None:
         """
@@ -54,14 +116,200 @@ class CryptoService:
         Returns:
             CoinGecko ID (e.g., "bitcoin") or None if not found
         """
-        return self.SYMBOL_TO_ID.get(symbol.upper())
+        return self.SYMBOL_TO_ID.get(symbol.upper()) or self.coin_index.resolve(symbol)
+
+    def _parse_crypto_data(self, symbol: str, data: dict) -> AssetDetail:
+        """Build an AssetDetail from a CoinGecko /coins/{id} response."""
+        market_data = data.get("market_data", {})
+
+        return AssetDetail(
+            id=0,
+            asset_type=AssetType.CRYPTO,
+            symbol=symbol.upper(),
+            name=data.get("name", symbol),
+            current_price=market_data.get("current_price", {}).get("usd"),
+            price_change_24h=market_data.get("price_change_24h"),
+            price_change_percent_24h=market_data.get("price_change_percentage_24h"),
+            market_cap=market_data.get("market_cap", {}).get("usd"),
+            volume_24h=market_data.get("total_volume", {}).get("usd"),
+            last_updated=datetime.now(),
+            high_24h=market_data.get("high_24h", {}).get("usd"),
+            low_24h=market_data.get("low_24h", {}).get("usd"),
+            description=data.get("description", {}).get("en"),
+        )
+
+    def _parse_markets_data(
+        self, data: list[dict], id_to_symbol: dict[str, str]
+    ) -> dict[str, AssetDetail]:
+        """Build AssetDetails keyed by symbol from a CoinGecko /coins/markets response."""
+        quotes = {}
+        for coin in data:
+            symbol = id_to_symbol.get(coin.get("id"))
+            if symbol is None:
+                continue
+            quotes[symbol] = AssetDetail(
+                id=0,
+                asset_type=AssetType.CRYPTO,
+                symbol=symbol,
+                name=coin.get("name", symbol),
+                current_price=coin.get("current_price"),
+                price_change_24h=coin.get("price_change_24h"),
+                price_change_percent_24h=coin.get("price_change_percentage_24h"),
+                market_cap=coin.get("market_cap"),
+                volume_24h=coin.get("total_volume"),
+                last_updated=datetime.now(),
+                high_24h=coin.get("high_24h"),
+                low_24h=coin.get("low_24h"),
+            )
+        return quotes
+
+    def _parse_historical_series(self, data: dict) -> PriceSeries:
+        """Build a PriceSeries from a CoinGecko /market_chart response."""
+        prices = np.asarray(data.get("prices") or [], dtype=np.float64).reshape(-1, 2)
+        volumes = np.asarray(data.get("total_volumes") or [], dtype=np.float64).reshape(-1, 2)
+
+        timestamps = prices[:, 0]
+        if len(volumes) == len(prices) and np.array_equal(volumes[:, 0], timestamps):
+            volume = volumes[:, 1]
+        else:
+            # Align volumes to price timestamps, NaN where there is no match
+            order = np.argsort(volumes[:, 0], kind="stable")
+            volume_ts = volumes[order, 0]
+            idx = np.clip(np.searchsorted(volume_ts, timestamps), 0, max(len(volume_ts) - 1, 0))
+            volume = np.full(len(timestamps), np.nan)
+            if len(volume_ts):
+                matched = volume_ts[idx] == timestamps
+                volume[matched] = volumes[order, 1][idx[matched]]
+
+        return PriceSeries.from_epoch_ms(timestamps, prices[:, 1], volume)
 
-    def get_crypto_data(self, symbol: str) -> AssetDetail | None:
+    def _parse_search_results(self, data: dict) -> list[SearchResult]:
+        """Build the top 5 search results from a CoinGecko /search response."""
+        coins = data.get("coins", [])[:5]
+
+        return [
+            SearchResult(
+                symbol=coin.get("symbol", "").upper(),
+                name=coin.get("name", ""),
+                asset_type=AssetType.CRYPTO,
+                exchange=f"Rank #{coin.get('market_cap_rank')}"
+                if coin.get("market_cap_rank")
+                else None,
+            )
+            for coin in coins
+        ]
+
+
+class CryptoService(BaseCryptoService):
+    """Service for fetching cryptocurrency data using CoinGecko API."""
+
+    def __init__(self, timeout: int = 10, limiter: RateLimiter | None = None):
+        self.timeout = timeout
+        self.limiter = limiter or coingecko_limiter
+
+    def _get(
+        self, path: str, params: dict, priority: Priority, wait: float | None = None
+    ) -> requests.Response | None:
+        """
+        GET a CoinGecko path through the rate limiter, retrying after a 429.
+
+        Args:
+            path: API path below the base URL
+            params: Query parameters
+            priority: Rate limiter priority of the call
+            wait: Rate limiter wait budget (defaults per priority)
+
+        Returns:
+            The response, or None if no rate limit token was available in time
+        """
+        operation = coingecko_operation(path)
+        for _ in range(COINGECKO_MAX_RETRIES + 1):
+            # Queue for a token no longer than the request deadline allows
+            wait = time_left(DEFAULT_WAIT[priority] if wait is None else wait)
+            if not self.limiter.acquire(priority, wait):
+                logger.warning(f"Rate limit wait exceeded for {path}")
+                upstream_errors.labels("coingecko", operation, "rate_limited").inc()
+                return None
+            response = provider_calls.call(
+                "coingecko",
+                operation,
+                lambda timeout: requests.get(
+                    f"{COINGECKO_BASE_URL}{path}", params=params, timeout=timeout
+                ),
+                timeout=self.timeout,
+                failed=is_server_error,
+            )
+            count_status_error(operation, response.status_code)
+            if response.status_code != 429:
+                self.limiter.succeeded()
+                return response
+            self.limiter.throttled(parse_retry_after(response.headers.get("Retry-After")))
+        return response
+
+    def get_coin_list(self, rank_pages: int = CRYPTO_INDEX_RANK_PAGES) -> list[dict] | None:
+        """
+        Fetch CoinGecko's full coin list for the coin index.
+
+        Market cap ranks come from the first rank_pages pages of /coins/markets;
+        coins outside them are unranked.
+
+        Args:
+            rank_pages: Pages of 250 coins by market cap to fetch ranks from
+
+        Returns:
+            List of dicts with id, symbol, name and market_cap_rank, or None
+        """
+        try:
+            response = self._get(
+                "/coins/list", {}, Priority.BACKGROUND, CRYPTO_INDEX_WAIT
+            )
+            if response is None:
+                return None
+            response.raise_for_status()
+            coins = response.json()
+
+            ranks = {}
+            for page in range(1, rank_pages + 1):
+                response = self._get(
+                    "/coins/markets",
+                    {
+                        "vs_currency": "usd",
+                        "order": "market_cap_desc",
+                        "per_page": 250,
+                        "page": page,
+                    },
+                    Priority.BACKGROUND,
+                    CRYPTO_INDEX_WAIT,
+                )
+                if response is None or not response.ok:
+                    break
+                ranks.update(
+                    (coin["id"], coin.get("market_cap_rank")) for coin in response.json()
+                )
+        except (requests.RequestException, ProviderUnavailable) as e:
+            logger.error(f"Error fetching crypto coin list: {e}")
+            return None
+
+        return [
+            {
+                "id": coin["id"],
+                "symbol": coin.get("symbol") or "",
+                "name": coin.get("name") or coin["id"],
+                "market_cap_rank": ranks.get(coin["id"]),
+            }
+            for coin in coins
+            if coin.get("id")
+        ]
+
+    def get_crypto_data(
+        self, symbol: str, priority: Priority = Priority.INTERACTIVE
+    ) -> AssetDetail | None:
         """
         Fetch current cryptocurrency data for a given symbol.
 
         Args:
             symbol: Crypto symbol (e.g., "BTC", "ETH")
+            priority: Rate limiter priority of the call
 
         Returns:
             AssetDetail with current price and market data, or None if not found
@@ -72,37 +320,12 @@ class CryptoService:
             return None
 
         try:
-            response = requests.get(
-                f"{COINGECKO_BASE_URL}/coins/{coin_id}",
-                params={
-                    "localization": "false",
-                    "tickers": "false",
-                    "community_data": "false",
-                    "developer_data": "false",
-                },
-                timeout=self.timeout,
-            )
+            response = self._get(f"/coins/{coin_id}", COIN_PARAMS, priority)
+            if response is None:
+                return None
             response.raise_for_status()
-            data = response.json()
-
-            market_data = data.get("market_data", {})
-
-            return AssetDetail(
-                id=0,
-                asset_type=AssetType.CRYPTO,
-                symbol=symbol.upper(),
-                name=data.get("name", symbol),
-                current_price=market_data.get("current_price", {}).get("usd"),
-                price_change_24h=market_data.get("price_change_24h"),
-                price_change_percent_24h=market_data.get("price_change_percentage_24h"),
-                market_cap=market_data.get("market_cap", {}).get("usd"),
-                volume_24h=market_data.get("total_volume", {}).get("usd"),
-                last_updated=datetime.now(),
-                high_24h=market_data.get("high_24h", {}).get("usd"),
-                low_24h=market_data.get("low_24h", {}).get("usd"),
-                description=data.get("description", {}).get("en"),
-            )
-        except requests.RequestException as e:
+            return self._parse_crypto_data(symbol, response.json())
+        except (requests.RequestException, ProviderUnavailable) as e:
             logger.error(f"Error fetching crypto data for {symbol}: {e}")
             return None
 
@@ -119,70 +342,290 @@ class CryptoService:
         Returns:
             List of HistoricalDataPoint with timestamp, price, and volume
         """
+        return self.get_historical_series(symbol, days).to_points()
+
+    def get_historical_series(
+        self, symbol: str, days: int = 30, priority: Priority = Priority.INTERACTIVE
+    ) -> PriceSeries:
+        """
+        Fetch historical price data for a given cryptocurrency as columns.
+
+        Args:
+            symbol: Crypto symbol (e.g., "BTC", "ETH")
+            days: Number of days of history (1, 7, 30, 90, 365, max)
+            priority: Rate limiter priority of the call
+
+        Returns:
+            PriceSeries of UTC timestamps, prices and volumes
+        """
         coin_id = self._symbol_to_id(symbol)
         if not coin_id:
             logger.warning(f"Unknown crypto symbol: {symbol}")
+            return PriceSeries.empty()
+
+        try:
+            response = self._get(
+                f"/coins/{coin_id}/market_chart",
+                {"vs_currency": "usd", "days": days},
+                priority,
+            )
+            if response is None:
+                return PriceSeries.empty()
+            response.raise_for_status()
+            return self._parse_historical_series(response.json())
+        except (requests.RequestException, ProviderUnavailable) as e:
+            logger.error(f"Error fetching historical data for {symbol}: {e}")
+            return PriceSeries.empty()
+
+    def search_crypto(
+        self, query: str, priority: Priority = Priority.SEARCH
+    ) -> list[SearchResult]:
+        """
+        Search for cryptocurrencies matching the query.
+
+        Served from the local coin index once it is loaded, else by
+        CoinGecko's /search.
+
+        Args:
+            query: Search query (symbol or name)
+            priority: Rate limiter priority of the call
+
+        Returns:
+            List of top 5 SearchResult with symbol, name, and market cap rank
+        """
+        if len(self.coin_index):
+            return self.coin_index.search(query)
+
+        try:
+            response = self._get("/search", {"query": query}, priority)
+            if response is None:
+                return []
+            response.raise_for_status()
+            return self._parse_search_results(response.json())
+        except (requests.RequestException, ProviderUnavailable) as e:
+            logger.error(f"Error searching for {query}: {e}")
             return []
 
+
+class AsyncCryptoService(BaseCryptoService):
+    """
+    Async CoinGecko client backed by one pooled, keep-alive HTTP client.
+
+    Call start() before use and close() on shutdown; the app lifespan
+    takes care of both.
+    """
+
+    def __init__(
+        self,
+        base_url: str = COINGECKO_BASE_URL,
+        timeout: float = COINGECKO_TIMEOUT,
+        max_connections: int = COINGECKO_MAX_CONNECTIONS,
+        max_keepalive_connections: int = COINGECKO_MAX_KEEPALIVE,
+        keepalive_expiry: float = COINGECKO_KEEPALIVE_EXPIRY,
+        limiter: RateLimiter | None = None,
+    ):
+        self.base_url = base_url
+        self.limiter = limiter or coingecko_limiter
+        self.call_timeout = timeout
+        self.timeout = httpx.Timeout(timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client: httpx.AsyncClient | None = None
+
+    async def start(self) -> None:
+        """Open the shared HTTP client."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout, limits=self.limits
+            )
+
+    async def close(self) -> None:
+        """Close the shared HTTP client and its pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("AsyncCryptoService used before start()")
+        return self._client
+
+    async def _get(
+        self, path: str, params: dict, priority: Priority
+    ) -> httpx.Response | None:
+        """
+        GET a CoinGecko path through the rate limiter, retrying after a 429.
+
+        Returns:
+            The response, or None if no rate limit token was available in time
+        """
+        operation = coingecko_operation(path)
+        for _ in range(COINGECKO_MAX_RETRIES + 1):
+            wait = time_left(DEFAULT_WAIT[priority])
+            if not await self.limiter.acquire_async(priority, wait):
+                logger.warning(f"Rate limit wait exceeded for {path}")
+                upstream_errors.labels("coingecko", operation, "rate_limited").inc()
+                return None
+            response = await provider_calls.call_async(
+                "coingecko",
+                operation,
+                lambda timeout: self.client.get(path, params=params, timeout=timeout),
+                timeout=self.call_timeout,
+                failed=is_server_error,
+            )
+            count_status_error(operation, response.status_code)
+            if response.status_code != 429:
+                self.limiter.succeeded()
+                return response
+            self.limiter.throttled(parse_retry_after(response.headers.get("Retry-After")))
+        return response
+
+    async def get_crypto_data(
+        self, symbol: str, priority: Priority = Priority.INTERACTIVE
+    ) -> AssetDetail | None:
+        """
+        Fetch current cryptocurrency data for a given symbol.
+
+        Args:
+            symbol: Crypto symbol (e.g., "BTC", "ETH")
+            priority: Rate limiter priority of the call
+
+        Returns:
+            AssetDetail with current price and market data, or None if not found
+        """
+        coin_id = self._symbol_to_id(symbol)
+        if not coin_id:
+            logger.warning(f"Unknown crypto symbol: {symbol}")
+            return None
+
         try:
-            response = requests.get(
-                f"{COINGECKO_BASE_URL}/coins/{coin_id}/market_chart",
-                params={"vs_currency": "usd", "days": days},
-                timeout=self.timeout,
+            response = await self._get(f"/coins/{coin_id}", COIN_PARAMS, priority)
+            if response is None:
+                return None
+            response.raise_for_status()
+            return self._parse_crypto_data(symbol, response.json())
+        except (httpx.HTTPError, ProviderUnavailable) as e:
+            logger.error(f"Error fetching crypto data for {symbol}: {e}")
+            return None
+
+    async def get_markets_data(
+        self, symbols: list[str], priority: Priority = Priority.INTERACTIVE
+    ) -> dict[str, AssetDetail]:
+        """
+        Fetch current data for many cryptocurrencies in one call.
+
+        Args:
+            symbols: Crypto symbols (e.g., ["BTC", "ETH"])
+            priority: Rate limiter priority of the call
+
+        Returns:
+            Dict mapping upper-case symbol to AssetDetail; unknown symbols and
+            coins missing from the response are omitted
+        """
+        id_to_symbol = {}
+        for symbol in symbols:
+            coin_id = self._symbol_to_id(symbol)
+            if coin_id:
+                id_to_symbol[coin_id] = symbol.upper()
+        if not id_to_symbol:
+            return {}
+
+        try:
+            response = await self._get(
+                "/coins/markets",
+                {"vs_currency": "usd", "ids": ",".join(id_to_symbol)},
+                priority,
             )
+            if response is None:
+                return {}
             response.raise_for_status()
-            data = response.json()
+            return self._parse_markets_data(response.json(), id_to_symbol)
+        except (httpx.HTTPError, ProviderUnavailable) as e:
+            logger.error(f"Error fetching crypto markets for {symbols}: {e}")
+            return {}
 
-            prices = data.get("prices", [])
-            volumes = data.get("total_volumes", [])
+    async def get_historical_data(
+        self, symbol: str, days: int = 30
+    ) -> list[HistoricalDataPoint]:
+        """
+        Fetch historical price data for a given cryptocurrency.
 
-            # Create volume lookup by timestamp
-            volume_map = {v[0]: v[1] for v in volumes}
+        Args:
+            symbol: Crypto symbol (e.g., "BTC", "ETH")
+            days: Number of days of history (1, 7, 30, 90, 365, max)
 
-            return [
-                HistoricalDataPoint(
-                    timestamp=datetime.fromtimestamp(p[0] / 1000),
-                    price=p[1],
-                    volume=volume_map.get(p[0]),
-                )
-                for p in prices
-            ]
-        except requests.RequestException as e:
+        Returns:
+            List of HistoricalDataPoint with timestamp, price, and volume
+        """
+        return (await self.get_historical_series(symbol, days)).to_points()
+
+    async def get_historical_series(
+        self, symbol: str, days: int = 30, priority: Priority = Priority.INTERACTIVE
+    ) -> PriceSeries:
+        """
+        Fetch historical price data for a given cryptocurrency as columns.
+
+        Args:
+            symbol: Crypto symbol (e.g., "BTC", "ETH")
+            days: Number of days of history (1, 7, 30, 90, 365, max)
+            priority: Rate limiter priority of the call
+
+        Returns:
+            PriceSeries of UTC timestamps, prices and volumes
+        """
+        coin_id = self._symbol_to_id(symbol)
+        if not coin_id:
+            logger.warning(f"Unknown crypto symbol: {symbol}")
+            return PriceSeries.empty()
+
+        try:
+            response = await self._get(
+                f"/coins/{coin_id}/market_chart",
+                {"vs_currency": "usd", "days": days},
+                priority,
+            )
+            if response is None:
+                return PriceSeries.empty()
+            response.raise_for_status()
+            return self._parse_historical_series(response.json())
+        except (httpx.HTTPError, ProviderUnavailable) as e:
             logger.error(f"Error fetching historical data for {symbol}: {e}")
-            return []
+            return PriceSeries.empty()
 
-    def search_crypto(self, query: str) -> list[SearchResult]:
+    async def search_crypto(
+        self, query: str, priority: Priority = Priority.SEARCH
+    ) -> list[SearchResult]:
         """
         Search for cryptocurrencies matching the query.
 
+        Served from the local coin index once it is loaded, else by
+        CoinGecko's /search.
+
         Args:
             query: Search query (symbol or name)
+            priority: Rate limiter priority of the call
 
         Returns:
             List of top 5 SearchResult with symbol, name, and market cap rank
         """
+        if len(self.coin_index):
+            return self.coin_index.search(query)
+
         try:
-            response = requests.get(
-                f"{COINGECKO_BASE_URL}/search",
-                params={"query": query},
-                timeout=self.timeout,
-            )
+            response = await self._get("/search", {"query": query}, priority)
+            if response is None:
+                return []
             response.raise_for_status()
-            data = response.json()
-
-            coins = data.get("coins", [])[:5]
-
-            return [
-                SearchResult(
-                    symbol=coin.get("symbol", "").upper(),
-                    name=coin.get("name", ""),
-                    asset_type=AssetType.CRYPTO,
-                    exchange=f"Rank #{coin.get('market_cap_rank')}"
-                    if coin.get("market_cap_rank")
-                    else None,
-                )
-                for coin in coins
-            ]
-        except requests.RequestException as e:
+            return self._parse_search_results(response.json())
+        except (httpx.HTTPError, ProviderUnavailable) as e:
             logger.error(f"Error searching for {query}: {e}")
             return []
+
+
+crypto_service = CryptoService()
+# Pooled client for async routes; opened and closed by the app lifespan
+async_crypto_service = AsyncCryptoService()
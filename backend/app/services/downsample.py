@@ -0,0 +1,72 @@
+import numpy as np
+
+from app.services.series import PriceSeries
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Select points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The points in between are
+    split into n_out - 2 buckets, and from each bucket the point forming
+    the largest triangle with the previously selected point and the mean of
+    the next bucket is kept. Bucket means are computed for all buckets at
+    once; only the per-bucket argmax walks the buckets in order, since each
+    choice depends on the previous one.
+
+    Args:
+        x: Monotonic x values (e.g. epoch milliseconds)
+        y: Values to preserve the shape of
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted indices of the selected points
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+
+    # Bucket i covers [edges[i], edges[i + 1]) over points 1..n-2
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    # Mean of each bucket, plus the last point as the final "next bucket"
+    counts = np.diff(edges)
+    x_means = np.append(np.add.reduceat(x[:-1], edges[:-1]) / counts, x[-1])
+    y_means = np.append(np.add.reduceat(y[:-1], edges[:-1]) / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        # Twice the triangle area; the constant factor doesn't change argmax
+        areas = np.abs(
+            (ax - x_means[i + 1]) * (y[start:end] - ay)
+            - (ax - x[start:end]) * (y_means[i + 1] - ay)
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(series: PriceSeries, max_points: int) -> PriceSeries:
+    """
+    Reduce a price series to at most max_points, preserving its shape.
+
+    Args:
+        series: Price series to reduce
+        max_points: Maximum number of bars to keep
+
+    Returns:
+        The series itself if already small enough, else the LTTB selection
+    """
+    if len(series) <= max_points:
+        return series
+    indices = lttb_indices(series.epoch_ms(), series.prices, max_points)
+    return series[indices]
@@ -0,0 +1,574 @@
+import logging
+import math
+import os
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, delete, insert, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import SessionLocal, dialect_insert
+from app.models import PriceBar, PriceBarSeries
+from app.schemas import AssetType
+from app.services.crypto_service import (
+    AsyncCryptoService,
+    CryptoService,
+    async_crypto_service,
+    crypto_service,
+)
+from app.services.series import PriceSeries
+from app.services.stock_service import StockService, stock_service
+
+logger = logging.getLogger(__name__)
+
+# Stored series are only topped up once per refresh interval, however many
+# periods/day ranges are requested for the symbol in between.
+HISTORY_REFRESH_INTERVAL = timedelta(
+    seconds=int(os.getenv("HISTORY_REFRESH_SECONDS", "900"))
+)
+
+# yfinance history(period=...) always returns daily bars
+STOCK_INTERVAL = "1d"
+# Calendar days a stock period spans; 1d/5d are served as the last N bars
+STOCK_PERIOD_DAYS = {
+    "1d": 1,
+    "5d": 7,
+    "1mo": 31,
+    "3mo": 92,
+    "6mo": 183,
+    "1y": 366,
+    "5y": 1827,
+}
+STOCK_PERIOD_BARS = {"1d": 1, "5d": 5}
+
+# Smallest and largest `days` values CoinGecko answers at each granularity;
+# asking for more returns coarser bars
+CRYPTO_MIN_DAYS = {"5m": 1, "1h": 2, "1d": 91}
+CRYPTO_MAX_DAYS = {"5m": 1, "1h": 90}
+# Longest day range the crypto history routes accept
+CRYPTO_HISTORY_MAX_DAYS = 365
+
+# Longest window any request reads at each bar interval. Older bars are
+# pruned whenever the series is saved, so tail refreshes don't grow it
+# without bound; the margin keeps bars a request is still reading.
+BAR_RETENTION = {
+    (AssetType.STOCK, STOCK_INTERVAL): timedelta(days=max(STOCK_PERIOD_DAYS.values())),
+    (AssetType.CRYPTO, "5m"): timedelta(days=CRYPTO_MAX_DAYS["5m"]),
+    (AssetType.CRYPTO, "1h"): timedelta(days=CRYPTO_MAX_DAYS["1h"]),
+    (AssetType.CRYPTO, "1d"): timedelta(days=CRYPTO_HISTORY_MAX_DAYS),
+}
+BAR_RETENTION_MARGIN = timedelta(days=1)
+
+
+def crypto_interval(days: int) -> str:
+    """CoinGecko's automatic market_chart granularity for a day range."""
+    if days <= 1:
+        return "5m"
+    if days <= 90:
+        return "1h"
+    return "1d"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class RefreshPlan(NamedTuple):
+    """What to fetch upstream: the whole window, or the tail from start."""
+
+    full: bool
+    start: datetime | None = None
+
+
+class HistoryStore:
+    """
+    Persistent per-symbol price bar store with incremental refreshes.
+
+    Each series (asset type, symbol, bar interval) records the window it
+    covers and its last stored timestamp. A request inside the covered
+    window only fetches the missing tail from the provider and merges it
+    in; a request reaching further back fetches the whole window once.
+    History is then served from the stored bars.
+    """
+
+    def __init__(
+        self,
+        stock_service: StockService,
+        crypto_service: CryptoService,
+        async_crypto_service: AsyncCryptoService | None = None,
+        session_factory: sessionmaker = SessionLocal,
+        refresh_interval: timedelta = HISTORY_REFRESH_INTERVAL,
+    ):
+        self.stock_service = stock_service
+        self.crypto_service = crypto_service
+        self.async_crypto_service = async_crypto_service
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+
+    def plan_refresh(
+        self,
+        asset_type: AssetType,
+        symbol: str,
+        interval: str,
+        window: timedelta,
+        max_gap: timedelta | None = None,
+    ) -> RefreshPlan | None:
+        """
+        Decide what needs fetching to serve a window of history.
+
+        Args:
+            asset_type: Asset type of the series
+            symbol: Asset symbol
+            interval: Bar interval of the series
+            window: How far back the request reaches
+            max_gap: Longest tail the provider returns at this interval's
+                granularity; an older series is fetched in full instead
+
+        Returns:
+            RefreshPlan, or None if the stored bars are current; a full
+            refresh if the series state can't be read
+        """
+        try:
+            with self.session_factory() as session:
+                series = session.get(
+                    PriceBarSeries, (asset_type, symbol.upper(), interval)
+                )
+        except Exception as e:
+            logger.error(f"Error reading {symbol} {interval} series state: {e}")
+            return RefreshPlan(full=True)
+
+        now = _utcnow()
+        if series is None or series.covered_from > now - window:
+            return RefreshPlan(full=True)
+        if series.fetched_at > now - self.refresh_interval:
+            return None
+        if max_gap is not None and series.last_timestamp < now - max_gap:
+            return RefreshPlan(full=True)
+        # Re-fetch the last stored bar too, it may have been incomplete
+        return RefreshPlan(full=False, start=series.last_timestamp)
+
+    def save_bars(
+        self,
+        asset_type: AssetType,
+        symbol: str,
+        interval: str,
+        series: PriceSeries,
+        covered_from: datetime | None = None,
+    ) -> bool:
+        """
+        Merge fetched bars into the store and advance the series state.
+
+        The write is an upsert, so concurrent refreshes of the same series
+        don't conflict. Bars older than the interval's BAR_RETENTION are
+        pruned in the same transaction. Failures are logged, not raised: the
+        fetched bars can still be served.
+
+        Args:
+            asset_type: Asset type of the series
+            symbol: Asset symbol
+            interval: Bar interval of the series
+            series: Fetched bars; they replace every stored bar from the
+                first fetched timestamp on, since providers such as CoinGecko
+                don't return stable timestamps for the most recent points
+            covered_from: Start of the window the fetch covered (UTC), for
+                full fetches
+
+        Returns:
+            True if the bars were stored
+        """
+        if not len(series):
+            return True
+
+        symbol = symbol.upper()
+        timestamps = series.timestamps.tolist()
+        rows = [
+            {
+                "asset_type": asset_type,
+                "symbol": symbol,
+                "interval": interval,
+                "timestamp": timestamp,
+                "price": price,
+                "volume": volume,
+            }
+            for timestamp, price, volume in zip(
+                timestamps, series.prices.tolist(), series.volume_list()
+            )
+        ]
+        state = {
+            "asset_type": asset_type,
+            "symbol": symbol,
+            "interval": interval,
+            "covered_from": covered_from or min(timestamps),
+            "last_timestamp": max(timestamps),
+            "fetched_at": _utcnow(),
+        }
+
+        try:
+            with self.session_factory() as session:
+                session.execute(
+                    delete(PriceBar).where(
+                        PriceBar.asset_type == asset_type,
+                        PriceBar.symbol == symbol,
+                        PriceBar.interval == interval,
+                        PriceBar.timestamp >= min(timestamps),
+                    )
+                )
+                upsert = dialect_insert(session)
+                if upsert is None:
+                    session.execute(insert(PriceBar), rows)
+                    self._merge_state(session, state, covered_from is not None)
+                else:
+                    self._upsert(session, upsert, rows, state, covered_from is not None)
+                self._prune(session, asset_type, symbol, interval)
+                session.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Error storing {len(rows)} {symbol} {interval} bars: {e}")
+            return False
+
+    @staticmethod
+    def _upsert(
+        session: Session, upsert, rows: list[dict], state: dict, full: bool
+    ) -> None:
+        """Write bars and series state with ON CONFLICT DO UPDATE."""
+        stmt = upsert(PriceBar).values(rows)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    PriceBar.asset_type,
+                    PriceBar.symbol,
+                    PriceBar.interval,
+                    PriceBar.timestamp,
+                ],
+                set_={"price": stmt.excluded.price, "volume": stmt.excluded.volume},
+            )
+        )
+
+        stmt = upsert(PriceBarSeries).values(state)
+        fetched = stmt.excluded
+        set_ = {
+            "last_timestamp": case(
+                (
+                    fetched.last_timestamp > PriceBarSeries.last_timestamp,
+                    fetched.last_timestamp,
+                ),
+                else_=PriceBarSeries.last_timestamp,
+            ),
+            "fetched_at": fetched.fetched_at,
+        }
+        if full:
+            set_["covered_from"] = case(
+                # The fetch doesn't join up with the stored bars
+                (
+                    fetched.covered_from > PriceBarSeries.last_timestamp,
+                    fetched.covered_from,
+                ),
+                (
+                    fetched.covered_from < PriceBarSeries.covered_from,
+                    fetched.covered_from,
+                ),
+                else_=PriceBarSeries.covered_from,
+            )
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    PriceBarSeries.asset_type,
+                    PriceBarSeries.symbol,
+                    PriceBarSeries.interval,
+                ],
+                set_=set_,
+            )
+        )
+
+    @staticmethod
+    def _prune(
+        session: Session, asset_type: AssetType, symbol: str, interval: str
+    ) -> None:
+        """Delete bars past the interval's retention and narrow the coverage."""
+        retention = BAR_RETENTION.get((asset_type, interval))
+        if retention is None:
+            return
+        cutoff = _utcnow() - retention - BAR_RETENTION_MARGIN
+        session.execute(
+            delete(PriceBar).where(
+                PriceBar.asset_type == asset_type,
+                PriceBar.symbol == symbol,
+                PriceBar.interval == interval,
+                PriceBar.timestamp < cutoff,
+            )
+        )
+        session.execute(
+            update(PriceBarSeries)
+            .where(
+                PriceBarSeries.asset_type == asset_type,
+                PriceBarSeries.symbol == symbol,
+                PriceBarSeries.interval == interval,
+                PriceBarSeries.covered_from < cutoff,
+            )
+            .values(covered_from=cutoff)
+        )
+
+    @staticmethod
+    def _merge_state(session: Session, state: dict, full: bool) -> None:
+        """Read-then-write series state for dialects without ON CONFLICT."""
+        series = session.get(
+            PriceBarSeries, (state["asset_type"], state["symbol"], state["interval"])
+        )
+        if series is None:
+            session.add(PriceBarSeries(**state))
+            return
+        if full and state["covered_from"] > series.last_timestamp:
+            # The fetch doesn't join up with the stored bars
+            series.covered_from = state["covered_from"]
+        elif full:
+            series.covered_from = min(series.covered_from, state["covered_from"])
+        series.last_timestamp = max(series.last_timestamp, state["last_timestamp"])
+        series.fetched_at = state["fetched_at"]
+
+    def read_bars(
+        self,
+        asset_type: AssetType,
+        symbol: str,
+        interval: str,
+        since: datetime | None = None,
+        limit: int | None = None,
+    ) -> PriceSeries:
+        """
+        Read stored bars in ascending time order.
+
+        Args:
+            asset_type: Asset type of the series
+            symbol: Asset symbol
+            interval: Bar interval of the series
+            since: Only bars at or after this UTC time
+            limit: Only the most recent N bars
+
+        Returns:
+            PriceSeries of the stored bars
+        """
+        query = select(PriceBar.timestamp, PriceBar.price, PriceBar.volume).where(
+            PriceBar.asset_type == asset_type,
+            PriceBar.symbol == symbol.upper(),
+            PriceBar.interval == interval,
+        )
+        if since is not None:
+            query = query.where(PriceBar.timestamp >= since)
+        if limit is not None:
+            query = query.order_by(PriceBar.timestamp.desc()).limit(limit)
+        else:
+            query = query.order_by(PriceBar.timestamp)
+
+        with self.session_factory() as session:
+            rows = session.execute(query).all()
+        if not rows:
+            return PriceSeries.empty()
+        if limit is not None:
+            rows.reverse()
+
+        timestamps, prices, volumes = zip(*rows)
+        return PriceSeries(
+            np.array(timestamps, dtype="datetime64[ms]"),
+            np.array(prices, dtype=np.float64),
+            # None volumes become NaN
+            np.array(volumes, dtype=np.float64),
+        )
+
+    def _serve(
+        self,
+        asset_type: AssetType,
+        symbol: str,
+        interval: str,
+        unsaved: PriceSeries | None,
+        since: datetime | None = None,
+        limit: int | None = None,
+        partial: bool = False,
+    ) -> PriceSeries:
+        """
+        Read stored bars for a request, with fetched bars the store failed to
+        save spliced in so the fetch still gets served.
+
+        Args:
+            asset_type: Asset type of the series
+            symbol: Asset symbol
+            interval: Bar interval of the series
+            unsaved: Fetched bars save_bars couldn't store, or None
+            since: Only bars at or after this UTC time
+            limit: Only the most recent N bars
+            partial: A full refresh failed, so the stored bars may not cover
+                the request; flags the result partial
+
+        Returns:
+            PriceSeries of the bars to serve
+        """
+        try:
+            stored = self.read_bars(asset_type, symbol, interval, since, limit)
+        except Exception as e:
+            if unsaved is None:
+                raise
+            logger.error(f"Error reading {symbol} {interval} bars: {e}")
+            stored = PriceSeries.empty()
+        if unsaved is None or not len(unsaved):
+            return replace(stored, partial=True) if partial and len(stored) else stored
+
+        head = stored[: int(np.searchsorted(stored.timestamps, unsaved.timestamps[0]))]
+        merged = PriceSeries(
+            np.concatenate([head.timestamps, unsaved.timestamps]),
+            np.concatenate([head.prices, unsaved.prices]),
+            np.concatenate([head.volumes, unsaved.volumes]),
+        )
+        if since is not None:
+            merged = merged.since(np.datetime64(since, "ms"))
+        if limit is not None:
+            merged = merged[-limit:]
+        return merged
+
+    def get_stock_history(
+        self, symbol: str, period: str = "1mo"
+    ) -> PriceSeries:
+        """
+        Get daily stock bars for a period, refreshing the stored series.
+
+        Args:
+            symbol: Stock ticker symbol
+            period: Time period - one of: 1d, 5d, 1mo, 3mo, 6mo, 1y, 5y
+
+        Returns:
+            PriceSeries of timestamps, prices and volumes; flagged partial
+            when a full refresh failed and only stored bars were served
+        """
+        window = timedelta(days=STOCK_PERIOD_DAYS.get(period, 31))
+        plan = self.plan_refresh(AssetType.STOCK, symbol, STOCK_INTERVAL, window)
+        unsaved = None
+        partial = False
+        if plan is not None:
+            if plan.full:
+                series = self.stock_service.get_historical_series(symbol, period)
+                saved = self.save_bars(
+                    AssetType.STOCK,
+                    symbol,
+                    STOCK_INTERVAL,
+                    series,
+                    covered_from=_utcnow() - window,
+                )
+            else:
+                series = self.stock_service.get_historical_series(
+                    symbol, start=plan.start
+                )
+                saved = self.save_bars(AssetType.STOCK, symbol, STOCK_INTERVAL, series)
+            unsaved = None if saved else series
+            partial = plan.full and not len(series)
+
+        limit = STOCK_PERIOD_BARS.get(period)
+        since = None if limit else _utcnow() - window
+        return self._serve(
+            AssetType.STOCK,
+            symbol,
+            STOCK_INTERVAL,
+            unsaved,
+            since=since,
+            limit=limit,
+            partial=partial,
+        )
+
+    def _crypto_plan(self, symbol: str, interval: str, days: int) -> RefreshPlan | None:
+        max_days = CRYPTO_MAX_DAYS.get(interval)
+        return self.plan_refresh(
+            AssetType.CRYPTO,
+            symbol,
+            interval,
+            timedelta(days=days),
+            timedelta(days=max_days) if max_days else None,
+        )
+
+    def _crypto_fetch_days(self, plan: RefreshPlan, interval: str, days: int) -> int:
+        """
+        Days of market_chart to request to fill a refresh plan.
+
+        Tails are never longer than the interval's CRYPTO_MAX_DAYS; older
+        series are planned as full refreshes.
+        """
+        if plan.full:
+            return days
+        gap = (_utcnow() - plan.start).total_seconds() / 86_400
+        return max(CRYPTO_MIN_DAYS[interval], math.ceil(gap))
+
+    def get_crypto_history(self, symbol: str, days: int = 30) -> PriceSeries:
+        """
+        Get crypto bars for a day range, refreshing the stored series.
+
+        Args:
+            symbol: Crypto symbol (e.g., "BTC", "ETH")
+            days: Number of days of history
+
+        Returns:
+            PriceSeries of timestamps, prices and volumes; flagged partial
+            when a full refresh failed and only stored bars were served
+        """
+        interval = crypto_interval(days)
+        window = timedelta(days=days)
+        plan = self._crypto_plan(symbol, interval, days)
+        unsaved = None
+        partial = False
+        if plan is not None:
+            fetch_days = self._crypto_fetch_days(plan, interval, days)
+            series = self.crypto_service.get_historical_series(symbol, fetch_days)
+            saved = self.save_bars(
+                AssetType.CRYPTO,
+                symbol,
+                interval,
+                series,
+                covered_from=_utcnow() - window if plan.full else None,
+            )
+            unsaved = None if saved else series
+            partial = plan.full and not len(series)
+
+        return self._serve(
+            AssetType.CRYPTO,
+            symbol,
+            interval,
+            unsaved,
+            since=_utcnow() - window,
+            partial=partial,
+        )
+
+    async def get_crypto_history_async(
+        self, symbol: str, days: int = 30
+    ) -> PriceSeries:
+        """Async variant of get_crypto_history using the pooled client."""
+        interval = crypto_interval(days)
+        window = timedelta(days=days)
+        plan = await run_in_threadpool(self._crypto_plan, symbol, interval, days)
+        unsaved = None
+        partial = False
+        if plan is not None:
+            fetch_days = self._crypto_fetch_days(plan, interval, days)
+            series = await self.async_crypto_service.get_historical_series(
+                symbol, fetch_days
+            )
+            saved = await run_in_threadpool(
+                self.save_bars,
+                AssetType.CRYPTO,
+                symbol,
+                interval,
+                series,
+                _utcnow() - window if plan.full else None,
+            )
+            unsaved = None if saved else series
+            partial = plan.full and not len(series)
+
+        return await run_in_threadpool(
+            self._serve,
+            AssetType.CRYPTO,
+            symbol,
+            interval,
+            unsaved,
+            _utcnow() - window,
+            None,
+            partial,
+        )
+
+
+history_store = HistoryStore(stock_service, crypto_service, async_crypto_service)
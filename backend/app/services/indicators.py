@@ -0,0 +1,336 @@
+from dataclasses import dataclass
+from typing import Callable, Literal
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.services.series import PriceSeries
+
+IndicatorKind = Literal["sma", "ema", "rsi", "bollinger", "macd"]
+
+# Lines returned for each indicator; other computed columns are kept only as
+# state for incremental updates
+INDICATOR_LINES: dict[str, tuple[str, ...]] = {
+    "sma": ("sma",),
+    "ema": ("ema",),
+    "rsi": ("rsi",),
+    "bollinger": ("middle", "upper", "lower"),
+    "macd": ("macd", "signal", "histogram"),
+}
+
+# Smallest weight a block of the EMA recursion scales its inputs down to;
+# keeps the cumulative sums within six orders of magnitude of the result
+_MIN_BLOCK_WEIGHT = 1e-6
+
+# Bars recomputed at first when a series dropped leading bars, and how close
+# (relative to the prices) the recomputed state must come to the stored one
+# before the rest of the stored columns are reused
+_REBASE_HEAD = 256
+_REBASE_TOLERANCE = 1e-12
+
+
+@dataclass(frozen=True, slots=True)
+class IndicatorSeries:
+    """
+    Indicator columns computed over a price series.
+
+    Attributes:
+        source: Bars the columns were computed from
+        columns: float64 arrays aligned with source, NaN while an indicator
+            is still warming up; includes the recursive state (EMAs, Wilder
+            averages) needed to extend them
+    """
+
+    source: PriceSeries
+    columns: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def __sizeof__(self) -> int:
+        return self.source.__sizeof__() + sum(c.nbytes for c in self.columns.values())
+
+    def lines(self, kind: IndicatorKind) -> dict[str, np.ndarray]:
+        """The output lines of an indicator kind."""
+        return {name: self.columns[name] for name in INDICATOR_LINES[kind]}
+
+
+def _recurse(values: np.ndarray, alpha: float, previous: float) -> np.ndarray:
+    """
+    Exponential smoothing y[t] = (1 - alpha) * y[t - 1] + alpha * x[t].
+
+    Unrolled, y[t] = decay^(t+1) * previous + alpha * decay^t *
+    cumsum(x[i] / decay^i), which is evaluated with NumPy one block at a
+    time; blocks are short enough that decay^-i stays precise.
+
+    Args:
+        values: Inputs x, without NaNs
+        alpha: Smoothing factor in (0, 1]
+        previous: y[-1], the value before the first input
+
+    Returns:
+        Smoothed values, one per input
+    """
+    decay = 1.0 - alpha
+    out = np.empty(len(values))
+    if decay <= 0.0:
+        out[:] = values
+        return out
+    block = max(int(np.log(_MIN_BLOCK_WEIGHT) / np.log(decay)), 1)
+    steps = np.arange(min(block, len(values)))
+    weights = decay**steps
+    for lo in range(0, len(values), block):
+        x = values[lo : lo + block]
+        w = weights[: len(x)]
+        out[lo : lo + len(x)] = decay * w * previous + alpha * w * np.cumsum(x / w)
+        previous = out[lo + len(x) - 1]
+    return out
+
+
+def _smoothed(
+    values: np.ndarray,
+    window: int,
+    alpha: float,
+    start: int,
+    previous: np.ndarray | None,
+) -> np.ndarray:
+    """
+    Exponentially smooth values from index start on.
+
+    The first output is the simple mean of the first `window` finite values
+    (leading NaNs are skipped), as in TA-Lib; earlier outputs are NaN.
+    Later outputs continue from previous[start - 1] when it is available.
+
+    Returns:
+        Smoothed values for indices start..len(values) - 1
+    """
+    n = len(values)
+    out = np.full(n - start, np.nan)
+    finite = np.flatnonzero(np.isfinite(values))
+    if len(finite) == 0:
+        return out
+    seed = int(finite[0]) + window - 1
+    if seed >= n:
+        return out
+    if previous is not None and start > seed and np.isfinite(previous[start - 1]):
+        out[:] = _recurse(values[start:], alpha, previous[start - 1])
+        return out
+
+    seed_value = values[seed - window + 1 : seed + 1].mean()
+    smoothed = np.empty(n - seed)
+    smoothed[0] = seed_value
+    smoothed[1:] = _recurse(values[seed + 1 :], alpha, seed_value)
+    if seed >= start:
+        out[seed - start :] = smoothed
+    else:
+        out[:] = smoothed[start - seed :]
+    return out
+
+
+def _rolling(
+    values: np.ndarray, window: int, start: int, reduce: Callable[..., np.ndarray]
+) -> np.ndarray:
+    """
+    Reduce each trailing window of values ending at index start or later.
+
+    Returns:
+        One result per index start..len(values) - 1, NaN for indices with
+        fewer than `window` values behind them
+    """
+    n = len(values)
+    out = np.full(n - start, np.nan)
+    first = max(start, window - 1)
+    if first >= n:
+        return out
+    windows = sliding_window_view(values[first - window + 1 :], window)
+    out[first - start :] = reduce(windows, axis=1)
+    return out
+
+
+# Each compute function takes the prices, the first index to compute and the
+# columns of the earlier bars (None when computing from scratch), and returns
+# columns for the bars from that index on.
+
+
+def _sma(prices, start, earlier, window: int) -> dict[str, np.ndarray]:
+    return {"sma": _rolling(prices, window, start, np.mean)}
+
+
+def _ema(prices, start, earlier, window: int) -> dict[str, np.ndarray]:
+    earlier = earlier or {}
+    return {"ema": _smoothed(prices, window, 2 / (window + 1), start, earlier.get("ema"))}
+
+
+def _rsi(prices, start, earlier, window: int) -> dict[str, np.ndarray]:
+    """Wilder's RSI: smoothed average gains over average losses."""
+    earlier = earlier or {}
+    changes = np.empty(len(prices))
+    changes[0] = np.nan
+    np.subtract(prices[1:], prices[:-1], out=changes[1:])
+    gains, losses = np.maximum(changes, 0.0), np.maximum(-changes, 0.0)
+    gain = _smoothed(gains, window, 1 / window, start, earlier.get("gain"))
+    loss = _smoothed(losses, window, 1 / window, start, earlier.get("loss"))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(loss == 0.0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+    rsi[np.isnan(gain)] = np.nan
+    return {"rsi": rsi, "gain": gain, "loss": loss}
+
+
+def _bollinger(prices, start, earlier, window: int, std: float) -> dict[str, np.ndarray]:
+    middle = _rolling(prices, window, start, np.mean)
+    deviation = _rolling(prices, window, start, np.std)
+    return {
+        "middle": middle,
+        "upper": middle + std * deviation,
+        "lower": middle - std * deviation,
+    }
+
+
+def _macd(
+    prices, start, earlier, fast: int, slow: int, signal: int
+) -> dict[str, np.ndarray]:
+    earlier = earlier or {}
+    fast_ema = _smoothed(prices, fast, 2 / (fast + 1), start, earlier.get("fast"))
+    slow_ema = _smoothed(prices, slow, 2 / (slow + 1), start, earlier.get("slow"))
+    macd = fast_ema - slow_ema
+    # The signal line smooths the whole MACD line, earlier bars included
+    if "macd" in earlier:
+        macd_line = np.concatenate((earlier["macd"], macd))
+    else:
+        macd_line = macd
+    signal_line = _smoothed(
+        macd_line, signal, 2 / (signal + 1), start, earlier.get("signal")
+    )
+    return {
+        "macd": macd,
+        "signal": signal_line,
+        "histogram": macd - signal_line,
+        "fast": fast_ema,
+        "slow": slow_ema,
+    }
+
+
+_COMPUTE = {
+    "sma": _sma,
+    "ema": _ema,
+    "rsi": _rsi,
+    "bollinger": _bollinger,
+    "macd": _macd,
+}
+
+
+def _resume_point(previous: IndicatorSeries, series: PriceSeries) -> tuple[int, int]:
+    """
+    Where a series stops matching the bars an indicator was computed from.
+
+    Returns:
+        (offset, start): the series begins at previous.source[offset], and
+        its bars before index start are unchanged; start is 0 when the
+        series doesn't continue the previous one
+    """
+    source = previous.source
+    if len(series) == 0 or len(source) == 0:
+        return 0, 0
+    offset = int(np.searchsorted(source.timestamps, series.timestamps[0]))
+    if offset >= len(source) or source.timestamps[offset] != series.timestamps[0]:
+        return 0, 0
+    overlap = min(len(source) - offset, len(series))
+    same = (source.timestamps[offset : offset + overlap] == series.timestamps[:overlap]) & (
+        source.prices[offset : offset + overlap] == series.prices[:overlap]
+    )
+    changed = np.flatnonzero(~same)
+    start = int(changed[0]) if len(changed) else overlap
+    return offset, start
+
+
+def _rebased(
+    prices: np.ndarray,
+    kind: IndicatorKind,
+    params: dict[str, float],
+    earlier: dict[str, np.ndarray],
+) -> dict[str, np.ndarray]:
+    """
+    Recompute earlier columns after the series they cover dropped leading bars.
+
+    Every indicator now warms up at the new first bar. Rolling ones agree
+    with the stored columns after one window, and the difference in smoothed
+    ones decays geometrically, so only a head of the bars is recomputed,
+    doubling it until its last bar meets the stored columns.
+
+    Args:
+        prices: Prices of the unchanged bars
+        kind: Indicator kind
+        params: Keyword parameters of the indicator
+        earlier: Stored columns for the same bars, computed with the
+            dropped bars in front of them
+
+    Returns:
+        Columns as if computed from prices alone
+    """
+    compute = _COMPUTE[kind]
+    n = len(prices)
+    tolerance = _REBASE_TOLERANCE * float(np.abs(prices).max(initial=0.0))
+    head = _REBASE_HEAD
+    while head < n:
+        computed = compute(prices[:head], 0, None, **params)
+        if all(
+            np.isfinite(column[-1])
+            and abs(column[-1] - earlier[name][head - 1]) <= tolerance
+            for name, column in computed.items()
+        ):
+            return {
+                name: np.concatenate((column, earlier[name][head:]))
+                for name, column in computed.items()
+            }
+        head *= 2
+    return compute(prices, 0, None, **params)
+
+
+def compute_indicator(
+    series: PriceSeries,
+    kind: IndicatorKind,
+    params: dict[str, float],
+    previous: IndicatorSeries | None = None,
+) -> IndicatorSeries:
+    """
+    Compute an indicator over a price series, extending a previous result.
+
+    When previous was computed with the same kind and params over bars the
+    series continues (it may have dropped leading bars or gained, or
+    revised, trailing ones), only the changed and new bars are computed:
+    rolling indicators look back into the unchanged bars and smoothed ones
+    resume from their stored state. Dropped leading bars move the warm-up,
+    which is recomputed for the bars it still affects. Either way the
+    result matches computing over the series from scratch.
+
+    Args:
+        series: Price series to compute over
+        kind: Indicator kind
+        params: Keyword parameters of the indicator, e.g. {"window": 20}
+        previous: Earlier result for the same kind and params, if any
+
+    Returns:
+        IndicatorSeries aligned with series; previous itself if nothing
+        changed
+    """
+    start, offset = 0, 0
+    if previous is not None:
+        offset, start = _resume_point(previous, series)
+
+    earlier = None
+    if start > 0:
+        earlier = {name: c[offset : offset + start] for name, c in previous.columns.items()}
+        if offset > 0:
+            earlier = _rebased(series.prices[:start], kind, params, earlier)
+        if start == len(series):
+            if offset == 0 and len(previous) == len(series):
+                return previous
+            return IndicatorSeries(series, earlier)
+
+    computed = _COMPUTE[kind](series.prices, start, earlier, **params)
+    if earlier is not None:
+        computed = {
+            name: np.concatenate((earlier[name], column))
+            for name, column in computed.items()
+        }
+    return IndicatorSeries(series, computed)
@@ -0,0 +1,272 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+# Latency buckets in seconds, from cache hits to slow upstream calls
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# (labels, value) pairs reported by a collector for one metric
+Samples = list[tuple[dict[str, str], float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    """Base of labelled metrics; children are created per label value tuple."""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """The child metric for a set of label values, in labelnames order."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. errors per operation."""
+
+    type = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled counter."""
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            yield f"{self.name}{_format_labels(labels)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    """Value that goes up and down, e.g. requests in flight."""
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrement the unlabelled gauge."""
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        """Set the unlabelled gauge."""
+        self.labels().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "lock")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; cumulated when rendered
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Distribution of observations, e.g. request latency, in fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record an observation in the unlabelled histogram."""
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            with child.lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative}"
+
+
+class Registry:
+    """
+    Metrics rendered together in the Prometheus text exposition format.
+
+    Besides metrics updated as events happen, collectors are called at
+    scrape time to report counters kept elsewhere (e.g. cache stats), so
+    those hot paths need no extra instrumentation.
+    """
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], Iterable[tuple[str, str, str, Samples]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(
+        self, collector: Callable[[], Iterable[tuple[str, str, str, Samples]]]
+    ) -> None:
+        """
+        Add a scrape-time collector.
+
+        Args:
+            collector: Callable yielding (name, type, help, samples) per metric
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format."""
+        blocks = [metric.render() for metric in self._metrics]
+        for collector in self._collectors:
+            for name, type_, documentation, samples in collector():
+                lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {type_}"]
+                lines.extend(
+                    f"{name}{_format_labels(labels)} {_format_value(value)}"
+                    for labels, value in samples
+                )
+                blocks.append("\n".join(lines))
+        return "\n".join(blocks) + "\n"
+
+
+registry = Registry()
+
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route and status",
+    ("method", "route", "status"),
+)
+upstream_request_duration = registry.histogram(
+    "upstream_request_duration_seconds",
+    "Upstream provider call latency by provider and operation",
+    ("provider", "operation"),
+)
+upstream_errors = registry.counter(
+    "upstream_errors_total",
+    "Failed upstream provider calls by provider, operation and reason",
+    ("provider", "operation", "reason"),
+)
+
+
+@contextmanager
+def upstream_call(provider: str, operation: str) -> Iterator[None]:
+    """
+    Time an upstream call, counting exceptions it raises as errors.
+
+    Args:
+        provider: Upstream provider, e.g. "yfinance" or "coingecko"
+        operation: Provider operation, e.g. "history"
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        upstream_errors.labels(provider, operation, type(e).__name__).inc()
+        raise
+    finally:
+        upstream_request_duration.labels(provider, operation).observe(
+            time.perf_counter() - start
+        )
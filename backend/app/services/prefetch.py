@@ -0,0 +1,111 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from app.schemas import AssetType
+
+logger = logging.getLogger(__name__)
+
+# One pass over the refresh set per interval; keep it below the quote TTL so
+# every entry is refreshed before it expires.
+PREFETCH_INTERVAL_SECONDS = float(os.getenv("PREFETCH_INTERVAL_SECONDS", "240"))
+# Minimum gap between two upstream refreshes, whatever the set size
+PREFETCH_MIN_GAP_SECONDS = float(os.getenv("PREFETCH_MIN_GAP_SECONDS", "2"))
+# Fraction of the interval the refreshes of one pass are spread over
+PREFETCH_SPREAD = 0.8
+
+Target = tuple[AssetType, str]
+
+
+class PrefetchScheduler:
+    """
+    Keeps a known set of quotes warm by refreshing them ahead of expiry.
+
+    Every interval a background thread reads the refresh set and refreshes
+    each target whose cached quote would expire before the next pass.
+    Refreshes are spaced evenly over most of the interval, and never closer
+    than the minimum gap, so a large set doesn't burst against the
+    provider's rate limit.
+    """
+
+    def __init__(
+        self,
+        targets: Callable[[], Iterable[Target]],
+        refresh: Callable[[AssetType, str], Any],
+        ttl_remaining: Callable[[AssetType, str], float],
+        interval: float = PREFETCH_INTERVAL_SECONDS,
+        min_gap: float = PREFETCH_MIN_GAP_SECONDS,
+    ):
+        self.targets = targets
+        self.refresh = refresh
+        self.ttl_remaining = ttl_remaining
+        self.interval = interval
+        self.min_gap = min_gap
+        self.refreshed = 0
+        self.skipped = 0
+        self.failed = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self) -> None:
+        """Refresh every target of the set that is due, spaced out."""
+        try:
+            targets = sorted(set(self.targets()))
+        except Exception as e:
+            logger.error(f"Error reading prefetch targets: {e}")
+            return
+        if not targets:
+            return
+
+        spacing = max(self.min_gap, self.interval * PREFETCH_SPREAD / len(targets))
+        waited = False
+        for asset_type, symbol in targets:
+            # Checked just before refreshing: a user request may have
+            # refreshed the entry since the pass started
+            if self.ttl_remaining(asset_type, symbol) > self.interval:
+                self.skipped += 1
+                continue
+            if waited and self._stop.wait(spacing):
+                return
+            waited = True
+            try:
+                if self.refresh(asset_type, symbol) is None:
+                    self.failed += 1
+                else:
+                    self.refreshed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Error prefetching {symbol}: {e}")
+
+    def start(self) -> None:
+        """Start the background refresh thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="quote-prefetch", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.run_once()
+            self._stop.wait(max(started + self.interval - time.monotonic(), 0))
+
+    def stats(self) -> dict[str, int]:
+        """Counts of refreshed, skipped and failed targets."""
+        return {
+            "refreshed": self.refreshed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+        }
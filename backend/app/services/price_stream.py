@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable
+
+from app.schemas import AssetDetail, AssetType
+
+logger = logging.getLogger(__name__)
+
+STREAM_POLL_SECONDS = float(os.getenv("STREAM_POLL_SECONDS", "15"))
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "100"))
+
+AssetKey = tuple[AssetType, str]
+QuotesFetcher = Callable[[AssetType, list[str]], Awaitable[dict[str, AssetDetail]]]
+
+
+class Subscriber:
+    """
+    One streaming client: its subscribed assets and outgoing message queue.
+
+    The queue is bounded. When a slow client lets it fill up, the oldest
+    message is dropped to make room, so a client that falls behind skips
+    intermediate prices rather than growing memory without limit.
+    """
+
+    def __init__(self, queue_size: int = STREAM_QUEUE_SIZE):
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=queue_size)
+        self.assets: set[AssetKey] = set()
+        self.dropped = 0
+
+    def push(self, message: dict[str, Any]) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class PriceStreamHub:
+    """
+    Fans out price updates from one poller per asset type to all subscribers.
+
+    The first subscriber of an asset type starts its poller and the last one
+    to leave stops it. Each poll interval the poller fetches the latest
+    quotes of every subscribed asset of its type in one batch and publishes
+    those whose price changed. Assets subscribed to in between are fetched
+    right away, so new subscribers don't wait a whole interval.
+    """
+
+    def __init__(self, fetch: QuotesFetcher, poll_interval: float = STREAM_POLL_SECONDS):
+        self.fetch = fetch
+        self.poll_interval = poll_interval
+        self._subscribers: dict[AssetKey, set[Subscriber]] = {}
+        self._symbols: dict[AssetType, set[str]] = {}
+        self._pending: dict[AssetType, set[str]] = {}
+        self._wake: dict[AssetType, asyncio.Event] = {}
+        self._pollers: dict[AssetType, asyncio.Task] = {}
+        self._last: dict[AssetKey, dict[str, Any]] = {}
+
+    def subscribe(self, subscriber: Subscriber, asset_type: AssetType, symbol: str) -> None:
+        """Subscribe to an asset, starting its type's poller if needed."""
+        key = (asset_type, symbol.upper())
+        if key in subscriber.assets:
+            return
+        subscriber.assets.add(key)
+        subscribers = self._subscribers.setdefault(key, set())
+        subscribers.add(subscriber)
+
+        if key in self._last:
+            subscriber.push(self._last[key])
+        if len(subscribers) == 1:
+            self._symbols.setdefault(asset_type, set()).add(key[1])
+            self._pending.setdefault(asset_type, set()).add(key[1])
+            self._wake.setdefault(asset_type, asyncio.Event()).set()
+        if asset_type not in self._pollers:
+            self._pollers[asset_type] = asyncio.create_task(self._poll(asset_type))
+
+    def unsubscribe(self, subscriber: Subscriber, asset_type: AssetType, symbol: str) -> None:
+        """Unsubscribe from an asset, stopping its type's poller after the last."""
+        key = (asset_type, symbol.upper())
+        subscriber.assets.discard(key)
+        subscribers = self._subscribers.get(key)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if subscribers:
+            return
+
+        del self._subscribers[key]
+        self._last.pop(key, None)
+        symbols = self._symbols[asset_type]
+        symbols.discard(key[1])
+        self._pending[asset_type].discard(key[1])
+        if not symbols:
+            poller = self._pollers.pop(asset_type, None)
+            if poller is not None:
+                poller.cancel()
+
+    def disconnect(self, subscriber: Subscriber) -> None:
+        """Drop every subscription of a client."""
+        for asset_type, symbol in list(subscriber.assets):
+            self.unsubscribe(subscriber, asset_type, symbol)
+
+    async def _poll(self, asset_type: AssetType) -> None:
+        loop = asyncio.get_running_loop()
+        wake = self._wake[asset_type]
+        pending = self._pending[asset_type]
+        next_poll = loop.time()
+        while True:
+            wake.clear()
+            if loop.time() >= next_poll:
+                symbols = sorted(self._symbols[asset_type])
+                next_poll = loop.time() + self.poll_interval
+            else:
+                symbols = sorted(pending)
+            pending.clear()
+
+            if symbols:
+                try:
+                    quotes = await self.fetch(asset_type, symbols)
+                except Exception as e:
+                    logger.error(
+                        f"Error polling {len(symbols)} {asset_type.value} quotes: {e}"
+                    )
+                    quotes = {}
+                for symbol, quote in quotes.items():
+                    self._publish((asset_type, symbol), quote)
+
+            try:
+                await asyncio.wait_for(wake.wait(), max(next_poll - loop.time(), 0))
+            except asyncio.TimeoutError:
+                pass
+
+    def _publish(self, key: AssetKey, quote: AssetDetail) -> None:
+        if key not in self._subscribers:
+            # Unsubscribed while the batch was in flight
+            return
+        last = self._last.get(key)
+        if last is not None and (
+            last["data"]["current_price"] == quote.current_price
+            and last["data"]["price_change_percent_24h"] == quote.price_change_percent_24h
+        ):
+            return
+
+        message = {
+            "type": "quote",
+            "data": quote.model_dump(
+                mode="json", exclude={"description", "high_24h", "low_24h"}
+            ),
+        }
+        self._last[key] = message
+        for subscriber in self._subscribers.get(key, ()):
+            subscriber.push(message)
+
+    async def shutdown(self) -> None:
+        """Stop all pollers."""
+        pollers = list(self._pollers.values())
+        for poller in pollers:
+            poller.cancel()
+        await asyncio.gather(*pollers, return_exceptions=True)
+        self._pollers.clear()
+        self._subscribers.clear()
+        self._symbols.clear()
+        self._pending.clear()
+        self._wake.clear()
+        self._last.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Number of active pollers, polled assets and subscriptions."""
+        return {
+            "pollers": len(self._pollers),
+            "assets": len(self._subscribers),
+            "subscriptions": sum(len(s) for s in self._subscribers.values()),
+        }
@@ -0,0 +1,227 @@
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import SessionLocal, dialect_insert
+from app.models import Asset
+from app.schemas import AssetDetail, AssetType
+
+logger = logging.getLogger(__name__)
+
+QUOTE_STORE_BATCH_SIZE = int(os.getenv("QUOTE_STORE_BATCH_SIZE", "50"))
+QUOTE_STORE_FLUSH_SECONDS = float(os.getenv("QUOTE_STORE_FLUSH_SECONDS", "5"))
+
+# Asset columns written on every upsert, besides the (asset_type, symbol) key
+_QUOTE_COLUMNS = (
+    "name",
+    "current_price",
+    "price_change_24h",
+    "price_change_percent_24h",
+    "market_cap",
+    "volume_24h",
+    "high_24h",
+    "low_24h",
+    "last_updated",
+)
+
+
+class QuoteStore:
+    """
+    Persists quote snapshots to the assets table as a second-level cache.
+
+    Writes are buffered and flushed as one batched upsert on a background
+    thread, every flush interval or as soon as the buffer fills, so saving
+    never blocks the caller on the database. Reads return snapshots younger
+    than a given age, so a restarted worker can answer from the database
+    instead of going upstream.
+
+    Quotes without a description (e.g. from batch market data) keep the
+    stored one.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        batch_size: int = QUOTE_STORE_BATCH_SIZE,
+        flush_interval: float = QUOTE_STORE_FLUSH_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: dict[tuple[AssetType, str], dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def save(self, quote: AssetDetail) -> None:
+        """
+        Queue a quote for the next batched upsert.
+
+        Args:
+            quote: Quote to persist; later quotes for an asset replace
+                earlier pending ones
+        """
+        row = {
+            "symbol": quote.symbol.upper(),
+            "asset_type": quote.asset_type,
+            "name": quote.name,
+            "current_price": quote.current_price,
+            "price_change_24h": quote.price_change_24h,
+            "price_change_percent_24h": quote.price_change_percent_24h,
+            "market_cap": quote.market_cap,
+            "volume_24h": quote.volume_24h,
+            "high_24h": quote.high_24h,
+            "low_24h": quote.low_24h,
+            "description": quote.description,
+            "last_updated": quote.last_updated or datetime.now(),
+        }
+        with self._lock:
+            self._pending[(row["asset_type"], row["symbol"])] = row
+            full = len(self._pending) >= self.batch_size
+        if full:
+            # Called from the event loop too; the flush thread does the write
+            self._wake.set()
+
+    def flush(self) -> None:
+        """Write all pending quotes in a single upsert."""
+        with self._lock:
+            rows = list(self._pending.values())
+            self._pending.clear()
+        if not rows:
+            return
+
+        try:
+            with self.session_factory() as session:
+                insert = dialect_insert(session)
+                if insert is None:
+                    for row in rows:
+                        self._merge(session, row)
+                else:
+                    stmt = insert(Asset).values(rows)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[Asset.asset_type, Asset.symbol],
+                        set_={
+                            **{column: stmt.excluded[column] for column in _QUOTE_COLUMNS},
+                            "description": func.coalesce(
+                                stmt.excluded.description, Asset.description
+                            ),
+                        },
+                    )
+                    session.execute(stmt)
+                session.commit()
+        except Exception as e:
+            logger.error(f"Error persisting {len(rows)} quotes: {e}")
+
+    def _merge(self, session: Session, row: dict) -> None:
+        """Read-then-write upsert for dialects without ON CONFLICT."""
+        asset = session.scalar(
+            select(Asset).where(
+                Asset.asset_type == row["asset_type"], Asset.symbol == row["symbol"]
+            )
+        )
+        if asset is None:
+            session.add(Asset(**row))
+        else:
+            for column in _QUOTE_COLUMNS:
+                setattr(asset, column, row[column])
+            if row["description"] is not None:
+                asset.description = row["description"]
+
+    def load(
+        self, asset_type: AssetType, symbol: str, max_age: timedelta | None
+    ) -> AssetDetail | None:
+        """
+        Read a persisted quote if it is recent enough.
+
+        Args:
+            asset_type: Asset type of the quote
+            symbol: Asset symbol
+            max_age: Maximum age of the snapshot's last_updated, or None for
+                the last known quote however old
+
+        Returns:
+            AssetDetail built from the stored row, or None
+        """
+        query = select(Asset).where(
+            Asset.symbol == symbol.upper(), Asset.asset_type == asset_type
+        )
+        if max_age is not None:
+            query = query.where(Asset.last_updated >= datetime.now() - max_age)
+        try:
+            with self.session_factory() as session:
+                asset = session.scalar(query)
+                return self._to_quote(asset) if asset is not None else None
+        except Exception as e:
+            logger.error(f"Error reading persisted quote for {symbol}: {e}")
+            return None
+
+    def load_recent(self, max_age: timedelta) -> list[AssetDetail]:
+        """
+        Read every persisted quote younger than max_age.
+
+        Args:
+            max_age: Maximum age of the snapshots' last_updated
+
+        Returns:
+            List of AssetDetail built from the stored rows
+        """
+        try:
+            with self.session_factory() as session:
+                assets = session.scalars(
+                    select(Asset).where(Asset.last_updated >= datetime.now() - max_age)
+                )
+                return [self._to_quote(asset) for asset in assets]
+        except Exception as e:
+            logger.error(f"Error reading persisted quotes: {e}")
+            return []
+
+    @staticmethod
+    def _to_quote(asset: Asset) -> AssetDetail:
+        return AssetDetail(
+            id=asset.id,
+            asset_type=asset.asset_type.value,
+            symbol=asset.symbol,
+            name=asset.name,
+            current_price=asset.current_price,
+            price_change_24h=asset.price_change_24h,
+            price_change_percent_24h=asset.price_change_percent_24h,
+            market_cap=asset.market_cap,
+            volume_24h=asset.volume_24h,
+            last_updated=asset.last_updated,
+            high_24h=asset.high_24h,
+            low_24h=asset.low_24h,
+            description=asset.description,
+        )
+
+    def start(self) -> None:
+        """Start the background flush thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="quote-store-flush", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background flush thread and write any pending quotes."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+quote_store = QuoteStore()
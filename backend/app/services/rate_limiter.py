@@ -0,0 +1,246 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+
+logger = logging.getLogger(__name__)
+
+# CoinGecko's free tier allows 10-30 calls/minute depending on load
+COINGECKO_RATE_PER_MINUTE = float(os.getenv("COINGECKO_RATE_PER_MINUTE", "25"))
+COINGECKO_BURST = int(os.getenv("COINGECKO_BURST", "5"))
+# After a 429, back off 2**n * base seconds (or Retry-After if longer)
+COINGECKO_BACKOFF_SECONDS = float(os.getenv("COINGECKO_BACKOFF_SECONDS", "2"))
+COINGECKO_MAX_BACKOFF_SECONDS = float(os.getenv("COINGECKO_MAX_BACKOFF_SECONDS", "120"))
+
+# How long a call of each priority may queue for a token before giving up
+COINGECKO_INTERACTIVE_WAIT = float(os.getenv("COINGECKO_INTERACTIVE_WAIT", "5"))
+COINGECKO_BACKGROUND_WAIT = float(os.getenv("COINGECKO_BACKGROUND_WAIT", "1"))
+
+# Longest a queued async caller sleeps before re-checking its place
+_ASYNC_POLL_SECONDS = 0.05
+
+
+class Priority(IntEnum):
+    """Call priority; lower values are served first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+    SEARCH = 2
+
+
+DEFAULT_WAIT = {
+    Priority.INTERACTIVE: COINGECKO_INTERACTIVE_WAIT,
+    Priority.BACKGROUND: COINGECKO_BACKGROUND_WAIT,
+    Priority.SEARCH: COINGECKO_BACKGROUND_WAIT,
+}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RateLimiter:
+    """
+    Process-wide token bucket with a priority queue and 429 backoff.
+
+    Tokens refill continuously at the configured rate up to the burst size.
+    Callers queue by priority, then arrival order, and only the head of the
+    queue may take a token, so interactive calls overtake queued background
+    ones. A caller that can't get a token within its wait budget gives up
+    and the call fails fast.
+
+    When the provider answers 429 the whole bucket is blocked for the
+    Retry-After delay or an exponential backoff, whichever is longer; a
+    successful call resets the backoff.
+
+    Both threads (acquire) and coroutines (acquire_async) share one queue.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = COINGECKO_RATE_PER_MINUTE,
+        burst: int = COINGECKO_BURST,
+        backoff: float = COINGECKO_BACKOFF_SECONDS,
+        max_backoff: float = COINGECKO_MAX_BACKOFF_SECONDS,
+    ):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._throttles = 0
+        self._queue: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._acquired = 0
+        self._rejected = 0
+        self._throttled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _enqueue(self, priority: Priority) -> tuple[int, int]:
+        ticket = (int(priority), next(self._seq))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _leave(self, ticket: tuple[int, int], waited: float, acquired: bool) -> None:
+        with self._cond:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+            if acquired:
+                self._acquired += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            else:
+                self._rejected += 1
+            self._cond.notify_all()
+
+    def _try_take(self, ticket: tuple[int, int]) -> float:
+        """
+        Take a token if the ticket is at the head of the queue.
+
+        Returns:
+            0 if a token was taken, else the seconds to wait before retrying
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._queue[0] != ticket:
+                return _ASYNC_POLL_SECONDS
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+            heapq.heappop(self._queue)
+            return 0.0
+
+    def acquire(self, priority: Priority, timeout: float | None = None) -> bool:
+        """
+        Block until a token is available or the wait budget runs out.
+
+        Args:
+            priority: Priority of the call
+            timeout: Wait budget in seconds (defaults per priority)
+
+        Returns:
+            True if a token was taken, False if the call should fail fast
+        """
+        timeout = DEFAULT_WAIT[priority] if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        ticket = self._enqueue(priority)
+        while True:
+            wait = self._try_take(ticket)
+            now = time.monotonic()
+            if wait == 0:
+                self._leave(ticket, now - start, acquired=True)
+                return True
+            if now + wait > deadline:
+                self._leave(ticket, now - start, acquired=False)
+                return False
+            with self._cond:
+                self._cond.wait(wait)
+
+    async def acquire_async(
+        self, priority: Priority, timeout: float | None = None
+    ) -> bool:
+        """Async variant of acquire; queued coroutines re-check periodically."""
+        timeout = DEFAULT_WAIT[priority] if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                wait = self._try_take(ticket)
+                now = time.monotonic()
+                if wait == 0:
+                    self._leave(ticket, now - start, acquired=True)
+                    return True
+                if now + wait > deadline:
+                    self._leave(ticket, now - start, acquired=False)
+                    return False
+                await asyncio.sleep(min(wait, _ASYNC_POLL_SECONDS))
+        except asyncio.CancelledError:
+            self._leave(ticket, time.monotonic() - start, acquired=False)
+            raise
+
+    def throttled(self, retry_after: float | None = None) -> float:
+        """
+        Record a 429 and block the bucket for the backoff delay.
+
+        Args:
+            retry_after: Delay the provider asked for, if any
+
+        Returns:
+            Seconds the bucket is now blocked for
+        """
+        with self._cond:
+            now = time.monotonic()
+            delay = min(self.backoff * 2**self._throttles, self.max_backoff)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            # Concurrent calls rejected by the same burst back off only once
+            if now >= self._blocked_until:
+                self._throttles += 1
+            self._throttled += 1
+            self._blocked_until = max(self._blocked_until, now + delay)
+            self._tokens = 0.0
+        logger.warning(f"Rate limited by provider, backing off {delay:.1f}s")
+        return delay
+
+    def succeeded(self) -> None:
+        """Reset the backoff after a successful call."""
+        if self._throttles:
+            with self._cond:
+                self._throttles = 0
+
+    def retry_after(self) -> float:
+        """Seconds until the bucket is unblocked; 0 if not backing off."""
+        return max(self._blocked_until - time.monotonic(), 0.0)
+
+    def stats(self) -> dict[str, float | int | dict[str, int]]:
+        """Queue depth per priority, wait times and outcome counters."""
+        with self._cond:
+            depth = {priority.name.lower(): 0 for priority in Priority}
+            for priority, _ in self._queue:
+                depth[Priority(priority).name.lower()] += 1
+            return {
+                "queue_depth": depth,
+                "acquired": self._acquired,
+                "rejected": self._rejected,
+                "throttled": self._throttled,
+                "wait_avg_seconds": self._wait_total / self._acquired
+                if self._acquired
+                else 0.0,
+                "wait_max_seconds": self._wait_max,
+                "blocked_for_seconds": self.retry_after(),
+            }
+
+
+coingecko_limiter = RateLimiter()
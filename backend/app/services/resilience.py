@@ -0,0 +1,414 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+from app.services.metrics import upstream_call, upstream_errors
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Budget for all upstream calls made while serving one API request
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "8"))
+# Per-call timeout outside any request deadline (background refreshes)
+PROVIDER_TIMEOUT = float(os.getenv("PROVIDER_TIMEOUT", "10"))
+# Threads running blocking provider calls; calls still queued when their
+# deadline passes fail instead of tying up request threads
+PROVIDER_MAX_WORKERS = int(os.getenv("PROVIDER_MAX_WORKERS", "32"))
+
+# A breaker opens once at least BREAKER_MIN_CALLS of its last BREAKER_WINDOW
+# calls were recorded and BREAKER_FAILURE_RATIO of them failed or took
+# longer than BREAKER_SLOW_CALL_SECONDS. It stays open for
+# BREAKER_OPEN_SECONDS, then lets one probe call through.
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATIO = float(os.getenv("BREAKER_FAILURE_RATIO", "0.5"))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "5"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+
+# Hedging sends a second attempt when the first is slower than the
+# operation's recent p95 latency, for providers without a tight rate limit
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS", "false").lower() == "true"
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.05"))
+# Successful call latencies kept per operation, and needed before hedging
+_LATENCY_SAMPLES = 100
+_HEDGE_MIN_SAMPLES = 20
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class ProviderUnavailable(Exception):
+    """An upstream call was not made or abandoned; serve cached data instead."""
+
+
+class CircuitOpenError(ProviderUnavailable):
+    """The operation's circuit breaker is open."""
+
+
+class DeadlineExceeded(ProviderUnavailable):
+    """The request's deadline ran out before the provider answered."""
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Bound the upstream calls made in this context to `seconds` from now.
+
+    Deadlines nest and only ever shorten: an inner deadline later than the
+    enclosing one has no effect. They follow the context into
+    run_in_threadpool and tasks; executors need copy_context().
+
+    Args:
+        seconds: Budget from now
+    """
+    expires_at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires_at if current is None else min(current, expires_at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left(default: float) -> float:
+    """
+    Seconds left of the current deadline.
+
+    Args:
+        default: Budget when there is no deadline, and upper bound otherwise
+
+    Returns:
+        Seconds left, 0 once the deadline has passed
+    """
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return default
+    return max(min(expires_at - time.monotonic(), default), 0.0)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over a rolling window of call outcomes.
+
+    Closed, calls go through. It opens when enough recent calls failed or
+    were slow, rejecting calls for open_seconds; then it is half-open and
+    lets a single probe through, closing on success and reopening on
+    failure. Also tracks successful call latencies for hedging.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    def __init__(
+        self,
+        name: str,
+        window: int = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+        failure_ratio: float = BREAKER_FAILURE_RATIO,
+        slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        # True for each failed or slow call
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._latencies: deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self.retry_after() == 0:
+                return self.HALF_OPEN
+            return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker lets a probe through; 0 otherwise."""
+        if self._state != self.OPEN:
+            return 0.0
+        return max(self._opened_at + self.open_seconds - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        """Whether a call may go through now; counts rejections."""
+        with self._lock:
+            if self._state == self.OPEN and self.retry_after() == 0:
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, ok: bool, elapsed: float) -> None:
+        """
+        Record a call's outcome.
+
+        Args:
+            ok: False if the call raised, timed out or got an error response
+            elapsed: Call duration in seconds
+        """
+        bad = not ok or elapsed >= self.slow_call_seconds
+        with self._lock:
+            if ok:
+                self._latencies.append(elapsed)
+            if self._state == self.HALF_OPEN:
+                self._probing = False
+                if bad:
+                    self._open()
+                else:
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                return
+            if self._state == self.OPEN:
+                # A call started before the breaker opened
+                return
+            self._outcomes.append(bad)
+            if (
+                len(self._outcomes) >= self.min_calls
+                and sum(self._outcomes) >= self.failure_ratio * len(self._outcomes)
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.opened += 1
+        logger.warning(f"Circuit opened for {self.name} for {self.open_seconds:.0f}s")
+
+    def hedge_delay(self) -> float | None:
+        """p95 of recent successful calls, or None with too few samples."""
+        with self._lock:
+            if len(self._latencies) < _HEDGE_MIN_SAMPLES:
+                return None
+            latencies = sorted(self._latencies)
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+        return max(p95, HEDGE_MIN_DELAY)
+
+
+class ProviderCalls:
+    """
+    Call layer for market-data providers: deadlines, breakers and hedging.
+
+    Every call runs under the current deadline (or the given timeout) and
+    the circuit breaker of its provider and operation. Blocking calls run
+    on a bounded pool so a request thread waits no longer than its
+    deadline even when the client library has no timeout of its own (as
+    with yfinance's Ticker.info); an abandoned call finishes in the
+    background. Calls raise ProviderUnavailable when rejected or out of
+    time, which services treat like any other failed call.
+    """
+
+    def __init__(self, max_workers: int = PROVIDER_MAX_WORKERS):
+        self._breakers: dict[tuple[str, str], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="provider"
+        )
+        self._hedges: dict[tuple[str, str], int] = {}
+
+    def breaker(self, provider: str, operation: str) -> CircuitBreaker:
+        """The circuit breaker of a provider operation, created on first use."""
+        key = (provider, operation)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    breaker = self._breakers[key] = CircuitBreaker(f"{provider} {operation}")
+        return breaker
+
+    def retry_after(self, provider: str) -> float:
+        """Seconds until every open breaker of a provider lets probes through."""
+        return max(
+            (
+                breaker.retry_after()
+                for (name, _), breaker in list(self._breakers.items())
+                if name == provider
+            ),
+            default=0.0,
+        )
+
+    def _start(
+        self, provider: str, operation: str, timeout: float
+    ) -> tuple[CircuitBreaker, float]:
+        """Check the deadline and breaker; return the breaker and budget."""
+        budget = time_left(timeout)
+        if budget <= 0:
+            upstream_errors.labels(provider, operation, "deadline").inc()
+            raise DeadlineExceeded(f"No time left for {provider} {operation}")
+        breaker = self.breaker(provider, operation)
+        if not breaker.allow():
+            upstream_errors.labels(provider, operation, "circuit_open").inc()
+            raise CircuitOpenError(f"Circuit open for {provider} {operation}")
+        return breaker, budget
+
+    def _hedged(self, provider: str, operation: str) -> None:
+        with self._lock:
+            key = (provider, operation)
+            self._hedges[key] = self._hedges.get(key, 0) + 1
+
+    def call(
+        self,
+        provider: str,
+        operation: str,
+        fn: Callable[[float], T],
+        timeout: float = PROVIDER_TIMEOUT,
+        hedge: bool = False,
+        failed: Callable[[T], bool] | None = None,
+    ) -> T:
+        """
+        Make a blocking provider call.
+
+        Args:
+            provider: Upstream provider, e.g. "yfinance"
+            operation: Provider operation, e.g. "history"
+            fn: Makes the call given the seconds it has left
+            timeout: Budget when there is no deadline, and upper bound
+                otherwise
+            hedge: Send a second attempt once the first takes longer than
+                the operation's recent p95 latency; first answer wins
+            failed: Marks results that count as failures for the breaker
+                (e.g. 5xx responses); they are still returned
+
+        Returns:
+            fn's result
+
+        Raises:
+            ProviderUnavailable: Breaker open or deadline exceeded
+        """
+        breaker, budget = self._start(provider, operation, timeout)
+        start = time.monotonic()
+        end = start + budget
+        context = copy_context()
+
+        def attempt() -> T:
+            with upstream_call(provider, operation):
+                return fn(max(end - time.monotonic(), 0.0))
+
+        def submit() -> Future:
+            # Each attempt runs in its own copy of the caller's context
+            return self._executor.submit(context.copy().run, attempt)
+
+        attempts = [submit()]
+        delay = breaker.hedge_delay() if hedge else None
+        hedge_at = None if delay is None else start + delay
+        pending = set(attempts)
+        error: BaseException | None = None
+        while pending:
+            until = end if hedge_at is None else min(end, hedge_at)
+            done, pending = wait(
+                pending, max(until - time.monotonic(), 0.0), FIRST_COMPLETED
+            )
+            for future in done:
+                if future.exception() is None:
+                    result = future.result()
+                    ok = failed is None or not failed(result)
+                    breaker.record(ok, time.monotonic() - start)
+                    return result
+                error = future.exception()
+            if time.monotonic() >= end:
+                break
+            if hedge_at is not None and time.monotonic() >= hedge_at:
+                hedge_at = None
+                self._hedged(provider, operation)
+                attempts.append(submit())
+                pending.add(attempts[-1])
+
+        breaker.record(False, time.monotonic() - start)
+        if pending:
+            for future in pending:
+                future.cancel()
+            upstream_errors.labels(provider, operation, "deadline").inc()
+            raise DeadlineExceeded(f"{provider} {operation} took over {budget:.2f}s")
+        raise error
+
+    async def call_async(
+        self,
+        provider: str,
+        operation: str,
+        fn: Callable[[float], Awaitable[T]],
+        timeout: float = PROVIDER_TIMEOUT,
+        hedge: bool = False,
+        failed: Callable[[T], bool] | None = None,
+    ) -> T:
+        """Async counterpart of call, running attempts as tasks."""
+        breaker, budget = self._start(provider, operation, timeout)
+        start = time.monotonic()
+        end = start + budget
+
+        async def attempt() -> T:
+            with upstream_call(provider, operation):
+                return await fn(max(end - time.monotonic(), 0.0))
+
+        pending = {asyncio.create_task(attempt())}
+        delay = breaker.hedge_delay() if hedge else None
+        hedge_at = None if delay is None else start + delay
+        error: BaseException | None = None
+        try:
+            while pending:
+                until = end if hedge_at is None else min(end, hedge_at)
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(until - time.monotonic(), 0.0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        result = task.result()
+                        ok = failed is None or not failed(result)
+                        breaker.record(ok, time.monotonic() - start)
+                        return result
+                    error = task.exception()
+                if time.monotonic() >= end:
+                    break
+                if hedge_at is not None and time.monotonic() >= hedge_at:
+                    hedge_at = None
+                    self._hedged(provider, operation)
+                    pending.add(asyncio.create_task(attempt()))
+        finally:
+            for task in pending:
+                task.cancel()
+
+        breaker.record(False, time.monotonic() - start)
+        if pending:
+            upstream_errors.labels(provider, operation, "deadline").inc()
+            raise DeadlineExceeded(f"{provider} {operation} took over {budget:.2f}s")
+        raise error
+
+    def stats(self) -> dict[tuple[str, str], dict[str, Any]]:
+        """Breaker state, open/reject counts and hedges per operation."""
+        with self._lock:
+            breakers = list(self._breakers.items())
+            hedges = dict(self._hedges)
+        return {
+            key: {
+                "state": breaker.state,
+                "opened": breaker.opened,
+                "rejected": breaker.rejected,
+                "hedged": hedges.get(key, 0),
+            }
+            for key, breaker in breakers
+        }
+
+
+provider_calls = ProviderCalls()
@@ -0,0 +1,207 @@
+import gzip
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+import brotli
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Smaller bodies are sent uncompressed; the saving isn't worth the CPU
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+
+# Fast settings suited to compressing per response rather than ahead of time
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Supported content codings, most preferred first
+ENCODINGS = ("br", "gzip")
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with a supported content coding ("br" or "gzip")."""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Pick the preferred supported coding from an Accept-Encoding header.
+
+    Returns:
+        "br", "gzip" or None for identity
+    """
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        q = params.strip().removeprefix("q=")
+        if params and q.replace(".", "", 1).isdigit() and float(q) == 0:
+            continue
+        accepted.add(coding.strip())
+    for encoding in ENCODINGS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def _digest(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class EncodedBody:
+    """
+    An encoded response body with its validators and compressed variants.
+
+    Attributes:
+        body: Uncompressed body bytes
+        digest: Hash of the uncompressed body, the basis of its ETags
+        last_modified: Unix time the body was first encoded, if tracked
+    """
+
+    __slots__ = ("body", "digest", "last_modified", "_variants")
+
+    def __init__(self, body: bytes, last_modified: float | None = None):
+        self.body = body
+        self.digest = _digest(body)
+        self.last_modified = last_modified
+        self._variants: dict[str, bytes] = {}
+
+    def etag(self, encoding: str | None = None) -> str:
+        """Strong ETag of the body in a content coding, distinct per coding."""
+        if encoding is None:
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """
+        True if an If-None-Match header names this body in any coding.
+
+        Uses weak comparison, as RFC 9110 requires for If-None-Match.
+        """
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            tag = tag.removeprefix("W/").strip('"')
+            if tag.split("-", 1)[0] == self.digest:
+                return True
+        return False
+
+    def encoded(self, encoding: str | None) -> bytes:
+        """
+        The body in a content coding, compressing at most once per coding.
+
+        Bodies below COMPRESSION_MIN_BYTES or with no coding are returned
+        uncompressed.
+        """
+        if encoding is None or len(self.body) < COMPRESSION_MIN_BYTES:
+            return self.body
+        variant = self._variants.get(encoding)
+        if variant is None:
+            variant = self._variants[encoding] = compress(self.body, encoding)
+        return variant
+
+    def __len__(self) -> int:
+        return len(self.body) + sum(len(v) for v in self._variants.values())
+
+
+class ResponseCache:
+    """
+    Per-process LRU of encoded response bodies.
+
+    Each body is remembered together with the cached value it was encoded
+    from and reused only while the data cache still returns that very
+    object, so a refreshed quote or history is re-encoded on its first
+    request and bodies never outlive the data behind them. Values decoded
+    afresh on every lookup (a shared backend without its L1) simply miss.
+    The byte budget is kept as a running total, counting the compressed
+    variants each body holds as of its last lookup.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (source value, encoded body, bytes counted for it)
+        self._bodies: OrderedDict[str, tuple[Any, EncodedBody, int]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, value: Any, encode: Callable[[Any], bytes]) -> EncodedBody:
+        """
+        Return the encoded body for a cached value, encoding it on a miss.
+
+        Args:
+            key: Cache key of the response variant (e.g. history key plus
+                format)
+            value: Cached value being rendered
+            encode: Callable turning the value into response bytes
+
+        Returns:
+            EncodedBody for the value
+        """
+        with self._lock:
+            entry = self._bodies.get(key)
+            if entry is not None and entry[0] is value:
+                _, encoded, counted = entry
+                self.hits += 1
+                # Variants compressed since the last lookup
+                size = len(encoded)
+                if size != counted:
+                    self._size += size - counted
+                    self._bodies[key] = (value, encoded, size)
+                self._bodies.move_to_end(key)
+                self._evict()
+                return encoded
+            self.misses += 1
+
+        encoded = EncodedBody(encode(value), last_modified=time.time())
+        with self._lock:
+            self._remove(key)
+            size = len(encoded)
+            self._bodies[key] = (value, encoded, size)
+            self._size += size
+            self._evict()
+        return encoded
+
+    def _remove(self, key: str) -> None:
+        entry = self._bodies.pop(key, None)
+        if entry is not None:
+            self._size -= entry[2]
+
+    def _evict(self) -> None:
+        while self._bodies and (
+            len(self._bodies) > self.max_entries or self._size > self.max_bytes
+        ):
+            _, (_, _, counted) = self._bodies.popitem(last=False)
+            self._size -= counted
+
+    def stats(self) -> dict[str, int]:
+        """Entry count, encoded bytes held and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._bodies),
+                "bytes": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self) -> None:
+        """Drop every encoded body."""
+        with self._lock:
+            self._bodies.clear()
+            self._size = 0
+
+
+response_cache = ResponseCache()
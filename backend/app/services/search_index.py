@@ -0,0 +1,179 @@
+import heapq
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Iterable
+
+# Share of a query's trigrams a name must contain to be a fuzzy match
+FUZZY_NAME_THRESHOLD = 0.6
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _bigrams(text: str) -> set[str]:
+    return {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by at most one insert, delete, substitution or swap."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return (
+            a[i + 1 :] == b[i + 1 :]
+            or (a[i : i + 2] == b[i : i + 2][::-1] and a[i + 2 :] == b[i + 2 :])
+        )
+    return a[i:] == b[i + 1 :]
+
+
+def _sorted_keys(pairs: list[tuple[str, int]]) -> tuple[list[str], array]:
+    """Split (key, row) pairs sorted by key into parallel key and row arrays."""
+    pairs.sort()
+    return [key for key, _ in pairs], array("I", (row for _, row in pairs))
+
+
+def _prefix_range(keys: list[str], prefix: str) -> tuple[int, int]:
+    """Slice of sorted keys starting with prefix."""
+    return bisect_left(keys, prefix), bisect_left(keys, prefix + "\uffff")
+
+
+class SearchIndex:
+    """
+    Immutable in-memory index for symbol/name lookup and typeahead search.
+
+    Rows are given best first (e.g. by market cap rank) and a row's position
+    is its rank, so ties always resolve to the better-ranked row. Matches
+    are ordered exact symbol, symbol prefix, name word prefix, then
+    substring of symbol or name (queries of 3+ characters, via a trigram
+    index), each group by rank. If that leaves room, fuzzy matches follow:
+    symbols one typo away (found through a symbol bigram index), then
+    names sharing most of the query's trigrams.
+    """
+
+    def __init__(self, symbols: Iterable[str], names: Iterable[str]):
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.names = list(names)
+
+        self._by_symbol: dict[str, int] = {}
+        symbol_keys = []
+        name_keys = []
+        trigrams: dict[str, array] = {}
+        bigrams: dict[str, array] = {}
+        for row, (symbol, name) in enumerate(zip(self.symbols, self.names)):
+            self._by_symbol.setdefault(symbol, row)
+            symbol_keys.append((symbol.lower(), row))
+            for gram in _bigrams(symbol.lower()):
+                bigrams.setdefault(gram, array("I")).append(row)
+            name = name.lower()
+            # Interned so words shared by many names ("inc.") are stored once
+            name_keys.extend((sys.intern(word), row) for word in set(name.split()))
+            for gram in _trigrams(f"{symbol.lower()} {name}"):
+                trigrams.setdefault(gram, array("I")).append(row)
+
+        self._symbol_keys, self._symbol_rows = _sorted_keys(symbol_keys)
+        self._name_keys, self._name_rows = _sorted_keys(name_keys)
+        self._trigrams = trigrams
+        self._bigrams = bigrams
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def lookup(self, symbol: str) -> int | None:
+        """Best-ranked row with exactly this symbol, or None."""
+        return self._by_symbol.get(symbol.upper())
+
+    def _substring_rows(self, query: str) -> list[int]:
+        postings = [self._trigrams.get(gram) for gram in _trigrams(query)]
+        if not postings or any(p is None for p in postings):
+            return []
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return sorted(
+            row
+            for row in candidates
+            if query in self.symbols[row].lower() or query in self.names[row].lower()
+        )
+
+    def _fuzzy_rows(self, query: str) -> list[int]:
+        rows = []
+        query_bigrams = _bigrams(query)
+        if query_bigrams:
+            counts = Counter()
+            for gram in query_bigrams:
+                counts.update(self._bigrams.get(gram, ()))
+            # One edit changes at most two bigrams
+            needed = len(query_bigrams) - 2
+            rows.extend(
+                sorted(
+                    row
+                    for row, count in counts.items()
+                    if count >= needed
+                    and _within_one_edit(self.symbols[row].lower(), query)
+                )
+            )
+
+        query_trigrams = _trigrams(query)
+        if len(query_trigrams) >= 2:
+            counts = Counter()
+            for gram in query_trigrams:
+                counts.update(self._trigrams.get(gram, ()))
+            needed = FUZZY_NAME_THRESHOLD * len(query_trigrams)
+            matches = [(-count, row) for row, count in counts.items() if count >= needed]
+            matches.sort()
+            rows.extend(row for _, row in matches)
+        return rows
+
+    def search(self, query: str, limit: int = 5) -> list[int]:
+        """
+        Rows matching a query, best match first.
+
+        Args:
+            query: Symbol or name fragment, case-insensitive
+            limit: Maximum number of rows
+
+        Returns:
+            Row indexes
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        results: list[int] = []
+        seen: set[int] = set()
+
+        def take(rows: Iterable[int]) -> bool:
+            for row in rows:
+                if row not in seen:
+                    seen.add(row)
+                    results.append(row)
+                    if len(results) >= limit:
+                        return True
+            return False
+
+        # Only the best `limit` rows of a prefix range can make the results
+        lo, hi = _prefix_range(self._symbol_keys, query)
+        exact_hi = bisect_right(self._symbol_keys, query, lo, hi)
+        if take(sorted(self._symbol_rows[lo:exact_hi])):
+            return results
+        if take(heapq.nsmallest(limit + len(results), self._symbol_rows[lo:hi])):
+            return results
+        lo, hi = _prefix_range(self._name_keys, query)
+        if take(heapq.nsmallest(limit + len(results), self._name_rows[lo:hi])):
+            return results
+        if len(query) >= 3 and take(self._substring_rows(query)):
+            return results
+        if len(query) >= 2:
+            take(self._fuzzy_rows(query))
+        return results
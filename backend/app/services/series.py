@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+from datetime import timezone
+
+import numpy as np
+
+from app.schemas import HistoricalDataPoint
+
+
+@dataclass(frozen=True, slots=True)
+class PriceSeries:
+    """
+    Columnar price history held as NumPy arrays.
+
+    Attributes:
+        timestamps: datetime64[ms] bar times in UTC, ascending
+        prices: float64 closing prices
+        volumes: float64 volumes, NaN where unknown
+        partial: Stored history served in place of a failed refresh; it
+            may not reach back as far as requested. Not kept by slicing.
+    """
+
+    timestamps: np.ndarray
+    prices: np.ndarray
+    volumes: np.ndarray
+    partial: bool = False
+
+    @classmethod
+    def empty(cls) -> "PriceSeries":
+        return cls(
+            np.empty(0, dtype="datetime64[ms]"),
+            np.empty(0, dtype=np.float64),
+            np.empty(0, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_epoch_ms(
+        cls, timestamps, prices, volumes=None
+    ) -> "PriceSeries":
+        """Build a series from Unix epoch milliseconds and value sequences."""
+        prices = np.asarray(prices, dtype=np.float64)
+        if volumes is None:
+            volumes = np.full(len(prices), np.nan)
+        return cls(
+            np.asarray(timestamps, dtype=np.int64).astype("datetime64[ms]"),
+            prices,
+            np.asarray(volumes, dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __sizeof__(self) -> int:
+        return self.timestamps.nbytes + self.prices.nbytes + self.volumes.nbytes
+
+    def since(self, start: np.datetime64) -> "PriceSeries":
+        """Bars at or after start."""
+        i = int(np.searchsorted(self.timestamps, start, side="left"))
+        return self[i:]
+
+    def __getitem__(self, index) -> "PriceSeries":
+        return PriceSeries(
+            self.timestamps[index], self.prices[index], self.volumes[index]
+        )
+
+    def epoch_ms(self) -> np.ndarray:
+        """Bar times as int64 Unix epoch milliseconds."""
+        return self.timestamps.astype(np.int64)
+
+    def volume_list(self) -> list[float | None]:
+        """Volumes as a list with None for unknown values."""
+        volumes = self.volumes.astype(object)
+        volumes[np.isnan(self.volumes)] = None
+        return volumes.tolist()
+
+    def to_points(self) -> list[HistoricalDataPoint]:
+        """Row-oriented points with UTC-aware timestamps."""
+        return [
+            HistoricalDataPoint.model_construct(
+                timestamp=timestamp.replace(tzinfo=timezone.utc),
+                price=price,
+                volume=volume,
+            )
+            for timestamp, price, volume in zip(
+                self.timestamps.tolist(), self.prices.tolist(), self.volume_list()
+            )
+        ]
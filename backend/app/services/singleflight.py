@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable
+
+
+class _Call:
+    """An in-flight call that followers wait on."""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function; callers that arrive while
+    it is in flight wait for and share its result or exception. Sync and
+    async callers are tracked separately, so each side coalesces among its
+    own kind of caller.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        self._async_calls: dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once per key across concurrent threads.
+
+        Args:
+            key: Deduplication key (typically the cache key)
+            fn: Zero-argument callable performing the fetch
+
+        Returns:
+            The result of fn, shared by every concurrent caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn once per key across concurrent tasks.
+
+        fn runs on its own task, which every caller awaits shielded, so a
+        caller being cancelled (e.g. its client disconnected) doesn't cancel
+        the call for the others; it completes even if all of them are gone.
+
+        Args:
+            key: Deduplication key (typically the cache key)
+            fn: Zero-argument callable returning an awaitable
+
+        Returns:
+            The awaited result of fn, shared by every concurrent caller
+        """
+        task = self._async_calls.get(key)
+        if task is not None:
+            with self._lock:
+                self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._async_calls[key] = task
+            task.add_done_callback(lambda t: self._finish_async(key, t))
+        return await asyncio.shield(task)
+
+    def _finish_async(self, key: str, task: asyncio.Future) -> None:
+        if self._async_calls.get(key) is task:
+            del self._async_calls[key]
+        # Every caller may have been cancelled; don't log an unretrieved exception
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, int]:
+        """Number of coalesced callers and calls currently in flight."""
+        with self._lock:
+            return {
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._async_calls),
+            }
+
+
+singleflight = SingleFlight()
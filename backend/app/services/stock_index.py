@@ -0,0 +1,282 @@
+import logging
+import os
+import threading
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import requests
+
+from app.schemas import AssetType, SearchResult
+from app.services.search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+# Listing shipped with the app; its order (largest companies and funds
+# first) also ranks matches in downloaded listings
+BUNDLED_LISTING_PATH = Path(__file__).resolve().parent.parent / "data" / "stock_listings.txt"
+# Where the periodically downloaded full listing is kept
+STOCK_LISTING_PATH = Path(os.getenv("STOCK_LISTING_PATH", "./stock_listings.txt"))
+# 0 disables downloads and serves the bundled listing only
+STOCK_INDEX_REFRESH_INTERVAL = timedelta(
+    hours=float(os.getenv("STOCK_INDEX_REFRESH_HOURS", "24"))
+)
+
+# NASDAQ Trader symbol directory, covering every US-listed security
+NASDAQ_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt"
+OTHER_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt"
+OTHER_LISTED_EXCHANGES = {
+    "A": "NYSE American",
+    "N": "NYSE",
+    "P": "NYSE Arca",
+    "Z": "Cboe BZX",
+    "V": "IEX",
+}
+
+# How often the refresh thread checks whether the listing is due
+_CHECK_SECONDS = 300
+
+Listing = tuple[str, str, str]  # symbol, name, exchange
+
+
+def _clean_name(name: str) -> str:
+    """Drop the share class description, e.g. "Apple Inc. - Common Stock"."""
+    name = name.split(" - ")[0]
+    for suffix in (" Common Stock", " Common Shares", " Ordinary Shares"):
+        name = name.removesuffix(suffix)
+    return name.strip()
+
+
+def parse_symbol_directory(text: str, other_listed: bool) -> list[Listing]:
+    """
+    Parse a NASDAQ Trader symbol directory file.
+
+    Args:
+        text: Pipe-delimited file contents
+        other_listed: True for otherlisted.txt, False for nasdaqlisted.txt
+
+    Returns:
+        Listings, without test issues; share class dots become dashes as
+        Yahoo Finance expects (BRK.B -> BRK-B)
+    """
+    lines = text.splitlines()
+    if not lines:
+        return []
+    header = lines[0].split("|")
+    symbol_col = header.index("ACT Symbol" if other_listed else "Symbol")
+    name_col = header.index("Security Name")
+    test_col = header.index("Test Issue")
+    exchange_col = header.index("Exchange") if other_listed else None
+
+    listings = []
+    for line in lines[1:]:
+        fields = line.split("|")
+        if (
+            len(fields) != len(header)
+            or fields[test_col] == "Y"
+            or line.startswith("File Creation Time")
+        ):
+            continue
+        exchange = (
+            OTHER_LISTED_EXCHANGES.get(fields[exchange_col], fields[exchange_col])
+            if other_listed
+            else "NASDAQ"
+        )
+        listings.append(
+            (fields[symbol_col].replace(".", "-"), _clean_name(fields[name_col]), exchange)
+        )
+    return listings
+
+
+def read_listing(path: Path) -> list[Listing]:
+    """Read a Symbol|Security Name|Exchange listing file."""
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()[1:]
+    return [tuple(line.split("|", 2)) for line in lines if line.count("|") >= 2]
+
+
+def write_listing(path: Path, listings: list[Listing]) -> None:
+    """Write a listing file atomically."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("Symbol|Security Name|Exchange\n")
+        f.writelines(f"{symbol}|{name}|{exchange}\n" for symbol, name, exchange in listings)
+    os.replace(tmp, path)
+
+
+class StockIndex:
+    """
+    Offline index of US stock and ETF listings for ticker search.
+
+    Serves the downloaded full listing when present, else the bundled one,
+    and re-downloads the NASDAQ Trader symbol directory on a background
+    thread once per refresh interval. Exchanges are stored as one byte per
+    row so tens of thousands of listings stay compact.
+    """
+
+    def __init__(
+        self,
+        listing_path: Path = STOCK_LISTING_PATH,
+        bundled_path: Path = BUNDLED_LISTING_PATH,
+        refresh_interval: timedelta = STOCK_INDEX_REFRESH_INTERVAL,
+        timeout: int = 30,
+    ):
+        self.listing_path = listing_path
+        self.bundled_path = bundled_path
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.updated_at: datetime | None = None
+        self._popularity: dict[str, int] | None = None
+        # (exchange names, exchange code per row, index), swapped as one
+        self._snapshot: tuple[list[str], array, SearchIndex] | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._index()[2])
+
+    def build(self, listings: list[Listing]) -> None:
+        """Rebuild the in-memory index, ranking by the bundled listing order."""
+        if self._popularity is None:
+            self._popularity = {
+                symbol: rank for rank, (symbol, _, _) in enumerate(read_listing(self.bundled_path))
+            }
+        unranked = len(self._popularity)
+        listings = sorted(
+            {listing[0]: listing for listing in listings}.values(),
+            key=lambda listing: (
+                self._popularity.get(listing[0], unranked),
+                len(listing[0]),
+                listing[0],
+            ),
+        )
+
+        exchanges: list[str] = []
+        codes = array("B")
+        for _, _, exchange in listings:
+            if exchange not in exchanges:
+                exchanges.append(exchange)
+            codes.append(exchanges.index(exchange))
+        self._snapshot = (
+            exchanges,
+            codes,
+            SearchIndex(
+                (symbol for symbol, _, _ in listings), (name for _, name, _ in listings)
+            ),
+        )
+
+    def load(self) -> None:
+        """Build the index from the downloaded listing, or the bundled one."""
+        path = self.listing_path if self.listing_path.exists() else self.bundled_path
+        try:
+            self.build(read_listing(path))
+        except OSError as e:
+            logger.error(f"Error reading stock listing {path}: {e}")
+            self.build([])
+            return
+        if path == self.listing_path:
+            self.updated_at = datetime.fromtimestamp(path.stat().st_mtime)
+        else:
+            logger.warning(
+                f"No stock listing at {self.listing_path}; searching the "
+                f"{len(self._snapshot[2])} bundled listings until it is downloaded"
+            )
+
+    def _index(self) -> tuple[list[str], array, SearchIndex]:
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self.load()
+        return self._snapshot
+
+    def search(self, query: str, limit: int = 5) -> list[SearchResult]:
+        """
+        Search listings by ticker or company name.
+
+        Args:
+            query: Search query (symbol or company name fragment)
+            limit: Maximum number of results
+
+        Returns:
+            List of SearchResult with symbol, name, and exchange
+        """
+        exchanges, codes, index = self._index()
+        return [
+            SearchResult(
+                symbol=index.symbols[row],
+                name=index.names[row],
+                asset_type=AssetType.STOCK,
+                exchange=exchanges[codes[row]],
+            )
+            for row in index.search(query, limit)
+        ]
+
+    def refresh(self) -> bool:
+        """
+        Download the NASDAQ Trader symbol directory and rebuild the index.
+
+        Returns:
+            True if the listing was refreshed
+        """
+        try:
+            listings = []
+            for url, other_listed in ((NASDAQ_LISTED_URL, False), (OTHER_LISTED_URL, True)):
+                response = requests.get(url, timeout=self.timeout)
+                response.raise_for_status()
+                listings.extend(parse_symbol_directory(response.text, other_listed))
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Error downloading stock listings: {e}")
+            return False
+
+        try:
+            write_listing(self.listing_path, listings)
+        except OSError as e:
+            logger.error(f"Error saving stock listing {self.listing_path}: {e}")
+        self.build(listings)
+        self.updated_at = datetime.now()
+        logger.info(f"Stock index refreshed with {len(listings)} listings")
+        return True
+
+    def start(self) -> None:
+        """Load the index and start the background refresh thread."""
+        self._index()
+        if self._thread is not None or not self.refresh_interval:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="stock-index-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self.updated_at is None or self.updated_at <= datetime.now() - self.refresh_interval:
+                self.refresh()
+            # A failed download is retried on the next check
+            self._stop.wait(_CHECK_SECONDS)
+
+
+stock_index = StockIndex()
+
+
+def main() -> None:
+    """
+    Download the full listing to STOCK_LISTING_PATH ahead of the first start.
+
+        uv run python -m app.services.stock_index
+    """
+    logging.basicConfig(level=logging.INFO)
+    if not stock_index.refresh():
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
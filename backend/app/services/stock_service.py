@@ -1,18 +1,35 @@
 import logging
 from datetime import datetime
 
-import yfinance as yf
-
 from app.schemas import AssetDetail, AssetType, HistoricalDataPoint, SearchResult
+from app.services.resilience import HEDGE_REQUESTS, provider_calls
+from app.services.series import PriceSeries
+from app.services.stock_index import StockIndex, stock_index
 
 logger = logging.getLogger(__name__)
 
+# yfinance imports pandas, the bulk of a cold start, so it is only loaded
+# by the first upstream call
+yf = None
+
+
+def _yfinance():
+    """The yfinance module, imported on first use."""
+    global yf
+    if yf is None:
+        import yfinance
+
+        yf = yfinance
+    return yf
+
 
 class StockService:
     """Service for fetching stock data using yfinance."""
 
     VALID_PERIODS = ("1d", "5d", "1mo", "3mo", "6mo", "1y", "5y")
 
+    listing_index: StockIndex = stock_index
+
     def get_stock_data(self, symbol: str) -> AssetDetail | None:
         """
         Fetch current stock data for a given symbol.
@@ -24,8 +41,11 @@ class StockService:
             AssetDetail with current price and market data, or None if not found
         """
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            ticker = _yfinance().Ticker(symbol)
+            # Ticker.info takes no timeout; the call layer stops waiting for it
+            info = provider_calls.call(
+                "yfinance", "info", lambda timeout: ticker.info, hedge=HEDGE_REQUESTS
+            )
 
             if not info or info.get("regularMarketPrice") is None:
                 logger.warning(f"No data found for symbol: {symbol}")
@@ -50,8 +70,83 @@ class StockService:
             logger.error(f"Error fetching stock data for {symbol}: {e}")
             return None
 
+    def get_stocks_quotes(self, symbols: list[str]) -> dict[str, AssetDetail]:
+        """
+        Fetch current quotes for many stocks in a single download.
+
+        The bulk download only carries OHLCV bars, so quotes have the symbol
+        as their name and no market cap or description.
+
+        Args:
+            symbols: Stock ticker symbols
+
+        Returns:
+            Dict mapping upper-case symbol to AssetDetail; symbols without
+            data are omitted
+        """
+        symbols = [symbol.upper() for symbol in symbols]
+        if not symbols:
+            return {}
+
+        try:
+            history = provider_calls.call(
+                "yfinance",
+                "download",
+                lambda timeout: _yfinance().download(
+                    symbols,
+                    period="5d",
+                    interval="1d",
+                    group_by="ticker",
+                    progress=False,
+                    threads=False,
+                    timeout=timeout,
+                ),
+                hedge=HEDGE_REQUESTS,
+            )
+        except Exception as e:
+            logger.error(f"Error fetching stock quotes for {symbols}: {e}")
+            return {}
+
+        if history is None or history.empty:
+            logger.warning(f"No quote data found for {symbols}")
+            return {}
+
+        quotes = {}
+        for symbol in symbols:
+            if history.columns.nlevels > 1:
+                if symbol not in history.columns.get_level_values(0):
+                    continue
+                bars = history[symbol]
+            else:
+                bars = history
+            bars = bars.dropna(subset=["Close"])
+            if bars.empty:
+                continue
+
+            last = bars.iloc[-1]
+            change = change_percent = None
+            if len(bars) > 1:
+                previous_close = bars["Close"].iloc[-2]
+                change = float(last["Close"] - previous_close)
+                change_percent = change / previous_close * 100
+
+            quotes[symbol] = AssetDetail(
+                id=0,
+                asset_type=AssetType.STOCK,
+                symbol=symbol,
+                name=symbol,
+                current_price=float(last["Close"]),
+                price_change_24h=change,
+                price_change_percent_24h=change_percent,
+                volume_24h=float(last["Volume"]),
+                last_updated=datetime.now(),
+                high_24h=float(last["High"]),
+                low_24h=float(last["Low"]),
+            )
+        return quotes
+
     def get_historical_data(
-        self, symbol: str, period: str = "1mo"
+        self, symbol: str, period: str = "1mo", start: datetime | None = None
     ) -> list[HistoricalDataPoint]:
         """
         Fetch historical price data for a given symbol.
@@ -59,59 +154,78 @@ class StockService:
         Args:
             symbol: Stock ticker symbol
             period: Time period - one of: 1d, 5d, 1mo, 3mo, 6mo, 1y, 5y
+            start: Fetch daily bars from this date on instead of a period
 
         Returns:
             List of HistoricalDataPoint with timestamp, price, and volume
         """
+        return self.get_historical_series(symbol, period, start).to_points()
+
+    def get_historical_series(
+        self, symbol: str, period: str = "1mo", start: datetime | None = None
+    ) -> PriceSeries:
+        """
+        Fetch historical price data for a given symbol as columns.
+
+        Columns are pulled straight out of the yfinance DataFrame, without
+        building an object per bar.
+
+        Args:
+            symbol: Stock ticker symbol
+            period: Time period - one of: 1d, 5d, 1mo, 3mo, 6mo, 1y, 5y
+            start: Fetch daily bars from this date on instead of a period
+
+        Returns:
+            PriceSeries of UTC timestamps, closing prices and volumes
+        """
         if period not in self.VALID_PERIODS:
             logger.warning(f"Invalid period {period}, defaulting to 1mo")
             period = "1mo"
 
         try:
-            ticker = yf.Ticker(symbol)
-            history = ticker.history(period=period)
+            ticker = _yfinance().Ticker(symbol)
+            if start is not None:
+                params = {"start": start.date()}
+            else:
+                params = {"period": period}
+            history = provider_calls.call(
+                "yfinance",
+                "history",
+                lambda timeout: ticker.history(**params, timeout=timeout),
+                hedge=HEDGE_REQUESTS,
+            )
 
             if history.empty:
                 logger.warning(f"No historical data found for {symbol}")
-                return []
-
-            return [
-                HistoricalDataPoint(
-                    timestamp=index.to_pydatetime(),
-                    price=row["Close"],
-                    volume=row["Volume"],
-                )
-                for index, row in history.iterrows()
-            ]
+                return PriceSeries.empty()
+
+            index = history.index
+            if index.tz is not None:
+                index = index.tz_convert("UTC").tz_localize(None)
+            return PriceSeries(
+                index.to_numpy().astype("datetime64[ms]"),
+                history["Close"].to_numpy(dtype=float),
+                history["Volume"].to_numpy(dtype=float),
+            )
         except Exception as e:
             logger.error(f"Error fetching historical data for {symbol}: {e}")
-            return []
+            return PriceSeries.empty()
 
     def search_stocks(self, query: str) -> list[SearchResult]:
         """
         Search for stocks matching the query.
 
+        Served from the offline listing index only, never from yfinance.
+        Tickers the index doesn't list, such as foreign listings, are still
+        served by the quote routes when requested exactly.
+
         Args:
             query: Search query (symbol or company name)
 
         Returns:
-            List of SearchResult with symbol, name, and exchange
+            List of top 5 SearchResult with symbol, name, and exchange
         """
-        try:
-            ticker = yf.Ticker(query.upper())
-            info = ticker.info
-
-            if not info or info.get("symbol") is None:
-                return []
-
-            return [
-                SearchResult(
-                    symbol=info.get("symbol", query.upper()),
-                    name=info.get("shortName") or info.get("longName") or query,
-                    asset_type=AssetType.STOCK,
-                    exchange=info.get("exchange"),
-                )
-            ]
-        except Exception as e:
-            logger.error(f"Error searching for {query}: {e}")
-            return []
+        return self.listing_index.search(query)
+
+
+stock_service = StockService()
@@ -0,0 +1,105 @@
+"""
+Compare per-worker in-memory caches against a shared Redis cache.
+
+Simulates several uvicorn workers, each with its own cache instance,
+serving the same quote workload, and reports how many upstream loads the
+workers made between them, the hit rate and mean lookup latency. Runs
+against fakeredis by default, or a real server with --redis-url.
+
+    uv run python -m benchmarks.bench_cache_backends [--workers 8] [--requests 4000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.schemas import AssetDetail, AssetType
+from app.services.cache import BaseCache, RedisCache, TTLCache
+from app.services.singleflight import SingleFlight
+
+TTL = timedelta(minutes=5)
+
+
+def quote(symbol: str) -> AssetDetail:
+    return AssetDetail(
+        id=0,
+        symbol=symbol,
+        name=f"{symbol} Inc.",
+        asset_type=AssetType.STOCK,
+        current_price=100.0,
+        price_change_24h=1.0,
+        price_change_percent_24h=1.0,
+        market_cap=1e9,
+        volume_24h=1e6,
+        last_updated=datetime.now(),
+    )
+
+
+def run(workers: list[BaseCache], requests: int, symbols: int) -> tuple[int, float]:
+    """Serve the workload round-robin across workers; (upstream loads, mean ms)."""
+    rng = random.Random(42)
+    loads = 0
+
+    def load(symbol: str) -> AssetDetail:
+        nonlocal loads
+        loads += 1
+        return quote(symbol)
+
+    start = time.perf_counter()
+    for i in range(requests):
+        symbol = f"SYM{rng.randrange(symbols)}"
+        workers[i % len(workers)].get_or_load(
+            f"stock:{symbol}", lambda: load(symbol), TTL
+        )
+    return loads, (time.perf_counter() - start) / requests * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--redis-url", help="Real server to use instead of fakeredis")
+    args = parser.parse_args()
+
+    if args.redis_url:
+        import redis
+
+        def client():
+            return redis.Redis.from_url(args.redis_url)
+    else:
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+
+        def client():
+            return fakeredis.FakeRedis(server=server)
+
+    prefix = f"bench:{time.time_ns()}:"
+    cases = {
+        "memory (per worker)": [
+            TTLCache(flight=SingleFlight()) for _ in range(args.workers)
+        ],
+        "redis (shared)": [
+            RedisCache(client(), prefix, flight=SingleFlight())
+            for _ in range(args.workers)
+        ],
+        "redis + 5s L1": [
+            RedisCache(client(), prefix + "l1:", timedelta(seconds=5), flight=SingleFlight())
+            for _ in range(args.workers)
+        ],
+    }
+
+    print(
+        f"{args.workers} workers, {args.requests} requests over {args.symbols} symbols"
+    )
+    print(f"{'backend':<22}{'upstream loads':>16}{'hit rate':>10}{'mean ms':>10}")
+    for name, workers in cases.items():
+        loads, mean_ms = run(workers, args.requests, args.symbols)
+        hit_rate = 1 - loads / args.requests
+        print(f"{name:<22}{loads:>16}{hit_rate:>10.1%}{mean_ms:>10.3f}")
+        workers[0].clear()
+
+
+if __name__ == "__main__":
+    main()
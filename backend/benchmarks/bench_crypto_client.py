@@ -0,0 +1,89 @@
+"""
+Compare per-call requests.get against the pooled async CoinGecko client.
+
+Runs the same concurrent workload against a local CoinGecko stub and
+reports wall time and how many TCP connections each client opened.
+
+    uv run python -m benchmarks.bench_crypto_client [--requests 200] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.coingecko_stub import CoinGeckoStub
+from app.services.crypto_service import AsyncCryptoService, CryptoService
+from app.services.rate_limiter import RateLimiter
+
+# The comparison is about connection reuse, not CoinGecko's rate limit
+UNLIMITED = RateLimiter(rate_per_minute=10**9, burst=10**6)
+
+SYMBOLS = ["BTC", "ETH", "SOL", "ADA", "DOGE"]
+
+
+def run_sync(total: int, concurrency: int) -> float:
+    service = CryptoService(limiter=UNLIMITED)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(
+            executor.map(
+                lambda i: service.get_crypto_data(SYMBOLS[i % len(SYMBOLS)]),
+                range(total),
+            )
+        )
+    return time.perf_counter() - start
+
+
+async def run_async(base_url: str, total: int, concurrency: int) -> float:
+    service = AsyncCryptoService(
+        base_url=base_url,
+        max_connections=concurrency,
+        max_keepalive_connections=concurrency,
+        limiter=UNLIMITED,
+    )
+    await service.start()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            return await service.get_crypto_data(SYMBOLS[i % len(SYMBOLS)])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    await service.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with CoinGeckoStub(latency=args.latency) as stub:
+        # The sync service reads the module-level base URL on every call; the
+        # package exports a crypto_service instance under the module's name
+        crypto_module = importlib.import_module("app.services.crypto_service")
+        crypto_module.COINGECKO_BASE_URL = stub.base_url
+
+        elapsed = run_sync(args.requests, args.concurrency)
+        print(
+            f"requests.get     {elapsed:7.3f}s  "
+            f"{args.requests / elapsed:8.1f} req/s  "
+            f"connections={stub.connections}"
+        )
+
+        stub.reset_counters()
+        elapsed = asyncio.run(run_async(stub.base_url, args.requests, args.concurrency))
+        print(
+            f"pooled httpx     {elapsed:7.3f}s  "
+            f"{args.requests / elapsed:8.1f} req/s  "
+            f"connections={stub.connections}"
+        )
+
+
+if __name__ == "__main__":
+    main()
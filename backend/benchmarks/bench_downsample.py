@@ -0,0 +1,80 @@
+"""
+Measure history payload size and latency with and without max_points.
+
+Serves synthetic series (no upstream calls) through the real routes and
+reports response bytes and mean request latency on cache hits.
+
+    uv run python -m benchmarks.bench_downsample [--requests 50] [--max-points 500]
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers.dependencies import get_history_store
+from app.services import PriceSeries, cache
+
+HOUR_MS = 3_600_000
+DAY_MS = 24 * HOUR_MS
+
+
+def synthetic_series(points: int, step_ms: int) -> PriceSeries:
+    rng = np.random.default_rng(42)
+    end = int(time.time() * 1000)
+    timestamps = end - step_ms * np.arange(points)[::-1]
+    prices = 100 + np.cumsum(rng.normal(0, 1, points))
+    volumes = rng.uniform(1e5, 1e6, points)
+    return PriceSeries.from_epoch_ms(timestamps, prices, volumes)
+
+
+def measure(client: TestClient, url: str, requests: int) -> tuple[int, float]:
+    cache.clear()
+    response = client.get(url)  # fill the cache
+    response.raise_for_status()
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(url)
+    return len(response.content), (time.perf_counter() - start) / requests * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--max-points", type=int, default=500)
+    args = parser.parse_args()
+
+    crypto = synthetic_series(365 * 24, HOUR_MS)
+    stock = synthetic_series(5 * 252, DAY_MS)
+
+    async def crypto_history(symbol, days):
+        return crypto
+
+    app.dependency_overrides[get_history_store] = lambda: SimpleNamespace(
+        get_crypto_history_async=crypto_history,
+        get_stock_history=lambda symbol, period: stock,
+    )
+
+    cases = [
+        ("crypto days=365", "/api/assets/crypto/BTC/history?days=365", len(crypto)),
+        ("stock period=5y", "/api/assets/stocks/AAPL/history?period=5y", len(stock)),
+    ]
+    with TestClient(app) as client:
+        for name, url, points in cases:
+            for fmt in ("rows", "columnar"):
+                base = f"{url}&format={fmt}"
+                full_bytes, full_ms = measure(client, base, args.requests)
+                small_bytes, small_ms = measure(
+                    client, f"{base}&max_points={args.max_points}", args.requests
+                )
+                print(
+                    f"{name:16} {fmt:8} points {points:5} -> {args.max_points:4}  "
+                    f"bytes {full_bytes:8} -> {small_bytes:7}  "
+                    f"latency {full_ms:7.2f} ms -> {small_ms:6.2f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Measure technical indicators: full versus incremental computation, and
+the indicators endpoint against the history it is computed from.
+
+- compute: time to compute each indicator over a whole series, and to
+  update the previous result after the series slid by one new bar, with
+  the largest difference between the two results
+- endpoint: latency of cache hits, of requests right after the history was
+  refreshed with a new bar, and response bytes next to /history
+
+Serves synthetic series (no upstream calls) through the real routes.
+
+    uv run python -m benchmarks.bench_indicators [--points 8760] [--requests 50]
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers.dependencies import get_history_store
+from app.services import PriceSeries, cache, compute_indicator
+
+HOUR_MS = 3_600_000
+
+CASES = [
+    ("sma", {"window": 20}),
+    ("ema", {"window": 20}),
+    ("rsi", {"window": 14}),
+    ("bollinger", {"window": 20, "std": 2.0}),
+    ("macd", {"fast": 12, "slow": 26, "signal": 9}),
+]
+
+
+def synthetic_series(points: int, step_ms: int, seed: int = 42) -> PriceSeries:
+    rng = np.random.default_rng(seed)
+    end = int(time.time() * 1000)
+    timestamps = end - step_ms * np.arange(points)[::-1]
+    prices = 100 + np.cumsum(rng.normal(0, 1, points))
+    volumes = rng.uniform(1e5, 1e6, points)
+    return PriceSeries.from_epoch_ms(timestamps, prices, volumes)
+
+
+def next_bar(series: PriceSeries) -> PriceSeries:
+    """The series a fixed-length history becomes one bar later."""
+    timestamps = series.epoch_ms()
+    prices = np.append(series.prices[1:], series.prices[-1] + 0.5)
+    return PriceSeries.from_epoch_ms(
+        np.append(timestamps[1:], timestamps[-1] + HOUR_MS),
+        prices,
+        np.append(series.volumes[1:], 1e5),
+    )
+
+
+def best_of(fn, repeat: int) -> float:
+    """Fastest of repeat calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def compute(series: PriceSeries, repeat: int) -> None:
+    updated = next_bar(series)
+    print(f"{'indicator':<11}{'full':>10}{'update':>10}{'speedup':>9}{'max diff':>11}")
+    for kind, params in CASES:
+        previous = compute_indicator(series, kind, params)
+        full_ms = best_of(lambda: compute_indicator(updated, kind, params), repeat)
+        update_ms = best_of(
+            lambda: compute_indicator(updated, kind, params, previous), repeat
+        )
+        full = compute_indicator(updated, kind, params)
+        incremental = compute_indicator(updated, kind, params, previous)
+        diff = 0.0
+        for name, column in full.columns.items():
+            other = incremental.columns[name]
+            if not np.array_equal(np.isnan(column), np.isnan(other)):
+                diff = float("inf")
+            else:
+                diff = max(diff, float(np.nanmax(np.abs(column - other), initial=0.0)))
+        print(
+            f"{kind:<11}{full_ms:>8.3f}ms{update_ms:>8.3f}ms"
+            f"{full_ms / update_ms:>8.1f}x{diff:>11.1e}"
+        )
+
+
+def endpoint(client: TestClient, series: PriceSeries, requests: int) -> None:
+    history = {"series": series}
+
+    async def crypto_history(symbol, days):
+        return history["series"]
+
+    app.dependency_overrides[get_history_store] = lambda: SimpleNamespace(
+        get_crypto_history_async=crypto_history
+    )
+    cache.clear()
+
+    url = "/api/assets/crypto/BTC/history?days=365&format=columnar"
+    history_bytes = len(client.get(url).content)
+    print(f"/history columnar: {history_bytes} bytes\n")
+    print(f"{'indicator':<11}{'bytes':>9}{'hit':>10}{'new bar':>10}")
+    for kind, _ in CASES:
+        url = f"/api/assets/crypto/BTC/indicators?days=365&kind={kind}"
+        response = client.get(url)
+        response.raise_for_status()
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get(url)
+        hit_ms = (time.perf_counter() - start) / requests * 1000
+
+        # Each request follows a history refresh that brought one new bar
+        elapsed = 0.0
+        for _ in range(requests):
+            history["series"] = next_bar(history["series"])
+            cache.delete("crypto_history:BTC:365")
+            start = time.perf_counter()
+            client.get(url).raise_for_status()
+            elapsed += time.perf_counter() - start
+        print(
+            f"{kind:<11}{len(response.content):>9}{hit_ms:>8.2f}ms"
+            f"{elapsed / requests * 1000:>8.2f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=365 * 24)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    series = synthetic_series(args.points, HOUR_MS)
+    print(f"compute ({args.points} bars, best of {args.repeat})")
+    compute(series, args.repeat)
+    print()
+    with TestClient(app) as client:
+        endpoint(client, series, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Load-test the API's hot paths against local fake upstream providers.
+
+Runs the app in process (lifespan included) on a throwaway SQLite
+database, with CoinGecko served by the local stub and yfinance replaced by
+a fake, both with configurable latency and failure injection. Each
+scenario is driven by concurrent clients and reports throughput,
+p50/p95/p99 latency, failed requests and peak memory:
+
+- single quote, cache hit (stock and crypto) and miss (stock)
+- stock history for each period and crypto history for each day range
+- search
+- the watchlist with 1, 10 and 100 items
+
+Results can be saved as a baseline and later runs compared against it;
+the run exits non-zero when a scenario's throughput or p95 latency
+regressed by more than the tolerance.
+
+    uv run python -m benchmarks.bench_load [--requests 200] [--concurrency 10]
+        [--latency 0.02] [--fail-rate 0] [--save-baseline FILE] [--compare FILE]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+
+import httpx
+import numpy as np
+
+from benchmarks.coingecko_stub import CoinGeckoStub
+from benchmarks.fake_yfinance import PERIOD_BARS, FakeYFinance
+
+CRYPTO_DAYS = (1, 7, 30, 90, 365)
+WATCHLIST_SIZES = (1, 10, 100)
+
+
+class Scenario(NamedTuple):
+    name: str
+    # Request path for the i-th request of the run
+    path: Callable[[int], str]
+    # Called once before the scenario runs
+    setup: Callable[[], None] | None = None
+    # Whether to send one unmeasured request first to fill the caches
+    warm: bool = True
+
+
+def configure_environment(database_path: str, coingecko_url: str) -> None:
+    """Point the app at the stand-ins; must run before the app is imported."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+    os.environ["COINGECKO_BASE_URL"] = coingecko_url
+    # Measure the app, not CoinGecko's free-tier rate limit
+    os.environ["COINGECKO_RATE_PER_MINUTE"] = "1000000"
+    os.environ["COINGECKO_BURST"] = "1000000"
+    # No listing downloads or background prefetching skewing the numbers
+    os.environ["STOCK_INDEX_REFRESH_HOURS"] = "0"
+    os.environ["PREFETCH_SYMBOLS"] = ""
+    os.environ["PREFETCH_WATCHLIST"] = "false"
+
+
+def seed_watchlist(size: int) -> None:
+    """Replace the watchlist with `size` items, every fifth one a coin."""
+    from app.database import SessionLocal
+    from app.models import AssetType, Watchlist
+    from app.services.crypto_service import BaseCryptoService
+
+    coins = list(BaseCryptoService.SYMBOL_TO_ID)
+    items = [
+        Watchlist(asset_type=AssetType.CRYPTO, symbol=coins[i // 5 % len(coins)])
+        if i % 5 == 4
+        else Watchlist(asset_type=AssetType.STOCK, symbol=f"W{i:03d}")
+        for i in range(size)
+    ]
+    with SessionLocal() as db:
+        db.query(Watchlist).delete()
+        db.add_all(items)
+        db.commit()
+
+
+def scenarios() -> list[Scenario]:
+    cases = [
+        Scenario("quote hit stock", lambda i: "/api/assets/stocks/AAPL"),
+        Scenario("quote hit crypto", lambda i: "/api/assets/crypto/BTC"),
+        # A new symbol per request: process cache, quote store, then upstream
+        Scenario("quote miss stock", lambda i: f"/api/assets/stocks/M{i:05d}", warm=False),
+    ]
+    for period in PERIOD_BARS:
+        cases.append(
+            Scenario(
+                f"stock history {period}",
+                lambda i, period=period: f"/api/assets/stocks/AAPL/history?period={period}",
+            )
+        )
+    for days in CRYPTO_DAYS:
+        cases.append(
+            Scenario(
+                f"crypto history {days}d",
+                lambda i, days=days: f"/api/assets/crypto/BTC/history?days={days}",
+            )
+        )
+    cases.append(Scenario("search", lambda i: "/api/assets/search?query=app"))
+    for size in WATCHLIST_SIZES:
+        cases.append(
+            Scenario(
+                f"watchlist {size}",
+                lambda i: "/api/watchlist/",
+                setup=lambda size=size: seed_watchlist(size),
+            )
+        )
+    return cases
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    trace_memory: bool,
+) -> dict:
+    """
+    Drive one scenario with `concurrency` clients sharing `requests` requests.
+
+    Returns:
+        Throughput, latency percentiles in ms, error count and memory
+    """
+    if scenario.setup is not None:
+        scenario.setup()
+    if scenario.warm:
+        await client.get(scenario.path(0))
+
+    latencies: list[float] = []
+    errors = 0
+    indexes = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in indexes:
+            start = time.perf_counter()
+            response = await client.get(scenario.path(i))
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    traced_peak = None
+    if trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput": requests / elapsed,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "peak_rss_mb": peak_rss_mb(),
+        "traced_peak_mb": traced_peak,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict]:
+    # Imported after configure_environment so settings read at import apply
+    from app.main import app
+    from app.services import cache, response_cache
+
+    cache.clear()
+    response_cache.clear()
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in scenarios():
+                if args.only and not any(part in scenario.name for part in args.only):
+                    continue
+                results[scenario.name] = await run_scenario(
+                    client, scenario, args.requests, args.concurrency, args.trace_memory
+                )
+                print_result(scenario.name, results[scenario.name])
+    return results
+
+
+def print_header() -> None:
+    print(
+        f"{'scenario':<22}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'errors':>8}{'rss MB':>9}{'heap MB':>9}"
+    )
+
+
+def print_result(name: str, result: dict) -> None:
+    heap = result["traced_peak_mb"]
+    print(
+        f"{name:<22}{result['throughput']:>9.0f}{result['p50_ms']:>9.2f}"
+        f"{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}{result['errors']:>8}"
+        f"{result['peak_rss_mb']:>9.0f}{'-' if heap is None else f'{heap:.1f}':>9}"
+    )
+
+
+def compare(
+    baseline: dict, results: dict[str, dict], settings: dict, tolerance: float
+) -> list[str]:
+    """
+    Compare results against a saved baseline.
+
+    Args:
+        baseline: Contents of a file written with --save-baseline
+        results: Results of this run by scenario name
+        settings: Load settings of this run
+        tolerance: Allowed relative throughput drop or p95 increase
+
+    Returns:
+        Names of the scenarios that regressed beyond the tolerance
+    """
+    if baseline["settings"] != settings:
+        print("note: baseline was recorded with different settings")
+
+    regressed = []
+    print(f"\n{'scenario':<22}{'req/s':>10}{'p95':>10}")
+    for name, result in results.items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        throughput = result["throughput"] / before["throughput"] - 1
+        p95 = result["p95_ms"] / before["p95_ms"] - 1
+        flag = ""
+        if throughput < -tolerance or p95 > tolerance:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<22}{throughput:>+10.1%}{p95:>+10.1%}{flag}")
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="Upstream latency in seconds"
+    )
+    parser.add_argument(
+        "--fail-rate", type=float, default=0.0, help="Fraction of upstream calls failing"
+    )
+    parser.add_argument(
+        "--only", nargs="*", help="Run only scenarios whose name contains one of these"
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Also report the Python heap peak per scenario (slows requests)",
+    )
+    parser.add_argument("--save-baseline", metavar="FILE")
+    parser.add_argument("--compare", metavar="FILE")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    settings = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "latency": args.latency,
+        "fail_rate": args.fail_rate,
+    }
+    # Injected failures are logged by the services as errors
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+
+    fake_yfinance = FakeYFinance(latency=args.latency, fail_rate=args.fail_rate)
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        CoinGeckoStub(latency=args.latency, fail_rate=args.fail_rate) as stub,
+    ):
+        configure_environment(os.path.join(tmp, "bench.db"), stub.base_url)
+        print_header()
+        with fake_yfinance.patch():
+            results = asyncio.run(run(args))
+        print(
+            f"\nupstream calls: yfinance={fake_yfinance.calls} "
+            f"coingecko={stub.requests}"
+        )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "settings": settings,
+                    "scenarios": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressed = compare(baseline, results, settings, args.tolerance)
+        if regressed:
+            print(f"\n{len(regressed)} scenario(s) regressed beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
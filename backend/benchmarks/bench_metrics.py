@@ -0,0 +1,75 @@
+"""
+Measure the hot-path cost of request and upstream instrumentation.
+
+Times a no-op ASGI app with and without MetricsMiddleware, plus a bare
+histogram observation and an upstream_call block, and reports the added
+cost per request in microseconds.
+
+    uv run python -m benchmarks.bench_metrics [--iterations 100000]
+"""
+import argparse
+import asyncio
+import time
+
+from app.routers.metrics import MetricsMiddleware
+from app.services.metrics import Histogram, upstream_call
+
+
+class FakeRoute:
+    path = "/api/assets/stocks/{symbol}"
+
+
+async def endpoint(scope, receive, send):
+    scope["route"] = FakeRoute
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def time_app(app, iterations: int) -> float:
+    """Mean microseconds per request through an ASGI app."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app({"type": "http", "method": "GET"}, receive, send)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def time_block(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    bare = asyncio.run(time_app(endpoint, args.iterations))
+    instrumented = asyncio.run(time_app(MetricsMiddleware(endpoint), args.iterations))
+    histogram = Histogram("bench_seconds", "Benchmark", ("route",)).labels("/x")
+    observe = time_block(lambda: histogram.observe(0.003), args.iterations)
+
+    def upstream():
+        with upstream_call("bench", "op"):
+            pass
+
+    upstream_cost = time_block(upstream, args.iterations)
+
+    print(f"{'no-op request':<28}{bare:>8.2f} us")
+    print(f"{'with MetricsMiddleware':<28}{instrumented:>8.2f} us")
+    print(f"{'middleware overhead':<28}{instrumented - bare:>8.2f} us")
+    print(f"{'histogram observe':<28}{observe:>8.2f} us")
+    print(f"{'upstream_call block':<28}{upstream_cost:>8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
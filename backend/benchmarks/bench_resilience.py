@@ -0,0 +1,151 @@
+"""
+Exercise deadlines, circuit breakers and hedging against a fake yfinance.
+
+Three parts, all local:
+
+- hedging: sequential provider calls where every 30th call is slow,
+  with and without a hedged second attempt, reporting tail latency
+- degraded provider: concurrent stock quote misses while yfinance hangs
+  for longer than the request deadline, reporting latencies and statuses
+  as the breaker opens, and a cached crypto quote's latency meanwhile
+- last known quote: a quote persisted an hour ago is served (and then
+  flagged stale) while the yfinance breaker is open
+
+    uv run python -m benchmarks.bench_resilience [--requests 300]
+        [--deadline 1] [--hang 3]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import httpx
+import numpy as np
+
+from benchmarks.bench_load import configure_environment
+from benchmarks.coingecko_stub import CoinGeckoStub
+from benchmarks.fake_yfinance import FakeYFinance
+
+
+def percentiles(latencies: list[float]) -> str:
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return f"p50={p50:7.1f}ms p95={p95:7.1f}ms p99={p99:7.1f}ms"
+
+
+def hedging(fake: FakeYFinance, requests: int) -> None:
+    from app.services import ProviderCalls
+
+    print("hedging (every 30th call takes 500ms)")
+    fake.latency, fake.slow_rate, fake.slow_latency = 0.01, 1 / 30, 0.5
+    for hedge in (False, True):
+        calls = ProviderCalls()
+        latencies = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            calls.call("yfinance", "info", lambda timeout: fake.Ticker("AAPL").info, hedge=hedge)
+            latencies.append(time.perf_counter() - start)
+        hedged = calls.stats()[("yfinance", "info")]["hedged"]
+        print(f"  {'hedged' if hedge else 'single':<8}{percentiles(latencies)}  hedges={hedged}")
+    fake.slow_rate = 0.0
+
+
+async def degraded(
+    client: httpx.AsyncClient, fake: FakeYFinance, requests: int, hang: float
+) -> None:
+    print(f"\ndegraded provider (yfinance takes {hang:.0f}s)")
+    fake.latency = hang
+    await client.get("/api/assets/crypto/BTC")  # cache a healthy quote
+
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    healthy: list[float] = []
+    indexes = iter(range(requests))
+
+    async def quote_misses():
+        for i in indexes:
+            start = time.perf_counter()
+            response = await client.get(f"/api/assets/stocks/D{i:05d}")
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    async def healthy_hits():
+        while len(latencies) < requests:
+            start = time.perf_counter()
+            await client.get("/api/assets/crypto/BTC")
+            healthy.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(quote_misses() for _ in range(20)), healthy_hits())
+    print(f"  stock misses  {percentiles(latencies)}  max={max(latencies):.2f}s")
+    print(f"  statuses      {dict(sorted(statuses.items()))}")
+    print(f"  crypto hits   {percentiles(healthy)}")
+
+
+def seed_last_known() -> None:
+    """Persist a quote for LAST as if it was fetched an hour ago."""
+    from app.schemas import AssetDetail, AssetType
+    from app.services import quote_store
+
+    quote_store.save(
+        AssetDetail(
+            id=0,
+            symbol="LAST",
+            name="Last Known Inc.",
+            asset_type=AssetType.STOCK,
+            current_price=42.0,
+            last_updated=datetime.now() - timedelta(hours=1),
+        )
+    )
+    quote_store.flush()
+
+
+async def last_known(client: httpx.AsyncClient) -> None:
+    from app.routers.assets import STALE_HEADER
+
+    print("\nlast known quote while the breaker is open")
+    for attempt in ("first", "second"):
+        response = await client.get("/api/assets/stocks/LAST")
+        print(
+            f"  {attempt} request: {response.status_code} "
+            f"price={response.json().get('current_price')} "
+            f"stale={response.headers.get(STALE_HEADER, 'no')}"
+        )
+
+
+async def run(args: argparse.Namespace, fake: FakeYFinance) -> None:
+    from app.main import app
+
+    hedging(fake, args.requests)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            seed_last_known()
+            await degraded(client, fake, args.requests, args.hang)
+            await last_known(client)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--deadline", type=float, default=1.0)
+    parser.add_argument("--hang", type=float, default=3.0)
+    args = parser.parse_args()
+    # Every rejected call is logged by the services
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+
+    fake = FakeYFinance()
+    with tempfile.TemporaryDirectory() as tmp, CoinGeckoStub() as stub:
+        configure_environment(os.path.join(tmp, "bench.db"), stub.base_url)
+        os.environ["REQUEST_DEADLINE_SECONDS"] = str(args.deadline)
+        with fake.patch():
+            asyncio.run(run(args, fake))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Compare cache-hit throughput of pre-encoded response bodies against
+returning pydantic models for FastAPI to validate and serialize.
+
+Serves synthetic quotes and series (no upstream calls) and reports
+requests per second for the real routes, which send cached orjson bytes,
+and for baseline routes rendering the same cached values the old way.
+
+    uv run python -m benchmarks.bench_response_encoding [--requests 300]
+"""
+import argparse
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi import APIRouter
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import assets
+from app.routers.dependencies import get_history_store
+from app.schemas import AssetDetail, AssetHistory, AssetHistoryColumns, AssetType
+from app.services import cache
+from benchmarks.bench_downsample import DAY_MS, HOUR_MS, synthetic_series
+
+baseline = APIRouter(prefix="/baseline")
+
+
+@baseline.get("/stocks/{symbol}", response_model=AssetDetail)
+def baseline_quote(symbol: str):
+    return cache.get(assets.quote_cache_key(AssetType.STOCK, symbol))
+
+
+@baseline.get("/history/{key}", response_model=AssetHistory | AssetHistoryColumns)
+def baseline_history(key: str, format: assets.HistoryFormat = "rows"):
+    series = cache.get(key)
+    if format == "columnar":
+        return AssetHistoryColumns(
+            symbol="BTC",
+            asset_type=AssetType.CRYPTO,
+            timestamps=series.epoch_ms().tolist(),
+            prices=series.prices.tolist(),
+            volumes=series.volume_list(),
+        )
+    return AssetHistory(symbol="BTC", asset_type=AssetType.CRYPTO, data=series.to_points())
+
+
+def requests_per_second(client: TestClient, url: str, requests: int) -> float:
+    client.get(url).raise_for_status()  # fill the caches
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(url)
+    return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    app.include_router(baseline)
+    crypto = synthetic_series(365 * 24, HOUR_MS)
+    stock = synthetic_series(5 * 252, DAY_MS)
+
+    async def crypto_history(symbol, days):
+        return crypto
+
+    app.dependency_overrides[get_history_store] = lambda: SimpleNamespace(
+        get_crypto_history_async=crypto_history,
+        get_stock_history=lambda symbol, period: stock,
+    )
+
+    quote = AssetDetail(
+        id=0,
+        symbol="AAPL",
+        name="Apple Inc.",
+        asset_type=AssetType.STOCK,
+        current_price=190.5,
+        price_change_24h=1.2,
+        price_change_percent_24h=0.63,
+        market_cap=2.9e12,
+        volume_24h=5.1e7,
+        last_updated=datetime.now(),
+    )
+    cache.set("stock:AAPL", quote)
+    # The real routes cache history under these keys on first request
+    cache.set("crypto_history:BTC:365", crypto)
+    cache.set("stock_history:AAPL:5y", stock)
+
+    cases = [
+        ("quote", "/baseline/stocks/AAPL", "/api/assets/stocks/AAPL"),
+        (
+            "crypto 365d rows",
+            "/baseline/history/crypto_history:BTC:365",
+            "/api/assets/crypto/BTC/history?days=365",
+        ),
+        (
+            "crypto 365d columnar",
+            "/baseline/history/crypto_history:BTC:365?format=columnar",
+            "/api/assets/crypto/BTC/history?days=365&format=columnar",
+        ),
+        (
+            "stock 5y rows",
+            "/baseline/history/stock_history:AAPL:5y",
+            "/api/assets/stocks/AAPL/history?period=5y",
+        ),
+    ]
+
+    # Compare encoding alone; compressed variants are memoized separately
+    client = TestClient(app, headers={"Accept-Encoding": "identity"})
+    print(f"{'case':<24}{'models req/s':>14}{'bytes req/s':>14}{'speedup':>9}")
+    for name, before_url, after_url in cases:
+        before = requests_per_second(client, before_url, args.requests)
+        after = requests_per_second(client, after_url, args.requests)
+        print(f"{name:<24}{before:>14.0f}{after:>14.0f}{after / before:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
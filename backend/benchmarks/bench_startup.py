@@ -0,0 +1,166 @@
+"""
+Measure how long a fresh worker takes to start.
+
+Each run starts a new interpreter, so nothing is warm but the OS file
+cache:
+
+- import: wall time of `import app.main`, and whether yfinance or pandas
+  were loaded by it
+- first /health: time from spawning uvicorn until /health answers 200,
+  which includes the interpreter start, imports and the app lifespan
+
+Results can be saved as a baseline and later runs compared against it;
+the run exits non-zero when a median regressed by more than the tolerance.
+
+    uv run python -m benchmarks.bench_startup [--runs 5]
+        [--save-baseline FILE] [--compare FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.bench_load import configure_environment
+from benchmarks.coingecko_stub import CoinGeckoStub
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(elapsed, "yfinance" in sys.modules, "pandas" in sys.modules)
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import() -> tuple[float, bool, bool]:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        env=os.environ,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    return float(output[0]), output[1] == "True", output[2] == "True"
+
+
+def measure_first_health(timeout: float = 60) -> float:
+    """Seconds from spawning uvicorn until /health first answers 200."""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env=os.environ,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=1) as client:
+            while time.perf_counter() - start < timeout:
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.005)
+        raise TimeoutError(f"/health did not answer within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def compare(baseline: dict, results: dict[str, float], tolerance: float) -> list[str]:
+    """
+    Compare medians against a saved baseline.
+
+    Args:
+        baseline: Contents of a file written with --save-baseline
+        results: Median seconds of this run by measurement
+        tolerance: Allowed relative increase
+
+    Returns:
+        Names of the measurements that regressed beyond the tolerance
+    """
+    regressed = []
+    print(f"\n{'measurement':<16}{'change':>10}")
+    for name, seconds in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        change = seconds / before - 1
+        flag = ""
+        if change > tolerance:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<16}{change:>+10.1%}{flag}")
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--save-baseline", metavar="FILE")
+    parser.add_argument("--compare", metavar="FILE")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, CoinGeckoStub() as stub:
+        configure_environment(os.path.join(tmp, "bench.db"), stub.base_url)
+        # Workers started by the subprocesses must find the app package
+        os.environ["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])
+        )
+        imports = [measure_import() for _ in range(args.runs)]
+        health = [measure_first_health() for _ in range(args.runs)]
+
+    results = {
+        "import": statistics.median(seconds for seconds, _, _ in imports),
+        "first /health": statistics.median(health),
+    }
+    print(f"{'measurement':<16}{'median':>9}{'min':>9}{'max':>9}")
+    for name, samples in (("import", [i[0] for i in imports]), ("first /health", health)):
+        print(
+            f"{name:<16}{results[name]:>8.2f}s{min(samples):>8.2f}s{max(samples):>8.2f}s"
+        )
+    _, yfinance_loaded, pandas_loaded = imports[-1]
+    print(f"\nloaded at import: yfinance={yfinance_loaded} pandas={pandas_loaded}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressed = compare(baseline, results, args.tolerance)
+        if regressed:
+            print(f"\n{len(regressed)} measurement(s) regressed beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Compare mixed read/write watchlist throughput before and after the async
+database layer.
+
+Concurrent clients each loop over a number of watchlist reads (eight by
+default), one add and one remove. "before" serves them from sync routes on a default-configured
+engine (rollback journal, default pool) as the watchlist router used to;
+"after" uses the real async routes with WAL, synchronous=NORMAL and a
+busy timeout. Each side gets its own SQLite file, seeded with the same
+items, and quotes come from a fake yfinance with no latency.
+
+    uv run python -m benchmarks.bench_watchlist_db [--clients 32] [--rounds 20] [--reads 8]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.bench_load import configure_environment
+from benchmarks.coingecko_stub import CoinGeckoStub
+from benchmarks.fake_yfinance import FakeYFinance
+
+SEED_ITEMS = 20
+
+
+def baseline_router(database_path: str):
+    """The sync watchlist routes as they were, on a default sync engine."""
+    import orjson
+    from fastapi import APIRouter, Depends, HTTPException, Response
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session, sessionmaker
+
+    from app.database import Base
+    from app.models import Watchlist
+    from app.routers import watchlist
+    from app.schemas import WatchlistItemCreate, WatchlistItemResponse
+    from app.services import crypto_service, stock_service
+
+    engine = create_engine(
+        f"sqlite:///{database_path}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    sessions = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_db():
+        db = sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    router = APIRouter(prefix="/baseline/watchlist")
+
+    @router.get("/")
+    def get_watchlist(db: Session = Depends(get_db)):
+        items = db.query(Watchlist).all()
+        assets_info = watchlist.get_assets_info(items, stock_service, crypto_service)
+        body = [
+            WatchlistItemResponse(
+                id=item.id,
+                asset_type=item.asset_type,
+                symbol=item.symbol,
+                added_at=item.added_at,
+                asset_info=assets_info[(item.asset_type, item.symbol.upper())].value,
+            ).model_dump()
+            for item in items
+        ]
+        return Response(orjson.dumps(body), media_type="application/json")
+
+    @router.post("/", status_code=201)
+    def add_to_watchlist(item: WatchlistItemCreate, db: Session = Depends(get_db)):
+        lookup = watchlist.get_asset_info(
+            item.asset_type, item.symbol, stock_service, crypto_service
+        )
+        if not lookup.value:
+            raise HTTPException(status_code=404)
+        if db.query(Watchlist).filter(Watchlist.symbol == item.symbol.upper()).first():
+            raise HTTPException(status_code=400)
+        row = Watchlist(asset_type=item.asset_type, symbol=item.symbol.upper())
+        db.add(row)
+        db.commit()
+        db.refresh(row)
+        return {"id": row.id}
+
+    @router.delete("/{item_id}")
+    def remove_from_watchlist(item_id: int, db: Session = Depends(get_db)):
+        row = db.query(Watchlist).filter(Watchlist.id == item_id).first()
+        if not row:
+            raise HTTPException(status_code=404)
+        db.delete(row)
+        db.commit()
+        return {}
+
+    return router, sessions
+
+
+def seed(sessions) -> None:
+    from app.models import AssetType, Watchlist
+
+    with sessions() as db:
+        db.add_all(
+            Watchlist(asset_type=AssetType.STOCK, symbol=f"S{i:03d}")
+            for i in range(SEED_ITEMS)
+        )
+        db.commit()
+
+
+async def mixed_load(
+    client: httpx.AsyncClient, prefix: str, clients: int, rounds: int, reads_per_round: int
+) -> dict:
+    reads: list[float] = []
+    writes: list[float] = []
+    errors = 0
+
+    async def timed(samples: list[float], method: str, url: str, **kwargs) -> httpx.Response:
+        nonlocal errors
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        samples.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors += 1
+        return response
+
+    async def user(n: int):
+        for i in range(rounds):
+            for _ in range(reads_per_round):
+                await timed(reads, "GET", f"{prefix}/")
+            response = await timed(
+                writes,
+                "POST",
+                f"{prefix}/",
+                json={"asset_type": "stock", "symbol": f"U{n:03d}X{i:03d}"},
+            )
+            if response.status_code == 201:
+                await timed(writes, "DELETE", f"{prefix}/{response.json()['id']}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(n) for n in range(clients)))
+    elapsed = time.perf_counter() - start
+    return {
+        "throughput": (len(reads) + len(writes)) / elapsed,
+        "read_p95": float(np.percentile(reads, 95) * 1000) if reads else 0.0,
+        "write_p95": float(np.percentile(writes, 95) * 1000),
+        "errors": errors,
+    }
+
+
+async def run(args: argparse.Namespace, tmp: str) -> None:
+    from app.database import SessionLocal
+    from app.main import app
+
+    router, baseline_sessions = baseline_router(os.path.join(tmp, "before.db"))
+    app.include_router(router)
+    seed(baseline_sessions)
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app):
+        # The app's tables are created by the lifespan
+        seed(SessionLocal)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{'':<8}{'req/s':>9}{'read p95':>11}{'write p95':>11}{'errors':>8}")
+            for name, prefix in (("before", "/baseline/watchlist"), ("after", "/api/watchlist")):
+                await client.get(f"{prefix}/")  # fill the quote cache
+                result = await mixed_load(
+                    client, prefix, args.clients, args.rounds, args.reads
+                )
+                print(
+                    f"{name:<8}{result['throughput']:>9.0f}{result['read_p95']:>9.1f}ms"
+                    f"{result['write_p95']:>9.1f}ms{result['errors']:>8}"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument(
+        "--reads", type=int, default=8, help="Watchlist reads per add and remove"
+    )
+    args = parser.parse_args()
+    # "database is locked" failures are logged by the app
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmp, CoinGeckoStub() as stub:
+        configure_environment(os.path.join(tmp, "after.db"), stub.base_url)
+        with FakeYFinance().patch():
+            asyncio.run(run(args, tmp))
+
+
+if __name__ == "__main__":
+    main()
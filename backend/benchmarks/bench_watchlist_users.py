@@ -0,0 +1,180 @@
+"""
+Measure per-user watchlists at scale.
+
+Seeds many owners with hundreds of stock items each, drawn from a shared
+pool of symbols, then reports:
+
+- page latency at the start and the end of one owner watching the whole
+  pool, which keyset pagination keeps flat however deep the page is
+- cold-cache upstream calls while many owners load their first page at
+  once, against the number of distinct symbols those pages hold
+- add throughput, including duplicates rejected by the unique index
+
+    uv run python -m benchmarks.bench_watchlist_users [--users 2000]
+        [--items 200] [--symbols 1500] [--concurrency 50] [--latency 0.01]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.bench_load import configure_environment
+from benchmarks.coingecko_stub import CoinGeckoStub
+from benchmarks.fake_yfinance import FakeYFinance
+
+PAGE_SIZE = 100
+
+
+def seed(users: int, items: int, symbols: int) -> dict[str, list[str]]:
+    """Give every owner `items` symbols out of a shared pool, and one owner all."""
+    from sqlalchemy import insert
+
+    from app.database import SessionLocal
+    from app.models import AssetType, Watchlist
+
+    rng = random.Random(0)
+    pool = [f"S{i:04d}" for i in range(symbols)]
+    watchlists = {f"user{u:05d}": rng.sample(pool, items) for u in range(users)}
+    watchlists["everything"] = pool
+    with SessionLocal() as db:
+        db.execute(
+            insert(Watchlist),
+            [
+                {"owner": owner, "asset_type": AssetType.STOCK, "symbol": symbol}
+                for owner, owned in watchlists.items()
+                for symbol in owned
+            ],
+        )
+        db.commit()
+    return watchlists
+
+
+async def page_depth(client: httpx.AsyncClient, owner: str, repeat: int = 20) -> None:
+    """Time the first and the last page of one owner's watchlist."""
+    headers = {"X-Owner-Id": owner}
+    cursors = [None]
+    while True:
+        params = {"limit": PAGE_SIZE}
+        if cursors[-1] is not None:
+            params["after"] = cursors[-1]
+        response = await client.get("/api/watchlist/", params=params, headers=headers)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        cursors.append(cursor)
+
+    # Quotes are cached by the walk above, so this times the database side
+    for name, cursor in (("first page", cursors[0]), ("last page", cursors[-1])):
+        params = {"limit": PAGE_SIZE}
+        if cursor is not None:
+            params["after"] = cursor
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await client.get("/api/watchlist/", params=params, headers=headers)
+            latencies.append(time.perf_counter() - start)
+        print(f"  {name:<12}p50={np.median(latencies) * 1000:6.1f}ms")
+    print(f"  ({len(cursors)} pages of {PAGE_SIZE})")
+
+
+async def cold_pages(
+    client: httpx.AsyncClient,
+    fake: FakeYFinance,
+    watchlists: dict[str, list[str]],
+    concurrency: int,
+) -> None:
+    """Load many owners' first pages at once on an empty quote cache."""
+    from app.services import cache, quote_store
+
+    owners = [owner for owner in watchlists if owner != "everything"][:concurrency]
+    cache.clear()
+    quote_store.flush()
+    calls = fake.calls
+    latencies = []
+
+    async def first_page(owner: str):
+        start = time.perf_counter()
+        await client.get(
+            "/api/watchlist/", params={"limit": PAGE_SIZE}, headers={"X-Owner-Id": owner}
+        )
+        latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(first_page(owner) for owner in owners))
+    # Each page holds the owner's first items in id order
+    symbols = {symbol for owner in owners for symbol in watchlists[owner][:PAGE_SIZE]}
+    items = concurrency * PAGE_SIZE
+    print(
+        f"  {concurrency} owners, {items} items, {len(symbols)} distinct symbols: "
+        f"{fake.calls - calls} upstream calls, p50={np.median(latencies):.2f}s"
+    )
+
+
+async def adds(client: httpx.AsyncClient, watchlists: dict[str, list[str]], count: int) -> None:
+    """Add symbols for many owners, every fourth one already watched."""
+    owners = [owner for owner in watchlists if owner != "everything"]
+    statuses: dict[int, int] = {}
+    start = time.perf_counter()
+    for i in range(count):
+        owner = owners[i % len(owners)]
+        symbol = watchlists[owner][0] if i % 4 == 3 else f"N{i:05d}"
+        response = await client.post(
+            "/api/watchlist/",
+            json={"asset_type": "stock", "symbol": symbol},
+            headers={"X-Owner-Id": owner},
+        )
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    elapsed = time.perf_counter() - start
+    print(f"  {count / elapsed:.0f} adds/s, statuses {dict(sorted(statuses.items()))}")
+
+
+async def run(args: argparse.Namespace, fake: FakeYFinance) -> None:
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        # The app's tables are created by the lifespan
+        start = time.perf_counter()
+        watchlists = seed(args.users, args.items, args.symbols)
+        print(
+            f"seeded {args.users} owners x {args.items} items "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print("\ncold first pages (quote cache empty)")
+            await cold_pages(client, fake, watchlists, args.concurrency)
+            print("\nkeyset pages (quotes cached)")
+            await page_depth(client, "everything")
+            print("\nadds")
+            await adds(client, watchlists, 400)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--symbols", type=int, default=1500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--latency", type=float, default=0.01, help="Upstream latency in seconds"
+    )
+    args = parser.parse_args()
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+
+    fake = FakeYFinance(latency=args.latency)
+    with tempfile.TemporaryDirectory() as tmp, CoinGeckoStub() as stub:
+        configure_environment(os.path.join(tmp, "bench.db"), stub.base_url)
+        with fake.patch():
+            asyncio.run(run(args, fake))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Local stand-in for the CoinGecko API used by the benchmarks.
+
+Serves canned /coins/{id}, /coins/list, /coins/markets,
+/coins/{id}/market_chart and /search responses over keep-alive HTTP/1.1 and counts the TCP connections
+it accepts, so benchmarks can measure connection reuse without touching
+the network.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# (id, symbol, name) in market cap order, with a few duplicate tickers
+COINS = [
+    ("bitcoin", "btc", "Bitcoin"),
+    ("ethereum", "eth", "Ethereum"),
+    ("tether", "usdt", "Tether"),
+    ("binancecoin", "bnb", "BNB"),
+    ("solana", "sol", "Solana"),
+    ("ripple", "xrp", "XRP"),
+    ("cardano", "ada", "Cardano"),
+    ("dogecoin", "doge", "Dogecoin"),
+    ("avalanche-2", "avax", "Avalanche"),
+    ("polkadot", "dot", "Polkadot"),
+    ("chainlink", "link", "Chainlink"),
+    ("pepe", "pepe", "Pepe"),
+    ("bitcoin-cash", "bch", "Bitcoin Cash"),
+    ("wrapped-bitcoin", "wbtc", "Wrapped Bitcoin"),
+    ("ethereum-wormhole", "eth", "Ethereum (Wormhole)"),
+    ("solana-wormhole", "sol", "Solana (Wormhole)"),
+]
+
+
+def _coin(coin_id: str) -> dict:
+    return {
+        "id": coin_id,
+        "name": coin_id.capitalize(),
+        "market_data": {
+            "current_price": {"usd": 100.0},
+            "price_change_24h": 1.5,
+            "price_change_percentage_24h": 1.5,
+            "market_cap": {"usd": 1e9},
+            "total_volume": {"usd": 1e7},
+            "high_24h": {"usd": 101.0},
+            "low_24h": {"usd": 99.0},
+        },
+        "description": {"en": f"{coin_id} stub"},
+    }
+
+
+def _market(coin_id: str) -> dict:
+    return {
+        "id": coin_id,
+        "name": coin_id.capitalize(),
+        "current_price": 100.0,
+        "price_change_24h": 1.5,
+        "price_change_percentage_24h": 1.5,
+        "market_cap": 1e9,
+        "total_volume": 1e7,
+        "high_24h": 101.0,
+        "low_24h": 99.0,
+    }
+
+
+def _market_chart(days: int) -> dict:
+    now = int(time.time() * 1000)
+    points = max(days * 24, 1)
+    step = days * 86_400_000 // points
+    timestamps = [now - (points - i) * step for i in range(points)]
+    return {
+        "prices": [[ts, 100.0 + i % 10] for i, ts in enumerate(timestamps)],
+        "total_volumes": [[ts, 1e6] for ts in timestamps],
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server: CoinGeckoStub = self.server
+        server.count_request(self.path)
+        if server.latency:
+            time.sleep(server.latency)
+
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        parts = [p for p in url.path.split("/") if p]
+        # Strip an /api/v3 style prefix
+        while parts and parts[0] != "coins" and parts[0] != "search":
+            parts.pop(0)
+
+        headers = {}
+        if server.rate_limit and server.over_rate_limit():
+            status, body = 429, {"error": "rate limited"}
+            headers["Retry-After"] = "1"
+        elif server.fail_rate and server.should_fail():
+            status, body = 500, {"error": "injected failure"}
+        elif parts[:1] == ["search"]:
+            query = params.get("query", [""])[0]
+            status, body = 200, {
+                "coins": [
+                    {"symbol": query, "name": query.capitalize(), "market_cap_rank": 1}
+                ]
+            }
+        elif parts == ["coins", "list"]:
+            status, body = 200, [
+                {"id": coin_id, "symbol": symbol, "name": name}
+                for coin_id, symbol, name in COINS
+            ]
+        elif parts == ["coins", "markets"] and "ids" in params:
+            ids = params["ids"][0].split(",")
+            status, body = 200, [_market(coin_id) for coin_id in ids if coin_id]
+        elif parts == ["coins", "markets"]:
+            per_page = int(params.get("per_page", ["100"])[0])
+            page = int(params.get("page", ["1"])[0])
+            start = (page - 1) * per_page
+            status, body = 200, [
+                {**_market(coin_id), "market_cap_rank": rank}
+                for rank, (coin_id, _, _) in enumerate(
+                    COINS[start : start + per_page], start + 1
+                )
+            ]
+        elif len(parts) >= 2 and parts[0] == "coins" and parts[1] in server.missing:
+            status, body = 404, {"error": "coin not found"}
+        elif len(parts) == 3 and parts[0] == "coins" and parts[2] == "market_chart":
+            days = int(params.get("days", ["30"])[0])
+            status, body = 200, _market_chart(days)
+        elif len(parts) == 2 and parts[0] == "coins":
+            status, body = 200, _coin(parts[1])
+        else:
+            status, body = 404, {"error": "not found"}
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class CoinGeckoStub(ThreadingHTTPServer):
+    """
+    Threaded stub server with optional latency and failure injection.
+
+    With rate_limit set, requests beyond that many per second are answered
+    429 with a Retry-After header, like CoinGecko's free tier. Coin ids in
+    missing are answered 404. Request paths are recorded in paths.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, latency: float = 0.0, fail_rate: float = 0.0, rate_limit: int = 0
+    ):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.rate_limit = rate_limit
+        self.throttled = 0
+        self.missing: set[str] = set()
+        self._window: list[float] = []
+        self.connections = 0
+        self.requests = 0
+        self.paths: list[str] = []
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/v3"
+
+    def get_request(self):
+        request = super().get_request()
+        with self._lock:
+            self.connections += 1
+        return request
+
+    def count_request(self, path: str) -> None:
+        with self._lock:
+            self.requests += 1
+            self.paths.append(path)
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            # Deterministic: fail every 1/fail_rate-th request
+            return self.requests % max(int(1 / self.fail_rate), 1) == 0
+
+    def over_rate_limit(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._window = [t for t in self._window if now - t < 1.0]
+            if len(self._window) >= self.rate_limit:
+                self.throttled += 1
+                return True
+            self._window.append(now)
+            return False
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+            self.paths.clear()
+            self.throttled = 0
+            self._window.clear()
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
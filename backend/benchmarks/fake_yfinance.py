@@ -0,0 +1,140 @@
+"""
+Local stand-in for the yfinance module used by the benchmarks.
+
+Answers Ticker(...).info, Ticker(...).history(...) and download(...) with
+deterministic synthetic data for any symbol, with optional latency, slow
+outliers and failure injection, so stock code paths can be measured
+without Yahoo.
+"""
+import importlib
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Daily bars returned per history period
+PERIOD_BARS = {
+    "1d": 1,
+    "5d": 5,
+    "1mo": 21,
+    "3mo": 63,
+    "6mo": 126,
+    "1y": 252,
+    "5y": 1260,
+}
+
+
+def _bars(symbol: str, index: pd.DatetimeIndex) -> pd.DataFrame:
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    close = 100 + np.cumsum(rng.normal(0, 1, len(index)))
+    return pd.DataFrame(
+        {
+            "Open": close - 0.5,
+            "High": close + 1.0,
+            "Low": close - 1.0,
+            "Close": close,
+            "Volume": rng.uniform(1e5, 1e6, len(index)).round(),
+        },
+        index=index,
+    )
+
+
+def _trading_days(bars: int | None = None, start=None) -> pd.DatetimeIndex:
+    end = pd.Timestamp.now(tz="America/New_York").normalize()
+    if start is not None:
+        return pd.bdate_range(start=pd.Timestamp(start).tz_localize(end.tz), end=end)
+    return pd.bdate_range(end=end, periods=bars, tz=end.tz)
+
+
+class _Ticker:
+    def __init__(self, fake: "FakeYFinance", symbol: str):
+        self._fake = fake
+        self.symbol = symbol.upper()
+
+    @property
+    def info(self) -> dict:
+        self._fake.call()
+        bars = _bars(self.symbol, _trading_days(2))
+        last, previous = bars["Close"].iloc[-1], bars["Close"].iloc[-2]
+        return {
+            "shortName": f"{self.symbol} Inc.",
+            "regularMarketPrice": float(last),
+            "regularMarketChange": float(last - previous),
+            "regularMarketChangePercent": float((last - previous) / previous * 100),
+            "marketCap": 1e12,
+            "regularMarketVolume": float(bars["Volume"].iloc[-1]),
+            "dayHigh": float(bars["High"].iloc[-1]),
+            "dayLow": float(bars["Low"].iloc[-1]),
+            "longBusinessSummary": f"{self.symbol} stub",
+        }
+
+    def history(self, period: str = "1mo", start=None, timeout=None) -> pd.DataFrame:
+        self._fake.call()
+        if start is not None:
+            return _bars(self.symbol, _trading_days(start=start))
+        return _bars(self.symbol, _trading_days(PERIOD_BARS.get(period, 21)))
+
+
+class FakeYFinance:
+    """
+    yfinance replacement with optional latency and failure injection.
+
+    With slow_rate set, that fraction of calls takes slow_latency instead,
+    like the tail of a real provider's latency. Failing calls raise like
+    yfinance does on network errors; the services turn them into None or
+    empty results. Settings may be changed while in use.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        fail_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 0.0,
+    ):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _every(rate: float, n: int) -> bool:
+        # Deterministic: every 1/rate-th call
+        return bool(rate) and n % max(int(1 / rate), 1) == 0
+
+    def call(self) -> None:
+        """Count an upstream call, sleeping and failing as configured."""
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        latency = self.slow_latency if self._every(self.slow_rate, n) else self.latency
+        if latency:
+            time.sleep(latency)
+        if self._every(self.fail_rate, n):
+            raise ConnectionError("injected failure")
+
+    def Ticker(self, symbol: str) -> _Ticker:
+        return _Ticker(self, symbol)
+
+    def download(self, symbols: list[str], period: str = "5d", **kwargs) -> pd.DataFrame:
+        self.call()
+        index = _trading_days(PERIOD_BARS.get(period, 5))
+        return pd.concat({symbol: _bars(symbol, index) for symbol in symbols}, axis=1)
+
+    @contextmanager
+    def patch(self):
+        """Route the stock service's yfinance calls here while active."""
+        # The module, not the stock_service instance exported by app.services
+        module = importlib.import_module("app.services.stock_service")
+
+        real = module.yf
+        module.yf = self
+        try:
+            yield self
+        finally:
+            module.yf = real
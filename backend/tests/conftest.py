@@ -0,0 +1,78 @@
+"""
+Shared test setup.
+
+The app reads its configuration at import time, so pytest_configure points
+it at a temporary SQLite database and a local CoinGecko stub before any
+test module imports it. Nothing reaches the network.
+"""
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.bench_load import configure_environment
+from benchmarks.coingecko_stub import CoinGeckoStub
+
+_stub = CoinGeckoStub()
+_tmp = tempfile.TemporaryDirectory()
+
+
+def pytest_configure(config):
+    _stub.__enter__()
+    configure_environment(os.path.join(_tmp.name, "test.db"), _stub.base_url)
+    os.environ["CACHE_BACKEND"] = "memory"
+    os.environ["STOCK_LISTING_PATH"] = os.path.join(_tmp.name, "stock_listings.txt")
+
+
+def pytest_unconfigure(config):
+    _stub.__exit__(None, None, None)
+    _tmp.cleanup()
+
+
+@pytest.fixture
+def coingecko() -> CoinGeckoStub:
+    """The CoinGecko stub, with its counters and failure injection reset."""
+    _stub.reset_counters()
+    _stub.latency = 0.0
+    _stub.fail_rate = 0.0
+    _stub.rate_limit = 0
+    yield _stub
+    _stub.latency = 0.0
+    _stub.fail_rate = 0.0
+    _stub.rate_limit = 0
+    _stub.missing.clear()
+
+
+@pytest.fixture
+def cache():
+    """The app's shared cache, emptied around the test."""
+    from app.services import cache
+
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    """Session factory for a fresh SQLite database with the app's tables."""
+    from app.database import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(coingecko, cache):
+    """TestClient running the app's lifespan, against the CoinGecko stub."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.clear()
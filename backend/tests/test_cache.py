@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
+from app.services import SingleFlight, TTLCache
+
+SHORT = timedelta(milliseconds=50)
+
+
+def new_cache(**kwargs) -> TTLCache:
+    return TTLCache(flight=SingleFlight(), **kwargs)
+
+
+def test_get_returns_fresh_values_only():
+    cache = new_cache()
+    cache.set("stock:AAPL", 1, SHORT)
+    assert cache.get("stock:AAPL") == 1
+    time.sleep(0.06)
+    assert cache.get("stock:AAPL") is None
+    assert cache.stats()["namespaces"]["stock"]["misses"] == 1
+
+
+def test_ttl_remaining():
+    cache = new_cache()
+    cache.set("key", 1, timedelta(seconds=10))
+    assert 9 < cache.ttl_remaining("key") <= 10
+    assert cache.ttl_remaining("missing") == 0.0
+
+
+def test_evicts_least_recently_used_entries():
+    cache = new_cache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["namespaces"]["b"]["evictions"] == 1
+
+
+def test_evicts_to_stay_within_the_byte_budget():
+    cache = new_cache(max_bytes=3000)
+    for i in range(10):
+        cache.set(f"k{i}", b"x" * 1000)
+    assert cache.stats()["bytes"] <= 3000
+    assert cache.get("k9") is not None
+    assert cache.get("k0") is None
+
+
+def test_purge_expired_drops_entries_past_the_stale_window():
+    cache = new_cache()
+    cache.set("a", 1, SHORT)
+    cache.set("b", 2, SHORT, stale_ttl=timedelta(seconds=10))
+    time.sleep(0.06)
+    cache.purge_expired()
+    assert len(cache) == 1
+
+
+def test_get_or_load_caches_loaded_values_but_not_none():
+    cache = new_cache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_load("key", loader).value == "value"
+    assert cache.get_or_load("key", loader).value == "value"
+    assert len(calls) == 1
+
+    assert cache.get_or_load("none", lambda: None) == (None, False, 0.0)
+    assert cache.get("none") is None
+
+
+def test_get_or_load_takes_the_ttl_from_the_value():
+    cache = new_cache()
+    lookup = cache.get_or_load("key", lambda: 30, lambda v: timedelta(seconds=v))
+    assert 29 < lookup.expires_in <= 30
+
+
+def test_get_or_load_coalesces_concurrent_misses():
+    cache = new_cache()
+    calls = 0
+    started = threading.Event()
+
+    def loader():
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.05)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load("key", loader)))
+        for _ in range(5)
+    ]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == 1
+    assert [lookup.value for lookup in results] == ["value"] * 5
+
+
+def test_stale_values_are_served_while_refreshing_in_the_background():
+    cache = new_cache()
+    cache.set("key", "old", SHORT, stale_ttl=timedelta(seconds=10))
+    time.sleep(0.06)
+    refreshed = threading.Event()
+
+    def loader():
+        refreshed.set()
+        return "new"
+
+    lookup = cache.get_or_load("key", loader, SHORT)
+    assert lookup == ("old", True, 0.0)
+    assert refreshed.wait(1)
+    for _ in range(100):
+        if cache.get("key") == "new":
+            break
+        time.sleep(0.01)
+    assert cache.get("key") == "new"
+
+
+def test_get_or_load_async():
+    cache = new_cache()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_load_async("key", loader) for _ in range(5))
+        )
+
+    assert [lookup.value for lookup in asyncio.run(run())] == ["value"] * 5
+    assert calls == 1
+
+
+def test_stale_values_are_refreshed_on_the_event_loop():
+    cache = new_cache()
+    cache.set("key", "old", SHORT, stale_ttl=timedelta(seconds=10))
+    time.sleep(0.06)
+
+    async def loader():
+        return "new"
+
+    async def run():
+        lookup = await cache.get_or_load_async("key", loader, SHORT)
+        await asyncio.sleep(0.01)
+        return lookup
+
+    assert asyncio.run(run()).stale
+    assert cache.get("key") == "new"
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from app.services import AsyncCryptoService, CoinIndex, CryptoService, Priority, RateLimiter
+
+
+def limiter(**kwargs) -> RateLimiter:
+    options = {"rate_per_minute": 60_000, "burst": 100, "backoff": 0.1}
+    return RateLimiter(**{**options, **kwargs})
+
+
+@pytest.fixture
+def sync_service() -> CryptoService:
+    service = CryptoService(limiter=limiter())
+    service.coin_index = CoinIndex()
+    return service
+
+
+@pytest.fixture
+def async_service(coingecko):
+    service = AsyncCryptoService(base_url=coingecko.base_url, limiter=limiter())
+    service.coin_index = CoinIndex()
+    return service
+
+
+async def started(service: AsyncCryptoService, call):
+    await service.start()
+    try:
+        return await call(service)
+    finally:
+        await service.close()
+
+
+def test_get_crypto_data(sync_service, async_service):
+    for quote in (
+        sync_service.get_crypto_data("btc"),
+        asyncio.run(started(async_service, lambda s: s.get_crypto_data("btc"))),
+    ):
+        assert quote.symbol == "BTC"
+        assert quote.current_price == 100.0
+        assert quote.high_24h == 101.0
+        assert quote.description == "bitcoin stub"
+
+
+def test_unknown_symbol_makes_no_request(sync_service, coingecko):
+    assert sync_service.get_crypto_data("NOT-A-COIN") is None
+    assert coingecko.requests == 0
+
+
+def test_get_historical_series(sync_service, async_service):
+    for series in (
+        sync_service.get_historical_series("ETH", days=2),
+        asyncio.run(
+            started(async_service, lambda s: s.get_historical_series("ETH", days=2))
+        ),
+    ):
+        assert len(series) == 48
+        assert series.prices[0] == 100.0
+        assert series.volumes[0] == 1e6
+        assert (series.timestamps[1:] > series.timestamps[:-1]).all()
+
+
+def test_get_markets_data(async_service):
+    quotes = asyncio.run(
+        started(async_service, lambda s: s.get_markets_data(["BTC", "eth", "NOPE"]))
+    )
+    assert set(quotes) == {"BTC", "ETH"}
+
+
+def test_search_crypto_uses_coingecko_without_an_index(sync_service, async_service):
+    for results in (
+        sync_service.search_crypto("dog"),
+        asyncio.run(started(async_service, lambda s: s.search_crypto("dog"))),
+    ):
+        assert [r.symbol for r in results] == ["DOG"]
+        assert results[0].exchange == "Rank #1"
+
+
+def test_search_crypto_uses_the_coin_index(sync_service, coingecko):
+    sync_service.coin_index.build(
+        [
+            {"id": "dogecoin", "symbol": "doge", "name": "Dogecoin", "market_cap_rank": 8},
+            {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "market_cap_rank": 1},
+        ]
+    )
+    results = sync_service.search_crypto("doge")
+    assert [r.name for r in results] == ["Dogecoin"]
+    assert coingecko.requests == 0
+
+
+def test_async_client_reuses_connections(async_service, coingecko):
+    async def run(service):
+        for _ in range(10):
+            await service.get_crypto_data("BTC")
+        await asyncio.gather(*(service.get_crypto_data("ETH") for _ in range(5)))
+
+    asyncio.run(started(async_service, run))
+    assert coingecko.requests == 15
+    assert coingecko.connections <= 5
+
+
+def test_async_service_requires_start(async_service):
+    with pytest.raises(RuntimeError):
+        asyncio.run(async_service.get_crypto_data("BTC"))
+
+
+def test_not_found(sync_service, async_service, coingecko):
+    coingecko.missing.add("bitcoin")
+    assert sync_service.get_crypto_data("BTC") is None
+    assert asyncio.run(started(async_service, lambda s: s.get_crypto_data("BTC"))) is None
+    assert len(sync_service.get_historical_series("BTC")) == 0
+
+
+def test_rate_limited_call_is_retried_after_backoff(async_service, coingecko):
+    coingecko.rate_limit = 1
+
+    async def run(service):
+        first = await service.get_crypto_data("BTC")
+        second = await service.get_crypto_data("ETH")
+        return first, second
+
+    first, second = asyncio.run(started(async_service, run))
+    assert first.symbol == "BTC"
+    assert second.symbol == "ETH"
+    assert coingecko.throttled == 1
+    assert async_service.limiter.stats()["throttled"] == 1
+
+
+def test_rate_limited_call_fails_fast_when_backoff_exceeds_wait(coingecko):
+    coingecko.rate_limit = 1
+    service = CryptoService(limiter=limiter(backoff=30))
+    service.coin_index = CoinIndex()
+
+    assert service.get_crypto_data("BTC") is not None
+    assert service.get_crypto_data("ETH", Priority.BACKGROUND) is None
+    assert service.limiter.retry_after() > 0
@@ -0,0 +1,67 @@
+import numpy as np
+
+from app.services import PriceSeries, downsample, lttb_indices
+
+
+def reference_lttb(x, y, n_out):
+    """Straightforward LTTB, one bucket at a time."""
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    selected = [0]
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1 if i < n_out - 3 else n - 1
+        next_end = int((i + 2) * every) + 1 if i < n_out - 4 else n - 1
+        if i < n_out - 3:
+            mx, my = x[end:next_end].mean(), y[end:next_end].mean()
+        else:
+            mx, my = x[-1], y[-1]
+        areas = [
+            abs((x[a] - mx) * (y[j] - y[a]) - (x[a] - x[j]) * (my - y[a]))
+            for j in range(start, end)
+        ]
+        a = start + int(np.argmax(areas))
+        selected.append(a)
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+def series(n: int) -> PriceSeries:
+    rng = np.random.default_rng(7)
+    timestamps = 1_700_000_000_000 + 60_000 * np.arange(n)
+    return PriceSeries.from_epoch_ms(
+        timestamps, 100 + np.cumsum(rng.normal(size=n)), rng.uniform(size=n)
+    )
+
+
+def test_matches_a_reference_implementation():
+    s = series(1000)
+    x = s.epoch_ms().astype(np.float64)
+    for n_out in (3, 10, 97, 500):
+        np.testing.assert_array_equal(
+            lttb_indices(x, s.prices, n_out), reference_lttb(x, s.prices, n_out)
+        )
+
+
+def test_keeps_endpoints_and_order():
+    s = series(5000)
+    reduced = downsample(s, 300)
+    assert len(reduced) == 300
+    assert reduced.timestamps[0] == s.timestamps[0]
+    assert reduced.timestamps[-1] == s.timestamps[-1]
+    assert (np.diff(reduced.epoch_ms()) > 0).all()
+
+
+def test_keeps_extremes():
+    s = series(2000)
+    prices = s.prices.copy()
+    prices[1234] = 1e6
+    spiked = PriceSeries.from_epoch_ms(s.epoch_ms(), prices, s.volumes)
+    assert 1e6 in downsample(spiked, 50).prices
+
+
+def test_small_series_are_returned_as_is():
+    s = series(100)
+    assert downsample(s, 100) is s
+    assert downsample(s, 500) is s
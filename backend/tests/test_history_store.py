@@ -0,0 +1,316 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy import delete, insert, select, text
+
+from app.models import PriceBar, PriceBarSeries
+from app.schemas import AssetType
+from app.database import dialect_insert
+from app.services import HistoryStore, PriceSeries
+from app.services.history_store import BAR_RETENTION_MARGIN, crypto_interval
+
+MINUTE_MS = 60_000
+STEP_MS = {"5m": 5 * MINUTE_MS, "1h": 60 * MINUTE_MS, "1d": 1440 * MINUTE_MS}
+
+
+def bars(end_ms: int, step_ms: int, count: int) -> PriceSeries:
+    timestamps = end_ms - step_ms * np.arange(count)[::-1]
+    return PriceSeries.from_epoch_ms(
+        timestamps, 100 + np.arange(count, dtype=np.float64), np.ones(count)
+    )
+
+
+def now_ms() -> int:
+    return int(datetime.now(timezone.utc).timestamp() * 1000)
+
+
+class FakeCrypto:
+    """market_chart with CoinGecko's automatic granularity."""
+
+    def __init__(self):
+        self.calls: list[int] = []
+        self.down = False
+
+    def get_historical_series(self, symbol: str, days: int) -> PriceSeries:
+        self.calls.append(days)
+        if self.down:
+            return PriceSeries.empty()
+        step = STEP_MS[crypto_interval(days)]
+        end = now_ms() // step * step
+        return bars(end, step, days * 1440 * MINUTE_MS // step)
+
+
+class FakeAsyncCrypto(FakeCrypto):
+    async def get_historical_series(self, symbol: str, days: int) -> PriceSeries:
+        return FakeCrypto.get_historical_series(self, symbol, days)
+
+
+class FakeStocks:
+    def __init__(self):
+        self.calls: list[dict] = []
+        self.down = False
+
+    def get_historical_series(self, symbol, period="1mo", start=None) -> PriceSeries:
+        self.calls.append({"period": period, "start": start})
+        if self.down:
+            return PriceSeries.empty()
+        day = STEP_MS["1d"]
+        end = now_ms() // day * day
+        count = 3 if start is not None else 22
+        return bars(end, day, count)
+
+
+@pytest.fixture
+def crypto():
+    return FakeCrypto()
+
+
+@pytest.fixture
+def stocks():
+    return FakeStocks()
+
+
+@pytest.fixture
+def store(sessions, crypto, stocks):
+    return HistoryStore(stocks, crypto, FakeAsyncCrypto(), sessions)
+
+
+def age(store: HistoryStore, symbol: str, interval: str, delta: timedelta) -> None:
+    """Pretend a stored series was last fetched `delta` ago."""
+    in_series = (PriceBar.symbol == symbol, PriceBar.interval == interval)
+    with store.session_factory() as session:
+        rows = session.scalars(select(PriceBar).where(*in_series)).all()
+        shifted = [
+            {
+                "asset_type": row.asset_type,
+                "symbol": row.symbol,
+                "interval": row.interval,
+                "timestamp": row.timestamp - delta,
+                "price": row.price,
+                "volume": row.volume,
+            }
+            for row in rows
+        ]
+        session.execute(delete(PriceBar).where(*in_series))
+        session.execute(insert(PriceBar), shifted)
+        for series in session.scalars(
+            select(PriceBarSeries).where(
+                PriceBarSeries.symbol == symbol, PriceBarSeries.interval == interval
+            )
+        ):
+            series.covered_from -= delta
+            series.last_timestamp -= delta
+            series.fetched_at -= delta
+        session.commit()
+
+
+def spacing(series: PriceSeries) -> set[int]:
+    return set(np.diff(series.epoch_ms()).tolist())
+
+
+def test_serves_stored_bars_until_the_refresh_interval(store, crypto):
+    first = store.get_crypto_history("BTC", 30)
+    second = store.get_crypto_history("btc", 30)
+    assert crypto.calls == [30]
+    assert len(first) == len(second) == 30 * 24
+    assert spacing(second) == {STEP_MS["1h"]}
+
+
+def test_shorter_ranges_are_served_from_the_covered_window(store, crypto):
+    store.get_crypto_history("BTC", 30)
+    assert len(store.get_crypto_history("BTC", 7)) == 7 * 24
+    assert crypto.calls == [30]
+
+
+def test_longer_ranges_fetch_the_whole_window(store, crypto):
+    store.get_crypto_history("BTC", 7)
+    store.get_crypto_history("BTC", 30)
+    assert crypto.calls == [7, 30]
+
+
+def test_refresh_fetches_only_the_missing_tail(store, crypto):
+    store.get_crypto_history("BTC", 30)
+    age(store, "BTC", "1h", timedelta(hours=30))
+    series = store.get_crypto_history("BTC", 30)
+    assert crypto.calls == [30, 2]
+    assert spacing(series) == {STEP_MS["1h"]}
+
+
+@pytest.mark.parametrize(
+    "days,interval,gap",
+    [(1, "5m", timedelta(days=2)), (30, "1h", timedelta(days=120))],
+)
+def test_tails_past_the_granularity_limit_refresh_in_full(
+    store, crypto, days, interval, gap
+):
+    store.get_crypto_history("BTC", days)
+    age(store, "BTC", interval, gap)
+    series = store.get_crypto_history("BTC", days)
+    # A tail this long would come back at a coarser granularity
+    assert crypto.calls == [days, days]
+    assert spacing(series) == {STEP_MS[interval]}
+
+
+def test_a_full_refresh_after_a_gap_does_not_cover_the_gap(store, crypto):
+    store.get_crypto_history("BTC", 30)
+    age(store, "BTC", "1h", timedelta(days=120))
+    store.get_crypto_history("BTC", 30)
+    # 90 days would span the missing bars, so they are fetched
+    store.get_crypto_history("BTC", 90)
+    assert crypto.calls == [30, 30, 90]
+
+
+def test_async_history(store):
+    series = asyncio.run(store.get_crypto_history_async("ETH", 30))
+    assert len(series) == 30 * 24
+    assert store.async_crypto_service.calls == [30]
+
+
+def test_stock_history(store, stocks):
+    assert len(store.get_stock_history("AAPL", "1mo")) == 22
+    assert len(store.get_stock_history("AAPL", "5d")) == 5
+    assert len(stocks.calls) == 1
+
+    age(store, "AAPL", "1d", timedelta(days=2))
+    store.get_stock_history("AAPL", "1mo")
+    assert stocks.calls[-1]["start"] is not None
+
+
+def test_save_bars_replaces_bars_from_the_first_fetched_timestamp(store):
+    day = STEP_MS["1d"]
+    end = now_ms() // day * day
+    store.save_bars(AssetType.CRYPTO, "BTC", "1d", bars(end - 2 * day, day, 10))
+    revised = bars(end, day, 4)
+    store.save_bars(AssetType.CRYPTO, "BTC", "1d", revised)
+    stored = store.read_bars(AssetType.CRYPTO, "BTC", "1d")
+    assert len(stored) == 12
+    np.testing.assert_array_equal(stored[-4:].prices, revised.prices)
+
+
+def test_bar_and_state_writes_are_upserts(store):
+    day = STEP_MS["1d"]
+    series = bars(now_ms() // day * day, day, 10)
+    store.save_bars(AssetType.CRYPTO, "BTC", "1d", series)
+    rows = [
+        {
+            "asset_type": AssetType.CRYPTO,
+            "symbol": "BTC",
+            "interval": "1d",
+            "timestamp": timestamp,
+            "price": 1.0,
+            "volume": None,
+        }
+        for timestamp in series.timestamps[-2:].tolist()
+    ]
+    state = {
+        "asset_type": AssetType.CRYPTO,
+        "symbol": "BTC",
+        "interval": "1d",
+        "covered_from": rows[0]["timestamp"],
+        "last_timestamp": rows[-1]["timestamp"],
+        "fetched_at": datetime(2000, 1, 1),
+    }
+    # What a concurrent refresh finds after its delete
+    with store.session_factory() as session:
+        HistoryStore._upsert(session, dialect_insert(session), rows, state, full=False)
+        session.commit()
+        state_row = session.get(PriceBarSeries, (AssetType.CRYPTO, "BTC", "1d"))
+        assert state_row.covered_from == series.timestamps[0].tolist()
+        assert state_row.fetched_at == datetime(2000, 1, 1)
+
+    stored = store.read_bars(AssetType.CRYPTO, "BTC", "1d")
+    assert len(stored) == 10
+    assert stored.prices[-2:].tolist() == [1.0, 1.0]
+
+
+def make_read_only(store: HistoryStore) -> None:
+    """Make every write to the bar table fail."""
+    with store.session_factory() as session:
+        session.execute(
+            text(
+                "CREATE TRIGGER read_only BEFORE INSERT ON price_bars "
+                "BEGIN SELECT RAISE(ABORT, 'read only'); END"
+            )
+        )
+        session.commit()
+
+
+def test_write_failures_still_serve_the_fetch(store, crypto):
+    make_read_only(store)
+    series = store.get_crypto_history("BTC", 30)
+    assert len(series) == 30 * 24
+    assert not len(store.read_bars(AssetType.CRYPTO, "BTC", "1h"))
+    store.get_crypto_history("BTC", 30)
+    assert crypto.calls == [30, 30]
+
+
+def test_failed_tail_writes_are_spliced_onto_stored_bars(store, crypto):
+    store.get_crypto_history("BTC", 30)
+    age(store, "BTC", "1h", timedelta(hours=30))
+    make_read_only(store)
+
+    series = store.get_crypto_history("BTC", 30)
+    assert crypto.calls == [30, 2]
+    assert len(series) == 30 * 24
+    assert spacing(series) == {STEP_MS["1h"]}
+
+
+def test_unreadable_state_fetches_in_full(store, crypto):
+    with store.session_factory() as session:
+        session.execute(text("DROP TABLE price_bar_series"))
+        session.commit()
+    assert len(store.get_crypto_history("BTC", 30)) == 30 * 24
+    assert len(asyncio.run(store.get_crypto_history_async("BTC", 30))) == 30 * 24
+
+
+def test_bars_past_the_retention_are_pruned_on_save(store, crypto):
+    hour = STEP_MS["1h"]
+    series = bars(now_ms() // hour * hour, hour, 120 * 24)
+    start = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=120)
+    assert store.save_bars(AssetType.CRYPTO, "BTC", "1h", series, covered_from=start)
+
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=90)
+    stored = store.read_bars(AssetType.CRYPTO, "BTC", "1h")
+    first = stored.timestamps[0].astype(datetime)
+    assert cutoff - BAR_RETENTION_MARGIN - timedelta(minutes=1) <= first < cutoff
+    with store.session_factory() as session:
+        state = session.get(PriceBarSeries, (AssetType.CRYPTO, "BTC", "1h"))
+        assert state.covered_from >= first - timedelta(hours=1)
+
+    # Still covers the longest range read at this interval
+    assert len(store.get_crypto_history("BTC", 90)) == 90 * 24
+    assert crypto.calls == []
+
+
+def test_tail_refreshes_do_not_grow_the_series(store, crypto):
+    store.get_crypto_history("BTC", 1)
+    for _ in range(4):
+        age(store, "BTC", "5m", timedelta(hours=12))
+        store.get_crypto_history("BTC", 1)
+    assert crypto.calls == [1] * 5
+
+    stored = store.read_bars(AssetType.CRYPTO, "BTC", "5m")
+    kept = (timedelta(days=1) + BAR_RETENTION_MARGIN) // timedelta(minutes=5)
+    assert len(stored) <= kept + 1
+    assert len(store.get_crypto_history("BTC", 1)) == 24 * 12
+
+
+def test_stored_bars_served_for_a_failed_full_refresh_are_partial(store, crypto):
+    assert not store.get_crypto_history("BTC", 30).partial
+    crypto.down = True
+    series = store.get_crypto_history("BTC", 60)
+    assert series.partial
+    assert len(series) == 30 * 24
+    store.async_crypto_service.down = True
+    assert asyncio.run(store.get_crypto_history_async("BTC", 60)).partial
+    # The stored range itself is still current
+    assert not store.get_crypto_history("BTC", 30).partial
+
+
+def test_partial_stock_history(store, stocks):
+    store.get_stock_history("AAPL", "1mo")
+    stocks.down = True
+    assert store.get_stock_history("AAPL", "1y").partial
+    assert not store.get_stock_history("AAPL", "5d").partial
@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+from app.services import IndicatorSeries, PriceSeries, compute_indicator
+from app.services.cache_codec import decode, encode
+
+DAY_MS = 86_400_000
+
+CASES = [
+    ("sma", {"window": 20}),
+    ("ema", {"window": 20}),
+    ("ema", {"window": 2}),
+    ("rsi", {"window": 14}),
+    ("bollinger", {"window": 20, "std": 2.0}),
+    ("macd", {"fast": 12, "slow": 26, "signal": 9}),
+]
+
+
+def make_series(prices: np.ndarray, first: int = 0) -> PriceSeries:
+    timestamps = 1_600_000_000_000 + DAY_MS * (first + np.arange(len(prices)))
+    return PriceSeries.from_epoch_ms(timestamps, prices, np.full(len(prices), np.nan))
+
+
+@pytest.fixture
+def prices() -> np.ndarray:
+    rng = np.random.default_rng(1)
+    return 20_000 + np.cumsum(rng.normal(0, 50, 1500))
+
+
+def ema(values, window, alpha=None):
+    """EMA seeded with the mean of the first window values, as in TA-Lib."""
+    alpha = 2 / (window + 1) if alpha is None else alpha
+    out = np.full(len(values), np.nan)
+    first = int(np.flatnonzero(~np.isnan(values))[0])
+    seed = first + window - 1
+    if seed >= len(values):
+        return out
+    out[seed] = np.mean(values[first : seed + 1])
+    for i in range(seed + 1, len(values)):
+        out[i] = (1 - alpha) * out[i - 1] + alpha * values[i]
+    return out
+
+
+def reference(kind, prices, params):
+    n = len(prices)
+    if kind in ("sma", "bollinger"):
+        window = params["window"]
+        mean, std = np.full(n, np.nan), np.full(n, np.nan)
+        for i in range(window - 1, n):
+            mean[i] = prices[i - window + 1 : i + 1].mean()
+            std[i] = prices[i - window + 1 : i + 1].std()
+        if kind == "sma":
+            return {"sma": mean}
+        width = params["std"] * std
+        return {"middle": mean, "upper": mean + width, "lower": mean - width}
+    if kind == "ema":
+        return {"ema": ema(prices, params["window"])}
+    if kind == "rsi":
+        window = params["window"]
+        changes = np.concatenate(([np.nan], np.diff(prices)))
+        gain = ema(np.maximum(changes, 0), window, 1 / window)
+        loss = ema(np.maximum(-changes, 0), window, 1 / window)
+        return {"rsi": 100 - 100 / (1 + gain / loss)}
+    macd = ema(prices, params["fast"]) - ema(prices, params["slow"])
+    signal = ema(macd, params["signal"])
+    return {"macd": macd, "signal": signal, "histogram": macd - signal}
+
+
+def assert_columns_equal(actual: IndicatorSeries, expected: IndicatorSeries):
+    assert actual.columns.keys() == expected.columns.keys()
+    for name, column in expected.columns.items():
+        np.testing.assert_allclose(actual.columns[name], column, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("kind,params", CASES)
+def test_matches_reference(kind, params, prices):
+    result = compute_indicator(make_series(prices), kind, params)
+    for name, expected in reference(kind, prices, params).items():
+        np.testing.assert_allclose(result.lines(kind)[name], expected, rtol=1e-9)
+
+
+def test_rsi_is_100_without_losses():
+    result = compute_indicator(make_series(np.arange(1.0, 40.0)), "rsi", {"window": 14})
+    assert np.isnan(result.columns["rsi"][:14]).all()
+    assert (result.columns["rsi"][14:] == 100).all()
+
+
+def test_series_shorter_than_the_window():
+    result = compute_indicator(make_series(np.arange(5.0)), "ema", {"window": 20})
+    assert np.isnan(result.columns["ema"]).all()
+
+
+@pytest.mark.parametrize("kind,params", CASES)
+def test_unchanged_series_reuses_the_previous_result(kind, params, prices):
+    series = make_series(prices)
+    previous = compute_indicator(series, kind, params)
+    assert compute_indicator(make_series(prices), kind, params, previous) is previous
+
+
+@pytest.mark.parametrize("kind,params", CASES)
+@pytest.mark.parametrize(
+    "drop,add,revise",
+    [
+        (0, 1, False),
+        (0, 50, False),
+        (0, 1, True),
+        (1, 1, False),
+        (30, 30, True),
+        (10, 0, False),
+    ],
+)
+def test_incremental_update_matches_full_recompute(kind, params, prices, drop, add, revise):
+    previous = compute_indicator(make_series(prices[:1400]), kind, params)
+    updated = prices[drop : 1400 + add].copy()
+    if revise:
+        updated[1399 - drop] += 25.0
+    series = make_series(updated, first=drop)
+    assert_columns_equal(
+        compute_indicator(series, kind, params, previous),
+        compute_indicator(series, kind, params),
+    )
+
+
+def test_unrelated_previous_result_is_ignored(prices):
+    unrelated = make_series(prices[:100], first=5000)
+    previous = compute_indicator(unrelated, "ema", {"window": 20})
+    series = make_series(prices)
+    assert_columns_equal(
+        compute_indicator(series, "ema", {"window": 20}, previous),
+        compute_indicator(series, "ema", {"window": 20}),
+    )
+
+
+def test_cache_codec_round_trip(prices):
+    params = {"fast": 12, "slow": 26, "signal": 9}
+    result = compute_indicator(make_series(prices), "macd", params)
+    decoded = decode(encode(result))
+    np.testing.assert_array_equal(decoded.source.prices, result.source.prices)
+    assert_columns_equal(decoded, result)
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+
+from fastapi.testclient import TestClient
+
+from app.routers.stream import log_send_failure
+from app.schemas import AssetDetail, AssetType
+from app.services import PriceStreamHub, Subscriber, quote_store
+
+
+def quote(symbol: str, price: float) -> AssetDetail:
+    return AssetDetail(
+        id=0,
+        symbol=symbol,
+        name=symbol,
+        asset_type=AssetType.CRYPTO,
+        current_price=price,
+        price_change_24h=0.0,
+        price_change_percent_24h=0.0,
+    )
+
+
+class FakeFetch:
+    def __init__(self):
+        self.calls: list[tuple[AssetType, list[str]]] = []
+        self.price = 1.0
+
+    async def __call__(self, asset_type, symbols):
+        self.calls.append((asset_type, symbols))
+        return {symbol: quote(symbol, self.price) for symbol in symbols}
+
+
+def drain(subscriber: Subscriber) -> list[dict]:
+    messages = []
+    while not subscriber.queue.empty():
+        messages.append(subscriber.queue.get_nowait())
+    return messages
+
+
+def test_polls_every_asset_of_a_type_in_one_batch():
+    fetch = FakeFetch()
+
+    async def run():
+        hub = PriceStreamHub(fetch, poll_interval=0.1)
+        first, second = Subscriber(), Subscriber()
+        for symbol in ("BTC", "ETH"):
+            hub.subscribe(first, AssetType.CRYPTO, symbol)
+        hub.subscribe(second, AssetType.CRYPTO, "eth")
+        hub.subscribe(second, AssetType.CRYPTO, "DOGE")
+        await asyncio.sleep(0.25)
+        stats = hub.stats()
+        await hub.shutdown()
+        return first, second, stats
+
+    first, second, stats = asyncio.run(run())
+    assert stats == {"pollers": 1, "assets": 3, "subscriptions": 4}
+    assert fetch.calls == [(AssetType.CRYPTO, ["BTC", "DOGE", "ETH"])] * 3
+    # Unchanged prices are only published once
+    assert [m["data"]["symbol"] for m in drain(first)] == ["BTC", "ETH"]
+    assert [m["data"]["symbol"] for m in drain(second)] == ["DOGE", "ETH"]
+
+
+def test_new_assets_are_fetched_without_waiting_for_the_interval():
+    fetch = FakeFetch()
+
+    async def run():
+        hub = PriceStreamHub(fetch, poll_interval=60)
+        subscriber, late = Subscriber(), Subscriber()
+        hub.subscribe(subscriber, AssetType.CRYPTO, "BTC")
+        await asyncio.sleep(0.01)
+        hub.subscribe(late, AssetType.CRYPTO, "ETH")
+        # Already polled; served the last quote without a fetch
+        hub.subscribe(late, AssetType.CRYPTO, "BTC")
+        await asyncio.sleep(0.01)
+        await hub.shutdown()
+        return late
+
+    late = asyncio.run(run())
+    assert fetch.calls == [
+        (AssetType.CRYPTO, ["BTC"]),
+        (AssetType.CRYPTO, ["ETH"]),
+    ]
+    assert [m["data"]["symbol"] for m in drain(late)] == ["BTC", "ETH"]
+
+
+def test_price_changes_are_published():
+    fetch = FakeFetch()
+
+    async def run():
+        hub = PriceStreamHub(fetch, poll_interval=0.05)
+        subscriber = Subscriber()
+        hub.subscribe(subscriber, AssetType.CRYPTO, "BTC")
+        await asyncio.sleep(0.01)
+        fetch.price = 2.0
+        await asyncio.sleep(0.06)
+        await hub.shutdown()
+        return subscriber
+
+    subscriber = asyncio.run(run())
+    assert [m["data"]["current_price"] for m in drain(subscriber)] == [1.0, 2.0]
+
+
+def test_last_unsubscribe_stops_the_poller():
+    fetch = FakeFetch()
+
+    async def run():
+        hub = PriceStreamHub(fetch, poll_interval=0.05)
+        subscriber = Subscriber()
+        hub.subscribe(subscriber, AssetType.CRYPTO, "BTC")
+        hub.subscribe(subscriber, AssetType.STOCK, "AAPL")
+        await asyncio.sleep(0.01)
+        hub.unsubscribe(subscriber, AssetType.CRYPTO, "BTC")
+        stats = hub.stats()
+        hub.disconnect(subscriber)
+        await asyncio.sleep(0.1)
+        return stats, hub.stats()
+
+    during, after = asyncio.run(run())
+    assert during == {"pollers": 1, "assets": 1, "subscriptions": 1}
+    assert after == {"pollers": 0, "assets": 0, "subscriptions": 0}
+    assert len(fetch.calls) == 2
+
+
+def test_websocket_streams_crypto_from_one_markets_call(coingecko, cache):
+    from app.main import app
+
+    with TestClient(app) as client:
+        coingecko.reset_counters()
+        with client.websocket_connect("/api/stream/ws") as websocket:
+            websocket.send_json(
+                {"action": "subscribe", "symbols": "crypto:BTC,crypto:ETH"}
+            )
+            messages = [websocket.receive_json() for _ in range(2)]
+    assert {m["data"]["symbol"] for m in messages} == {"BTC", "ETH"}
+    # The coin index loads market cap ranks in the background meanwhile
+    quote_calls = [p for p in coingecko.paths if "order=market_cap_desc" not in p]
+    assert quote_calls == [
+        "/api/v3/coins/markets?vs_currency=usd&ids=bitcoin%2Cethereum"
+    ]
+    # Stored as batch quotes, apart from the single-asset entries
+    assert cache.get("crypto_quote:BTC") is not None
+    assert cache.get("crypto:BTC") is None
+
+
+def test_stream_polls_keep_the_detail_description(client, cache):
+    assert client.get("/api/assets/crypto/BTC").json()["description"] == "bitcoin stub"
+    with client.websocket_connect("/api/stream/ws") as websocket:
+        websocket.send_json({"action": "subscribe", "symbols": "crypto:BTC"})
+        assert websocket.receive_json()["data"].get("description") is None
+
+    detail = client.get("/api/assets/crypto/BTC").json()
+    assert detail["description"] == "bitcoin stub"
+    # Nor do they reach the single-asset entries through the quote store
+    cache.clear()
+    quote_store.flush()
+    detail = client.get("/api/assets/crypto/BTC").json()
+    assert detail["description"] == "bitcoin stub"
+
+
+def test_send_failures_are_logged(caplog):
+    async def fail():
+        raise RuntimeError("socket gone")
+
+    async def run():
+        sender = asyncio.create_task(fail())
+        sender.add_done_callback(log_send_failure)
+        await asyncio.gather(sender, return_exceptions=True)
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(run())
+    assert "socket gone" in caplog.text
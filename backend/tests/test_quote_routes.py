@@ -0,0 +1,98 @@
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.main import app
+from app.routers.assets import STALE_HEADER, stale_if_expired
+from app.routers.dependencies import get_history_store
+from app.schemas import AssetDetail, AssetType
+from app.services import CacheLookup, PriceSeries, provider_calls, quote_store
+from benchmarks.fake_yfinance import FakeYFinance
+
+
+def quote(symbol: str, age: timedelta) -> AssetDetail:
+    return AssetDetail(
+        id=0,
+        asset_type=AssetType.STOCK,
+        symbol=symbol,
+        name=f"{symbol} Inc.",
+        current_price=10.0,
+        last_updated=datetime.now() - age,
+    )
+
+
+@pytest.fixture
+def yfinance():
+    fake = FakeYFinance()
+    with fake.patch():
+        yield fake
+
+
+@pytest.fixture
+def yfinance_circuit_open():
+    breaker = provider_calls.breaker("yfinance", "info")
+    for _ in range(breaker.min_calls):
+        breaker.record(False, 0.0)
+    yield breaker
+    del provider_calls._breakers[("yfinance", "info")]
+
+
+def test_fresh_quotes_are_cached(client, yfinance):
+    response = client.get("/api/assets/stocks/AAPL")
+    assert response.status_code == 200
+    assert response.json()["symbol"] == "AAPL"
+    assert STALE_HEADER not in response.headers
+    assert "max-age=0" not in response.headers["Cache-Control"]
+
+    client.get("/api/assets/stocks/AAPL")
+    assert yfinance.calls == 1
+
+
+def test_last_known_quote_is_served_stale_while_the_circuit_is_open(
+    client, yfinance, yfinance_circuit_open
+):
+    quote_store.save(quote("OLDCO", timedelta(hours=2)))
+    quote_store.flush()
+
+    response = client.get("/api/assets/stocks/OLDCO")
+    assert response.status_code == 200
+    assert response.json()["current_price"] == 10.0
+    assert response.headers[STALE_HEADER] == "true"
+    assert "max-age=0" in response.headers["Cache-Control"]
+    assert yfinance.calls == 0
+
+
+def test_unknown_quotes_answer_503_while_the_circuit_is_open(
+    client, yfinance, yfinance_circuit_open
+):
+    response = client.get("/api/assets/stocks/NEVERSEEN")
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+def test_stale_if_expired():
+    fresh = CacheLookup(quote("A", timedelta(0)), expires_in=30.0)
+    assert stale_if_expired(fresh) is fresh
+    expired = stale_if_expired(CacheLookup(quote("A", timedelta(hours=1))))
+    assert expired.stale and expired.expires_in == 0.0
+    assert stale_if_expired(CacheLookup(None)) == CacheLookup(None)
+
+
+def test_partial_history_is_served_stale(client):
+    end = int(time.time() * 1000)
+    series = PriceSeries.from_epoch_ms([end - 86_400_000, end], [1.0, 2.0])
+    histories = {"1mo": series, "1y": replace(series, partial=True)}
+    app.dependency_overrides[get_history_store] = lambda: SimpleNamespace(
+        get_stock_history=lambda symbol, period: histories[period]
+    )
+
+    response = client.get("/api/assets/stocks/PART/history?period=1y")
+    assert response.status_code == 200
+    assert response.headers[STALE_HEADER] == "true"
+    assert "max-age=0" in response.headers["Cache-Control"]
+
+    response = client.get("/api/assets/stocks/PART/history?period=1mo")
+    assert STALE_HEADER not in response.headers
@@ -0,0 +1,107 @@
+import importlib
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.schemas import AssetDetail, AssetType
+from app.services import QuoteStore
+
+# The module, not the quote_store instance exported by app.services
+quote_store_module = importlib.import_module("app.services.quote_store")
+
+
+def quote(symbol: str = "BTC", **fields) -> AssetDetail:
+    values = {
+        "id": 0,
+        "asset_type": AssetType.CRYPTO,
+        "symbol": symbol,
+        "name": "Bitcoin",
+        "current_price": 100.0,
+        "high_24h": 101.0,
+        "low_24h": 99.0,
+        "description": "Digital gold",
+        "last_updated": datetime.now(),
+    }
+    return AssetDetail(**{**values, **fields})
+
+
+def test_round_trips_detail_fields(sessions):
+    store = QuoteStore(sessions)
+    store.save(quote())
+    store.flush()
+    loaded = store.load(AssetType.CRYPTO, "btc", timedelta(minutes=5))
+    assert loaded.current_price == 100.0
+    assert (loaded.high_24h, loaded.low_24h) == (101.0, 99.0)
+    assert loaded.description == "Digital gold"
+
+
+def test_quotes_without_a_description_keep_the_stored_one(sessions):
+    store = QuoteStore(sessions)
+    store.save(quote())
+    store.flush()
+    store.save(quote(current_price=105.0, description=None))
+    store.flush()
+    loaded = store.load(AssetType.CRYPTO, "BTC", None)
+    assert loaded.current_price == 105.0
+    assert loaded.description == "Digital gold"
+
+
+def test_load_respects_max_age(sessions):
+    store = QuoteStore(sessions)
+    store.save(quote(last_updated=datetime.now() - timedelta(hours=1)))
+    store.flush()
+    assert store.load(AssetType.CRYPTO, "BTC", timedelta(minutes=5)) is None
+    assert store.load(AssetType.CRYPTO, "BTC", None) is not None
+    assert store.load(AssetType.STOCK, "BTC", None) is None
+    assert store.load_recent(timedelta(minutes=5)) == []
+
+
+@pytest.mark.parametrize("upsert", [True, False])
+def test_a_stock_and_a_coin_sharing_a_ticker_keep_their_own_rows(
+    sessions, monkeypatch, upsert
+):
+    if not upsert:
+        monkeypatch.setattr(quote_store_module, "dialect_insert", lambda session: None)
+    store = QuoteStore(sessions)
+    etf = quote(asset_type=AssetType.STOCK, name="Bitcoin ETF", current_price=50.0)
+    # Pending together, then written over one another in separate flushes
+    store.save(etf)
+    store.save(quote())
+    store.flush()
+    store.save(quote(current_price=110.0))
+    store.flush()
+    store.save(etf)
+    store.flush()
+
+    stock = store.load(AssetType.STOCK, "BTC", None)
+    coin = store.load(AssetType.CRYPTO, "BTC", None)
+    assert (stock.name, stock.current_price) == ("Bitcoin ETF", 50.0)
+    assert (coin.name, coin.current_price) == ("Bitcoin", 110.0)
+    assert len(store.load_recent(timedelta(minutes=5))) == 2
+
+
+def test_a_full_batch_is_written_by_the_flush_thread(sessions):
+    store = QuoteStore(sessions, batch_size=2, flush_interval=60)
+    store.save(quote("BTC"))
+    store.save(quote("ETH"))
+    # Not written on the caller's thread
+    assert store.load_recent(timedelta(minutes=5)) == []
+
+    store.start()
+    try:
+        for _ in range(100):
+            if len(store.load_recent(timedelta(minutes=5))) == 2:
+                break
+            time.sleep(0.01)
+        assert len(store.load_recent(timedelta(minutes=5))) == 2
+    finally:
+        store.stop()
+
+
+def test_stop_writes_pending_quotes(sessions):
+    store = QuoteStore(sessions, flush_interval=60)
+    store.start()
+    store.save(quote())
+    store.stop()
+    assert store.load(AssetType.CRYPTO, "BTC", None) is not None
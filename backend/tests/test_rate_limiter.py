@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+
+from app.services import Priority, RateLimiter
+from app.services.rate_limiter import parse_retry_after
+
+
+def test_burst_then_fails_fast_within_the_wait_budget():
+    limiter = RateLimiter(rate_per_minute=60, burst=3)
+    assert all(limiter.acquire(Priority.INTERACTIVE, 0) for _ in range(3))
+    assert not limiter.acquire(Priority.INTERACTIVE, 0.1)
+    stats = limiter.stats()
+    assert stats["acquired"] == 3
+    assert stats["rejected"] == 1
+
+
+def test_tokens_refill_over_time():
+    limiter = RateLimiter(rate_per_minute=6000, burst=1)
+    assert limiter.acquire(Priority.INTERACTIVE, 0)
+    start = time.monotonic()
+    assert limiter.acquire(Priority.INTERACTIVE, 1)
+    assert time.monotonic() - start < 0.5
+
+
+def test_interactive_calls_overtake_queued_background_calls():
+    limiter = RateLimiter(rate_per_minute=600, burst=1)
+    assert limiter.acquire(Priority.INTERACTIVE, 0)
+    order = []
+
+    def call(priority, name):
+        if limiter.acquire(priority, 2):
+            order.append(name)
+
+    background = threading.Thread(target=call, args=(Priority.BACKGROUND, "background"))
+    background.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=call, args=(Priority.INTERACTIVE, "interactive"))
+    interactive.start()
+    background.join()
+    interactive.join()
+    assert order == ["interactive", "background"]
+
+
+def test_throttled_blocks_the_bucket_with_exponential_backoff():
+    limiter = RateLimiter(rate_per_minute=6000, burst=5, backoff=0.1, max_backoff=0.3)
+    assert limiter.throttled() == 0.1
+    assert limiter.retry_after() > 0
+    assert not limiter.acquire(Priority.INTERACTIVE, 0.05)
+    time.sleep(0.1)
+    assert limiter.throttled() == 0.2
+    time.sleep(0.2)
+    assert limiter.throttled(retry_after=0.25) == 0.3
+    time.sleep(0.3)
+    limiter.succeeded()
+    assert limiter.throttled() == 0.1
+
+
+def test_retry_after_from_the_provider_wins_when_longer():
+    limiter = RateLimiter(backoff=0.1)
+    assert limiter.throttled(retry_after=5) == 5
+    assert 4.9 < limiter.retry_after() <= 5
+
+
+def test_acquire_async_shares_the_bucket():
+    limiter = RateLimiter(rate_per_minute=60, burst=2)
+
+    async def run():
+        return await asyncio.gather(
+            *(limiter.acquire_async(Priority.INTERACTIVE, 0.1) for _ in range(3))
+        )
+
+    assert sorted(asyncio.run(run())) == [False, True, True]
+    assert sum(limiter.stats()["queue_depth"].values()) == 0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
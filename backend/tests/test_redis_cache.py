@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
+import fakeredis
+import pytest
+
+from app.services import SingleFlight
+from app.services.cache import RedisCache
+
+
+class RecordingRedis:
+    """Redis client recording the thread of every call."""
+
+    def __init__(self):
+        self.client = fakeredis.FakeRedis()
+        self.threads: list[int] = []
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        def call(*args, **kwargs):
+            self.threads.append(threading.get_ident())
+            return method(*args, **kwargs)
+
+        return call
+
+
+class DownRedis:
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            raise ConnectionError("redis down")
+
+        return call
+
+
+@pytest.fixture
+def client():
+    return RecordingRedis()
+
+
+def new_cache(client, **kwargs) -> RedisCache:
+    return RedisCache(client, prefix="test:", flight=SingleFlight(), **kwargs)
+
+
+def test_values_round_trip_with_their_ttl(client):
+    cache = new_cache(client)
+    cache.set("quote:A", {"price": 1.5}, timedelta(seconds=60))
+    assert cache.get("quote:A") == {"price": 1.5}
+    assert 59 < cache.ttl_remaining("quote:A") <= 60
+    assert client.client.pttl("test:quote:A") > 0
+    cache.delete("quote:A")
+    assert cache.get("quote:A") is None
+
+
+def test_expired_values_are_served_stale_within_the_stale_window(client):
+    cache = new_cache(client)
+    cache.set("quote:A", 1, timedelta(milliseconds=10), timedelta(seconds=60))
+    time.sleep(0.02)
+    assert cache.get("quote:A") is None
+    lookup = cache.get_or_load("quote:A", lambda: 2)
+    assert lookup.value == 1 and lookup.stale
+
+
+def test_clear_only_touches_the_prefix(client):
+    cache = new_cache(client)
+    client.client.set("other:key", b"x")
+    cache.set("quote:A", 1)
+    cache.set("quote:B", 2)
+    assert len(cache) == 2
+    cache.clear()
+    assert len(cache) == 0
+    assert client.client.get("other:key") == b"x"
+
+
+def test_server_errors_degrade_to_misses():
+    cache = new_cache(DownRedis())
+    cache.set("quote:A", 1)
+    assert cache.get("quote:A") is None
+    assert cache.get_or_load("quote:A", lambda: 2).value == 2
+    assert cache.stats()["entries"] is None
+    assert cache.errors >= 3
+
+
+def test_async_calls_reach_redis_off_the_event_loop(client):
+    cache = new_cache(client)
+
+    async def load():
+        return "value"
+
+    async def run():
+        first = await cache.get_or_load_async("quote:A", load, timedelta(seconds=60))
+        second = await cache.get_or_load_async("quote:A", load)
+        await cache.set_async("quote:B", 1)
+        return first, second, await cache.get_async("quote:B")
+
+    first, second, b = asyncio.run(run())
+    assert first.value == second.value == "value"
+    assert 59 < first.expires_in <= 60
+    assert b == 1
+    assert client.threads
+    assert threading.get_ident() not in client.threads
+
+
+def test_l1_hits_need_no_round_trip(client):
+    cache = new_cache(client, l1_ttl=timedelta(seconds=5))
+    cache.set("quote:A", 1, timedelta(seconds=60))
+    client.threads.clear()
+
+    async def run():
+        return await cache.get_async("quote:A")
+
+    assert asyncio.run(run()) == 1
+    assert cache.get("quote:A") == 1
+    assert client.threads == []
+    assert cache.namespace_stats()["quote"]["hits"] == 2
@@ -0,0 +1,57 @@
+from app.services.response_cache import ResponseCache, choose_encoding
+
+BODY = b'{"price": 1.0}' * 200
+
+
+def encode(value) -> bytes:
+    return BODY + str(value).encode()
+
+
+def test_bodies_are_reused_while_the_value_is_the_same_object():
+    cache = ResponseCache()
+    value = ["a"]
+    first = cache.get("key", value, encode)
+    assert cache.get("key", value, encode) is first
+    assert cache.get("key", ["a"], encode) is not first
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["entries"] == 1
+
+
+def test_byte_total_follows_inserts_variants_and_evictions():
+    cache = ResponseCache(max_bytes=10 * len(encode(0)))
+    values = [[i] for i in range(6)]
+    bodies = [cache.get(f"k{i}", value, encode) for i, value in enumerate(values)]
+    assert cache.stats()["bytes"] == sum(len(body) for body in bodies)
+
+    bodies[0].encoded("gzip")
+    bodies[0].encoded("br")
+    cache.get("k0", values[0], encode)
+    assert cache.stats()["bytes"] == sum(len(body) for body in bodies)
+
+    # Past the budget the least recently used bodies go first
+    for i in range(6, 12):
+        cache.get(f"k{i}", [i], encode)
+    stats = cache.stats()
+    assert stats["bytes"] <= cache.max_bytes
+    assert cache.get("k0", values[0], encode) is bodies[0]
+    assert cache.get("k1", values[1], encode) is not bodies[1]
+
+    cache.clear()
+    assert cache.stats()["bytes"] == 0
+
+
+def test_entry_bound():
+    cache = ResponseCache(max_entries=3)
+    for i in range(5):
+        cache.get(f"k{i}", i, encode)
+    stats = cache.stats()
+    assert stats["entries"] == 3
+    assert stats["bytes"] == 3 * len(encode(0))
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("gzip;q=1, br;q=0") == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding(None) is None
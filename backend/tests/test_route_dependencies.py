@@ -0,0 +1,160 @@
+import time
+
+import numpy as np
+import pytest
+
+from app.main import app
+from app.routers.dependencies import (
+    get_async_crypto_service,
+    get_crypto_service,
+    get_history_store,
+    get_stock_service,
+)
+from app.routers.stream import get_price_hub
+from app.schemas import AssetDetail, AssetType, SearchResult
+from app.services import PriceSeries, PriceStreamHub, history_store
+
+
+def quote(symbol: str, asset_type: AssetType) -> AssetDetail:
+    return AssetDetail(
+        id=0,
+        symbol=symbol,
+        name=f"Stub {symbol}",
+        asset_type=asset_type,
+        current_price=42.0,
+    )
+
+
+class StubStocks:
+    """Stock service answering every symbol without yfinance."""
+
+    def __init__(self):
+        self.calls: list[str] = []
+
+    def get_stock_data(self, symbol):
+        self.calls.append(symbol)
+        return quote(symbol.upper(), AssetType.STOCK)
+
+    def get_stocks_quotes(self, symbols):
+        self.calls.extend(symbols)
+        return {s: quote(s, AssetType.STOCK) for s in symbols}
+
+    def search_stocks(self, query):
+        return [SearchResult(symbol="STUB", name="Stub", asset_type=AssetType.STOCK)]
+
+    def get_historical_series(self, symbol, period="1mo", start=None):
+        self.calls.append(symbol)
+        end = int(time.time() * 1000)
+        timestamps = end - 86_400_000 * np.arange(5)[::-1]
+        return PriceSeries.from_epoch_ms(timestamps, np.arange(5.0), np.ones(5))
+
+
+class StubCrypto:
+    def __init__(self):
+        self.calls: list[str] = []
+
+    def get_crypto_data(self, symbol, priority=None):
+        self.calls.append(symbol)
+        return quote(symbol.upper(), AssetType.CRYPTO)
+
+    def search_crypto(self, query):
+        return []
+
+
+class StubAsyncCrypto:
+    def __init__(self):
+        self.calls: list[str] = []
+
+    async def get_crypto_data(self, symbol, priority=None):
+        self.calls.append(symbol)
+        return quote(symbol.upper(), AssetType.CRYPTO)
+
+    async def get_markets_data(self, symbols, priority=None):
+        self.calls.extend(symbols)
+        return {s: quote(s, AssetType.CRYPTO) for s in symbols}
+
+
+@pytest.fixture
+def stocks():
+    stocks = StubStocks()
+    app.dependency_overrides[get_stock_service] = lambda: stocks
+    return stocks
+
+
+@pytest.fixture
+def crypto():
+    crypto = StubCrypto()
+    app.dependency_overrides[get_crypto_service] = lambda: crypto
+    return crypto
+
+
+@pytest.fixture
+def crypto_async():
+    crypto = StubAsyncCrypto()
+    app.dependency_overrides[get_async_crypto_service] = lambda: crypto
+    return crypto
+
+
+def test_quotes_come_from_the_injected_services(client, stocks, crypto_async):
+    assert client.get("/api/assets/stocks/DIQ").json()["name"] == "Stub DIQ"
+    assert client.get("/api/assets/crypto/DIC").json()["name"] == "Stub DIC"
+    batch = client.get("/api/assets/quotes?symbols=stock:DIB,crypto:DID").json()
+    assert batch["STOCK:DIB"]["asset"]["name"] == "Stub DIB"
+    assert batch["CRYPTO:DID"]["asset"]["name"] == "Stub DID"
+    assert stocks.calls == ["DIQ", "DIB"]
+    assert crypto_async.calls == ["DIC", "DID"]
+
+
+def test_search_uses_the_injected_services(client, stocks, crypto):
+    results = client.get("/api/assets/search?query=anything").json()
+    assert [r["symbol"] for r in results] == ["STUB"]
+
+
+def test_history_store_fetches_through_the_injected_services(client, stocks):
+    response = client.get("/api/assets/stocks/DIH/history?period=5d")
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 5
+    assert stocks.calls == ["DIH"]
+
+
+def test_history_store_is_shared_without_overrides():
+    from app.services import async_crypto_service, crypto_service, stock_service
+
+    store = get_history_store(stock_service, crypto_service, async_crypto_service)
+    assert store is history_store
+    other = get_history_store(StubStocks(), crypto_service, async_crypto_service)
+    assert other is not history_store
+    assert other.session_factory is history_store.session_factory
+
+
+def test_watchlist_resolves_assets_through_the_injected_services(
+    client, stocks, crypto
+):
+    response = client.post(
+        "/api/watchlist/",
+        json={"asset_type": "crypto", "symbol": "DIW"},
+        headers={"X-Owner-Id": "dependencies"},
+    )
+    assert response.status_code == 201
+    assert response.json()["asset_info"]["name"] == "Stub DIW"
+    assert crypto.calls == ["DIW"]
+    client.delete(
+        f"/api/watchlist/{response.json()['id']}",
+        headers={"X-Owner-Id": "dependencies"},
+    )
+
+
+def test_stream_uses_the_injected_hub(client):
+    fetched = []
+
+    async def fetch(asset_type, symbols):
+        fetched.append((asset_type, symbols))
+        return {s: quote(s, asset_type) for s in symbols}
+
+    hub = PriceStreamHub(fetch)
+    app.dependency_overrides[get_price_hub] = lambda: hub
+    with client.websocket_connect("/api/stream/ws") as websocket:
+        websocket.send_json({"action": "subscribe", "symbols": "stock:DIS"})
+        message = websocket.receive_json()
+    assert message["data"]["name"] == "Stub DIS"
+    assert fetched == [(AssetType.STOCK, ["DIS"])]
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services import SingleFlight
+
+
+def test_do_coalesces_concurrent_threads():
+    flight = SingleFlight()
+    calls = 0
+    started = threading.Event()
+
+    def fetch():
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.05)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("key", fetch)))
+        for _ in range(8)
+    ]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == 1
+    assert results == ["value"] * 8
+    assert flight.stats() == {"coalesced": 7, "in_flight": 0}
+
+
+def test_do_shares_errors_and_forgets_the_key():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("upstream down")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: 1) == 1
+
+
+def test_do_async_coalesces_concurrent_tasks():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*(flight.do_async("key", fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["value"] * 5
+    assert calls == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_do_async_leader_cancellation_does_not_fail_followers():
+    flight = SingleFlight()
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def fetch():
+            await gate.wait()
+            return "value"
+
+        leader = asyncio.create_task(flight.do_async("key", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do_async("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == "value"
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_do_async_shares_errors():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def run():
+        return await asyncio.gather(
+            *(flight.do_async("key", fail) for _ in range(3)), return_exceptions=True
+        )
+
+    assert all(isinstance(r, ValueError) for r in asyncio.run(run()))
@@ -0,0 +1,105 @@
+import importlib
+from datetime import timedelta
+
+import pytest
+
+from app.services import StockService
+from app.services.stock_index import StockIndex
+from benchmarks.fake_yfinance import FakeYFinance
+
+# The module, not the stock_index instance exported by app.services
+stock_index_module = importlib.import_module("app.services.stock_index")
+
+NASDAQ_LISTED = (
+    "Symbol|Security Name|Market Category|Test Issue|Financial Status|"
+    "Round Lot Size|ETF|NextShares\n"
+    "AAPL|Apple Inc. - Common Stock|Q|N|N|100|N|N\n"
+    "ZZZT|Test Issue Corp - Common Stock|Q|Y|N|100|N|N\n"
+    "File Creation Time: 0101202600:00|||||||\n"
+)
+OTHER_LISTED = (
+    "ACT Symbol|Security Name|Exchange|CQS Symbol|ETF|Round Lot Size|"
+    "Test Issue|NASDAQ Symbol\n"
+    "BRK.B|Berkshire Hathaway Inc. Class B|N|BRK.B|N|100|N|BRK.B\n"
+    "XYZW|Obscure Widgets Corp. Common Shares|A|XYZW|N|100|N|XYZW\n"
+)
+
+
+@pytest.fixture
+def listing_path(tmp_path):
+    return tmp_path / "stock_listings.txt"
+
+
+@pytest.fixture
+def service(listing_path) -> StockService:
+    service = StockService()
+    service.listing_index = StockIndex(
+        listing_path=listing_path, refresh_interval=timedelta(0)
+    )
+    return service
+
+
+@pytest.fixture
+def yfinance():
+    fake = FakeYFinance()
+    with fake.patch():
+        yield fake
+
+
+class Response:
+    def __init__(self, text: str):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def symbol_directory(monkeypatch):
+    files = {
+        stock_index_module.NASDAQ_LISTED_URL: NASDAQ_LISTED,
+        stock_index_module.OTHER_LISTED_URL: OTHER_LISTED,
+    }
+    monkeypatch.setattr(
+        stock_index_module.requests, "get", lambda url, timeout: Response(files[url])
+    )
+
+
+def test_search_never_calls_yfinance(service, yfinance):
+    assert service.search_stocks("aapl")[0].symbol == "AAPL"
+    assert [r.symbol for r in service.search_stocks("apple")][:1] == ["AAPL"]
+    # Ticker-shaped prefixes the index doesn't list stay offline too
+    for query in ("shop.", "shop.t", "shop.to", "nvdia", "zzzzz"):
+        assert all(r.symbol != query.upper() for r in service.search_stocks(query))
+    assert yfinance.calls == 0
+
+
+def test_bundled_listing_is_served_until_the_full_one_is_downloaded(
+    service, listing_path, symbol_directory
+):
+    assert all(r.symbol != "XYZW" for r in service.search_stocks("xyzw"))
+
+    assert service.listing_index.refresh()
+    assert listing_path.exists()
+    result = service.search_stocks("xyzw")[0]
+    assert (result.symbol, result.name, result.exchange) == (
+        "XYZW",
+        "Obscure Widgets Corp.",
+        "NYSE American",
+    )
+    assert service.search_stocks("brk-b")[0].symbol == "BRK-B"
+    assert all(r.symbol != "ZZZT" for r in service.search_stocks("zzzt"))
+
+    # A restart loads the downloaded listing without downloading again
+    restarted = StockIndex(listing_path=listing_path, refresh_interval=timedelta(0))
+    assert restarted.search("xyzw")[0].symbol == "XYZW"
+    assert restarted.updated_at is not None
+
+
+def test_failed_downloads_keep_the_current_listing(service, monkeypatch):
+    def fail(url, timeout):
+        raise stock_index_module.requests.ConnectionError("offline")
+
+    monkeypatch.setattr(stock_index_module.requests, "get", fail)
+    assert not service.listing_index.refresh()
+    assert service.search_stocks("aapl")[0].symbol == "AAPL"
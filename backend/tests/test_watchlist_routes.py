@@ -0,0 +1,87 @@
+import importlib
+
+import pytest
+
+from app.database import SessionLocal
+from app.models import AssetType, Watchlist
+from app.schemas import AssetType as QuoteAssetType
+from benchmarks.fake_yfinance import FakeYFinance
+
+# The module, not the router exported by app.routers
+watchlist = importlib.import_module("app.routers.watchlist")
+
+
+@pytest.fixture(autouse=True)
+def empty_watchlist():
+    yield
+    with SessionLocal() as db:
+        db.query(Watchlist).delete()
+        db.commit()
+
+
+@pytest.fixture
+def yfinance():
+    fake = FakeYFinance()
+    with fake.patch():
+        yield fake
+
+
+def add(client, owner: str | None, symbol: str, asset_type: str = "stock"):
+    headers = {watchlist.OWNER_HEADER: owner} if owner else {}
+    return client.post(
+        "/api/watchlist/",
+        json={"asset_type": asset_type, "symbol": symbol},
+        headers=headers,
+    )
+
+
+def test_lists_are_kept_per_owner(client, yfinance):
+    assert add(client, "alice", "AAPL").status_code == 201
+    assert add(client, "bob", "msft").status_code == 201
+    assert add(client, None, "TSLA").status_code == 201
+    assert add(client, "alice", "aapl").status_code == 400
+
+    def symbols(owner):
+        headers = {watchlist.OWNER_HEADER: owner} if owner else {}
+        return [i["symbol"] for i in client.get("/api/watchlist/", headers=headers).json()]
+
+    assert symbols("alice") == ["AAPL"]
+    assert symbols("bob") == ["MSFT"]
+    assert symbols(None) == ["TSLA"]
+
+
+def test_items_are_only_removed_by_their_owner(client, yfinance):
+    item = add(client, "alice", "AAPL").json()
+    url = f"/api/watchlist/{item['id']}"
+    assert client.delete(url, headers={watchlist.OWNER_HEADER: "bob"}).status_code == 404
+    assert client.delete(url, headers={watchlist.OWNER_HEADER: "alice"}).status_code == 200
+
+
+def test_prefetch_targets_keep_the_most_watched_symbols(monkeypatch):
+    watchers = {"AAPL": 3, "MSFT": 2, "NVDA": 1, "TSLA": 1}
+    with SessionLocal() as db:
+        db.add_all(
+            Watchlist(owner=f"owner{i}", asset_type=AssetType.STOCK, symbol=symbol)
+            for symbol, count in watchers.items()
+            for i in range(count)
+        )
+        db.add(Watchlist(owner="owner9", asset_type=AssetType.CRYPTO, symbol="eth"))
+        db.commit()
+    monkeypatch.setattr(watchlist, "PREFETCH_SYMBOLS", "crypto:BTC")
+    monkeypatch.setattr(watchlist, "PREFETCH_WATCHLIST", True)
+    monkeypatch.setattr(watchlist, "PREFETCH_MAX_SYMBOLS", 3)
+
+    assert watchlist.prefetch_targets() == {
+        (QuoteAssetType.CRYPTO, "BTC"),
+        (QuoteAssetType.STOCK, "AAPL"),
+        (QuoteAssetType.STOCK, "MSFT"),
+        (QuoteAssetType.CRYPTO, "ETH"),
+    }
+
+    monkeypatch.setattr(watchlist, "PREFETCH_MAX_SYMBOLS", 0)
+    assert watchlist.prefetch_targets() == {(QuoteAssetType.CRYPTO, "BTC")}
+
+
+def test_default_prefetch_cap_fits_one_pass():
+    cap = watchlist.PREFETCH_MAX_SYMBOLS
+    assert cap * watchlist.PREFETCH_MIN_GAP_SECONDS <= watchlist.PREFETCH_INTERVAL_SECONDS
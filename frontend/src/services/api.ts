@@ -41,8 +41,19 @@ export const assetsApi = {
 };
 
 export const watchlistApi = {
-  getAll: () =>
-    api.get<WatchlistItem[]>('/api/watchlist/').then((res) => res.data),
+  getAll: async () => {
+    // Follow the pages until the server stops sending a cursor
+    const items: WatchlistItem[] = [];
+    let after: string | undefined;
+    do {
+      const res = await api.get<WatchlistItem[]>('/api/watchlist/', {
+        params: { after },
+      });
+      items.push(...res.data);
+      after = res.headers['x-next-cursor'];
+    } while (after);
+    return items;
+  },
 
   add: (assetType: AssetType, symbol: string) =>
     api
@@ -1,3 +1,5 @@
 #!/bin/bash
 cd "$(dirname "$0")/../backend"
+# Search serves the bundled listing only until the full one is downloaded
+[ -f "${STOCK_LISTING_PATH:-stock_listings.txt}" ] || uv run python -m app.services.stock_index
 uv run uvicorn app.main:app --reload